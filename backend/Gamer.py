@@ -1,7 +1,7 @@
 import random
-import string
 import firebase_admin
 from firebase_admin import credentials, firestore
+from id_allocator import IdAllocator, LocalBlockSource
 
 #Initialize Firebase Admin SDK
 #cred = credentials.Certificate("serviceAccountKey.json")
@@ -9,7 +9,8 @@ from firebase_admin import credentials, firestore
 #db = firestore.client()
 
 class Gamer:
-    __existing_ids = set()
+    # Unique within this process only; main.py installs a FirestoreBlockSource-backed allocator shared by every worker
+    __id_allocator = IdAllocator(LocalBlockSource())
 
     def __init__(self, name, email, password, profile):
         self.__gamer_id = self.__generate_unique_id() 
@@ -25,12 +26,13 @@ class Gamer:
         return str(random.randint(1, 12)).zfill(2)
 
     def __generate_unique_id(self):
-        while True:
-            characters = string.ascii_uppercase + string.digits
-            new_id = ''.join(random.choice(characters) for _ in range(5))
-            if new_id not in Gamer.__existing_ids:
-                Gamer.__existing_ids.add(new_id)
-                return new_id
+        return Gamer.__id_allocator.next_id()
+
+    @classmethod
+    def set_id_allocator(cls, allocator):
+        """Replace the allocator new gamers draw IDs from; returns the previous one."""
+        previous, cls.__id_allocator = cls.__id_allocator, allocator
+        return previous
 
     def to_dict(self):
         return {
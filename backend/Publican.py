@@ -1,5 +1,9 @@
 import base64
 
+from availability import TableAvailability
+from event_store import EventStore
+from timeutil import epoch_fields
+
 class Publican:
     def __init__(self, pub_name, email, ID, password, address, xcoord, ycoord, tables, pub_image=None):
         self.pub_name = pub_name
@@ -10,10 +14,17 @@ class Publican:
         self.xcoord = xcoord
         self.ycoord = ycoord 
         self.tables = tables
-        self.events = []
+        self.__events = EventStore()
+        self.__availability = TableAvailability()
         self.pub_image = pub_image
 
-    def create_event(self, game_type, start_time, end_time, expires, num_units, unit_capacity=None, available_slots=None):
+    # Events in creation order, as a list
+    @property
+    def events(self):
+        return list(self.__events)
+
+    def create_event(self, game_type, start_time, end_time, expires, num_units, unit_capacity=None, available_slots=None,
+                     event_id=None):
         if game_type not in ["Seat Based", "Table Based"]:
             return {"status": "error", "message": "Invalid game type specified."}
 
@@ -25,29 +36,78 @@ class Publican:
             "num_units": num_units,
             "available_slots": available_slots
         }
+        # Epoch-second copies of the times (None if unparseable), for comparisons and sorting
+        event.update(epoch_fields(event))
         if game_type == "Table Based":
             event["table_capacity"] = unit_capacity
 
-        self.events.append(event)
+        event["event_id"] = self.__events.add(event, event_id)
         return {"status": "success", "event": event}
         
     def delete_event(self, start_time, game_type):
-        for event in self.events:
-            if event["start_time"] == start_time and event["game_type"] == game_type:
-                self.events.remove(event)
-                return {"status": "success", "message": "Event deleted."}
-        return {"status": "error", "message": "Event not found."}
-
-    def reserve_tables(self, num_tables):
-        if self.tables >= num_tables:
-            self.tables -= num_tables
-            return {"status": "success", "message": "Table reserved."}
-        else:
+        event_id = self.__events.find(start_time, game_type)
+        if event_id is None:
+            return {"status": "error", "message": "Event not found."}
+        return self.delete_event_by_id(event_id)
+
+    def delete_event_by_id(self, event_id):
+        if self.__events.remove(event_id) is None:
+            return {"status": "error", "message": "Event not found."}
+        return {"status": "success", "message": "Event deleted."}
+
+    def get_event(self, event_id):
+        return self.__events.get(event_id)
+
+    # Events starting at or after now (epoch seconds, default the current time), earliest first
+    def get_upcoming_events(self, now=None, limit=None):
+        return self.__events.upcoming(now, limit)
+
+    # Events starting in [start, end), e.g. tonight's schedule; bounds are epoch seconds or timestamps
+    def get_events_between(self, start, end, limit=None):
+        return self.__events.between(start, end, limit)
+
+    # Without start/end the tables are taken for good (out of the pub's count);
+    # with them they are held only for [start, end)
+    def reserve_tables(self, num_tables, start=None, end=None):
+        if start is None and end is None:
+            # Tables already held for a time slot cannot be given away
+            if self.tables - self.__availability.get_peak() >= num_tables:
+                self.tables -= num_tables
+                return {"status": "success", "message": "Table reserved."}
             return {"status": "error", "message": "Not enough tables available."}
+        try:
+            reserved = self.__availability.reserve(num_tables, start, end, self.tables)
+        except ValueError:
+            return {"status": "error", "message": "Invalid reservation time."}
+        if reserved:
+            return {"status": "success", "message": "Table reserved."}
+        return {"status": "error", "message": "Not enough tables available."}
+
+    # All-or-nothing booking of a night's schedule: reservations is a list of (num_tables, start, end)
+    def reserve_tables_batch(self, reservations):
+        try:
+            failed = self.__availability.reserve_many(reservations, self.tables)
+        except ValueError:
+            return {"status": "error", "message": "Invalid reservation time."}
+        if failed is not None:
+            return {"status": "error", "message": f"Not enough tables available for reservation {failed + 1}."}
+        return {"status": "success", "message": f"{len(reservations)} reservations made."}
+
+    def cancel_reservation(self, num_tables, start=None, end=None):
+        if start is None and end is None:
+            self.tables += num_tables
+            return {"status": "success", "message": "Reservation cancelled."}
+        try:
+            cancelled = self.__availability.cancel(num_tables, start, end)
+        except ValueError:
+            return {"status": "error", "message": "Invalid reservation time."}
+        if cancelled:
+            return {"status": "success", "message": "Reservation cancelled."}
+        return {"status": "error", "message": "Reservation not found."}
 
-    def cancel_reservation(self, num_tables):
-        self.tables += num_tables
-        return {"status": "success", "message": "Reservation cancelled."}
+    # Tables free for the whole of [start, end)
+    def get_free_tables(self, start, end):
+        return self.__availability.get_free(start, end, self.tables)
 
     def update_pub_image(self, new_image):
         """ can be a file path, Base64 string, or URL) """
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+
+class AsyncFirestore:
+    """
+    Runs the async Firestore client on one long-lived background event loop.
+
+    Async Flask views each get a fresh event loop, while a gRPC-backed
+    AsyncClient must stay on the loop it was created on. Views therefore
+    await run() and the helpers below, which schedule the work on the
+    client's loop and let independent reads in one request proceed
+    concurrently.
+    """
+
+    def __init__(self, client_factory):
+        self.__client_factory = client_factory
+        self.__client = None
+        self.__loop = None
+        self.__thread = None
+        self.__lock = threading.Lock()
+
+    def __ensure_started(self):
+        with self.__lock:
+            if self.__loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="async-firestore", daemon=True)
+                thread.start()
+
+                async def create_client():
+                    return self.__client_factory()
+
+                self.__client = asyncio.run_coroutine_threadsafe(create_client(), loop).result()
+                self.__loop, self.__thread = loop, thread
+            return self.__loop
+
+    async def run(self, fn, *args):
+        """Await fn(client, *args) on the client's event loop from any other loop."""
+        loop = self.__ensure_started()
+        future = asyncio.run_coroutine_threadsafe(fn(self.__client, *args), loop)
+        return await asyncio.wrap_future(future)
+
+    async def get_documents(self, *paths):
+        """Fetch (collection, document_id) pairs concurrently; snapshots come back in order."""
+        async def fetch(client):
+            return await asyncio.gather(*(client.collection(name).document(doc_id).get() for name, doc_id in paths))
+        return list(await self.run(fetch))
+
+    async def get_document(self, name, doc_id):
+        """Fetch a single document snapshot."""
+        snapshot, = await self.get_documents((name, doc_id))
+        return snapshot
+
+    async def batch_update(self, *updates):
+        """Apply (collection, document_id, data) updates atomically in a single batch commit."""
+        async def commit(client):
+            batch = client.batch()
+            for name, doc_id, data in updates:
+                batch.update(client.collection(name).document(doc_id), data)
+            return await batch.commit()
+        return await self.run(commit)
+
+    def close(self):
+        with self.__lock:
+            if self.__loop is None:
+                return
+            self.__loop.call_soon_threadsafe(self.__loop.stop)
+            self.__thread.join(timeout=5)
+            self.__loop.close()
+            self.__loop = self.__thread = self.__client = None
@@ -0,0 +1,125 @@
+import threading
+
+from timeutil import parse_timestamp
+
+# Reservations are tracked in 15-minute slots
+SLOT_SECONDS = 900
+# Slots cover epoch seconds up to 2**32 (the year 2106)
+MAX_TS = 2 ** 32
+
+
+class TableAvailability:
+    """
+    Tables reserved over time, as a sparse segment tree over fixed-size time
+    slots with lazy range-add and range-max. Peak usage (and so free tables)
+    over any [start, end) is found in O(log slots), and only nodes touched by
+    reservations are stored. Reservations are rounded out to whole slots.
+
+    Capacity is passed in rather than held, so the owner's table count stays
+    the single source of truth.
+    """
+
+    def __init__(self, slot_seconds=SLOT_SECONDS, max_ts=MAX_TS):
+        self.__slot_seconds = slot_seconds
+        self.__size = 1 << (max_ts // slot_seconds).bit_length()
+        self.__peak = {}  # node -> peak reserved in its range, counting adds at and below it
+        self.__added = {}  # node -> count added to its whole range
+        self.__held = {}  # (first slot, end slot) -> tables held over that range
+        self.__lock = threading.Lock()
+
+    def __slots(self, start, end):
+        start, end = parse_timestamp(start), parse_timestamp(end)
+        if start is None or end is None or not 0 <= start < end <= self.__size * self.__slot_seconds:
+            raise ValueError("reservation times must be valid and end after start")
+        # Round outwards: a reservation holds every slot it touches
+        return start // self.__slot_seconds, -(-end // self.__slot_seconds)
+
+    def __add(self, node, lo, hi, first, last, count):
+        if last <= lo or hi <= first:
+            return
+        if first <= lo and hi <= last:
+            self.__store(self.__added, node, self.__added.get(node, 0) + count)
+            self.__store(self.__peak, node, self.__peak.get(node, 0) + count)
+            return
+        mid = (lo + hi) // 2
+        self.__add(2 * node, lo, mid, first, last, count)
+        self.__add(2 * node + 1, mid, hi, first, last, count)
+        peak = max(self.__peak.get(2 * node, 0), self.__peak.get(2 * node + 1, 0)) + self.__added.get(node, 0)
+        self.__store(self.__peak, node, peak)
+
+    def __max(self, node, lo, hi, first, last):
+        if first <= lo and hi <= last:
+            return self.__peak.get(node, 0)
+        mid = (lo + hi) // 2
+        peaks = []
+        if first < mid:
+            peaks.append(self.__max(2 * node, lo, mid, first, last))
+        if mid < last:
+            peaks.append(self.__max(2 * node + 1, mid, hi, first, last))
+        return max(peaks) + self.__added.get(node, 0)
+
+    @staticmethod
+    def __store(values, node, value):
+        # Zeros are dropped so the tree stays as sparse as the live reservations
+        if value:
+            values[node] = value
+        else:
+            values.pop(node, None)
+
+    def __reserved(self, slots):
+        return self.__max(1, 0, self.__size, *slots)
+
+    def get_peak(self, start=None, end=None):
+        """Most tables reserved at once within [start, end), or at any time if no range is given."""
+        with self.__lock:
+            if start is None and end is None:
+                return self.__peak.get(1, 0)
+            return self.__reserved(self.__slots(start, end))
+
+    def get_free(self, start, end, capacity):
+        """Tables free for the whole of [start, end) out of capacity."""
+        return max(capacity - self.get_peak(start, end), 0)
+
+    def reserve(self, num_tables, start, end, capacity):
+        """Hold num_tables over [start, end) if that many are free throughout; returns whether it did."""
+        slots = self.__slots(start, end)
+        with self.__lock:
+            if num_tables <= 0 or capacity - self.__reserved(slots) < num_tables:
+                return False
+            self.__hold(slots, num_tables)
+            return True
+
+    def reserve_many(self, reservations, capacity):
+        """
+        Hold every (num_tables, start, end) in reservations, or none of them.
+        Returns the index of the first reservation that did not fit, or None
+        when all were made.
+        """
+        slots = [self.__slots(start, end) for _, start, end in reservations]
+        with self.__lock:
+            made = []
+            for position, ((num_tables, _, _), span) in enumerate(zip(reservations, slots)):
+                if num_tables <= 0 or capacity - self.__reserved(span) < num_tables:
+                    for undo_span, undo_tables in made:
+                        self.__release(undo_span, undo_tables)
+                    return position
+                self.__hold(span, num_tables)
+                made.append((span, num_tables))
+            return None
+
+    def cancel(self, num_tables, start, end):
+        """Release tables held over exactly [start, end); returns False if fewer than that are held."""
+        slots = self.__slots(start, end)
+        with self.__lock:
+            if num_tables <= 0 or self.__held.get(slots, 0) < num_tables:
+                return False
+            self.__release(slots, num_tables)
+            return True
+
+    def __hold(self, slots, num_tables):
+        self.__held[slots] = self.__held.get(slots, 0) + num_tables
+        self.__add(1, 0, self.__size, slots[0], slots[1], num_tables)
+
+    def __release(self, slots, num_tables):
+        self.__store(self.__held, slots, self.__held[slots] - num_tables)
+        self.__add(1, 0, self.__size, slots[0], slots[1], -num_tables)
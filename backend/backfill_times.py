@@ -0,0 +1,51 @@
+import firebase_admin
+from firebase_admin import firestore, credentials
+
+from bulk import MAX_BATCH_WRITES, Progress
+from timeutil import epoch_fields
+
+TIME_FIELDS = ("start_time", "end_time", "expires")
+EPOCH_FIELDS = ("start_ts", "end_ts", "expires_ts")
+
+def backfill_collection(db, collection, progress, page_size=MAX_BATCH_WRITES):
+    """
+    Page through a collection by document ID and write start_ts/end_ts/expires_ts
+    wherever they are missing or out of date, one batch per page. Reruns only
+    rewrite what changed since.
+    """
+    query = db.collection(collection).select(list(TIME_FIELDS + EPOCH_FIELDS)).order_by("__name__").limit(page_size)
+    after = None
+    while True:
+        page = list((query.start_after([after]) if after is not None else query).stream())
+        if not page:
+            return
+        batch = db.batch()
+        updated = 0
+        for snapshot in page:
+            data = snapshot.to_dict()
+            fields = epoch_fields(data)
+            if any(data.get(field) != value for field, value in fields.items()):
+                batch.update(snapshot.reference, fields)
+                updated += 1
+        if updated:
+            batch.commit()
+        progress.add(processed=len(page), updated=updated, commits=1 if updated else 0)
+        after = page[-1].id
+
+def backfill_times(db, collections=("games", "events"), progress=None):
+    """Store epoch-second times on every game and event written before they were; returns the progress counts."""
+    progress = progress or Progress()
+    for collection in collections:
+        backfill_collection(db, collection, progress)
+        print(f"Backfilled {collection}: {progress.report()}")
+    return progress.snapshot()
+
+if __name__ == "__main__":
+    cred = credentials.Certificate("serviceAccountKey.json")
+    firebase_admin.initialize_app(cred)
+    db = firestore.client()
+
+    try:
+        print(f"Backfill complete: {backfill_times(db)}")
+    except Exception as e:
+        print(f"Error backfilling times: {e}")
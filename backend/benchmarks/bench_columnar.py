@@ -0,0 +1,64 @@
+"""
+Micro-benchmark: one filtered games-feed query (radius + time window + open
+seats + type, nearest first) over 100k games, as a Python loop over the
+records against the NumPy GameColumns store.
+
+Run from the backend directory: python benchmarks/bench_columnar.py [count]
+"""
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from columnar import GameColumns, to_epoch
+from spatial_index import haversine_km
+
+
+def make_games(count, seed=1):
+    rng = random.Random(seed)
+    games = []
+    for i in range(count):
+        start = rng.randrange(12, 22)
+        games.append({
+            "id": f"game{i:06d}", "xcoord": rng.uniform(51.4, 55.4), "ycoord": rng.uniform(-10.5, -5.4),
+            "game_type": rng.choice(["Trivia", "Poker", "Chess", "Darts", "Pool"]),
+            "start_time": f"2025-03-20T{start:02d}:00:00", "end_time": f"2025-03-20T{start + 2:02d}:00:00",
+            "expires": f"2025-03-20T{start + 3:02d}:00:00",
+            "max_players": 8, "participants": [f"P{j}" for j in range(rng.randrange(0, 9))],
+        })
+    return games
+
+
+def python_query(games, lat, lng, radius_km, active_at, open_seats, game_types):
+    hits = []
+    for game in games:
+        if game["game_type"] not in game_types or game["max_players"] - len(game["participants"]) < open_seats:
+            continue
+        if not to_epoch(game["start_time"]) <= active_at < to_epoch(game["end_time"]):
+            continue
+        distance = haversine_km(lat, lng, game["xcoord"], game["ycoord"])
+        if distance <= radius_km:
+            hits.append((distance, game["id"], game))
+    hits.sort(key=lambda hit: hit[:2])
+    return [dict(game, distance_km=round(distance, 3)) for distance, _, game in hits]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    games = make_games(count)
+    query = dict(lat=53.35, lng=-6.26, radius_km=25, active_at=to_epoch("2025-03-20T19:30:00"),
+                 open_seats=2, game_types=["Trivia", "Poker"])
+
+    started = time.perf_counter()
+    columns = GameColumns(games)
+    build = time.perf_counter() - started
+
+    python = min(timeit.repeat(lambda: python_query(games, **query), number=1, repeat=3))
+    vectorized = min(timeit.repeat(lambda: columns.query(**query), number=1, repeat=20))
+    assert [g["id"] for g in columns.query(**query)] == [g["id"] for g in python_query(games, **query)]
+    print(f"{count} games, {len(columns.query(**query))} matches: build {build * 1e3:.0f} ms (once per feed change)")
+    print(f"python loop: {python * 1e3:8.2f} ms   columnar: {vectorized * 1e3:6.2f} ms   "
+          f"speedup: {python / vectorized:5.1f}x")
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark: construction time and memory per game for the __slots__ game
+classes against the previous __dict__-backed classes that set every field
+through a setter call.
+
+Run from the backend directory: python benchmarks/bench_game.py
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from game import Game, SeatBasedGame
+
+
+class DictGame:
+    # The previous Game layout: per-instance __dict__, fields set through setters
+    def __init__(self, host, game_name, game_desc, game_type, start_time, end_time, expires,
+                 pub_id, location, xcoord, ycoord, max_players, is_private=False, access_code=None):
+        self.set_host(host)
+        self.set_game_name(game_name)
+        self.set_game_desc(game_desc)
+        self.set_game_type(game_type)
+        self.set_start_time(start_time)
+        self.set_end_time(end_time)
+        self.set_expires(expires)
+        self.set_pub_id(pub_id)
+        self.set_location(location)
+        self.set_xcoord(xcoord)
+        self.set_ycoord(ycoord)
+        self.set_max_players(max_players)
+        self.__is_private = is_private
+        self.__access_code = access_code
+        self.__participants = []
+
+    def set_host(self, host): self.__host = host
+    def set_game_name(self, game_name): self.__game_name = game_name
+    def set_game_desc(self, game_desc): self.__game_desc = game_desc
+    def set_game_type(self, game_type): self.__game_type = game_type
+    def set_start_time(self, start_time): self.__start_time = start_time
+    def set_end_time(self, end_time): self.__end_time = end_time
+    def set_expires(self, expires): self.__expires = expires
+    def set_pub_id(self, pub_id): self.__pub_id = pub_id
+    def set_location(self, location): self.__location = location
+    def set_xcoord(self, xcoord): self.__xcoord = xcoord
+    def set_ycoord(self, ycoord): self.__ycoord = ycoord
+    def set_max_players(self, max_players): self.__max_players = max_players
+
+
+class DictSeatBasedGame(DictGame):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.__seats = {i + 1: None for i in range(args[11])}
+
+
+# Field values are shared between instances so only the game objects themselves are measured
+ARGS = ("HOST1", "Trivia", "Weekly pub quiz", "Trivia", "2025-03-20T19:00:00", "2025-03-20T22:00:00",
+        "2025-03-20T23:00:00", "PUB1", "The Brazen Head", 53.3448, -6.2764, 8)
+
+
+def bytes_per_game(cls, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = [cls(*ARGS) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(games)
+
+
+def bench(label, old_cls, new_cls, count, repeat=5):
+    old = min(timeit.repeat(lambda: [old_cls(*ARGS) for _ in range(count)], number=1, repeat=repeat))
+    new = min(timeit.repeat(lambda: [new_cls(*ARGS) for _ in range(count)], number=1, repeat=repeat))
+    old_bytes, new_bytes = bytes_per_game(old_cls, count), bytes_per_game(new_cls, count)
+    print(f"{label:14} construct: {old / count * 1e6:6.2f} -> {new / count * 1e6:6.2f} us/game   "
+          f"memory: {old_bytes:6.0f} -> {new_bytes:6.0f} bytes/game")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    bench("Game", DictGame, Game, count)
+    bench("SeatBasedGame", DictSeatBasedGame, SeatBasedGame, count)
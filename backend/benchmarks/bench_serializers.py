@@ -0,0 +1,65 @@
+"""
+Micro-benchmark: per-document cost of the old per-field to_dict() comprehension
+in fetch_games/fetch_pubs against the shared Projection serializer.
+
+Run from the backend directory: python benchmarks/bench_serializers.py
+"""
+import copy
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from serializers import GAME_FIELDS, GAME_PROJECTION, PUB_FIELDS, PUB_PROJECTION
+
+
+class Snapshot:
+    # Mirrors DocumentSnapshot.to_dict(), which deep-copies the decoded fields on every call
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self.__data = data
+
+    def to_dict(self):
+        return copy.deepcopy(self.__data)
+
+
+def game_doc(i):
+    return Snapshot(f"game{i}", {
+        "game_name": f"Trivia {i}", "location": "The Brazen Head", "xcoord": 53.3448, "ycoord": -6.2764,
+        "start_time": "2025-03-20T19:00:00", "end_time": "2025-03-20T22:00:00",
+        "expires": "2025-03-20T23:00:00", "max_players": 8,
+        "participants": [f"P{j:04d}" for j in range(6)], "host": "HOST1",
+        "game_desc": "Weekly pub quiz, teams of up to four.", "game_type": "Trivia", "pub_id": "PUB1",
+        "game_code": "ABCD", "event_id": "EVENT1", "updated_slots": {f"{h}:00-{h + 1}:00": 20 for h in range(18, 23)},
+    })
+
+
+def pub_doc(i):
+    return Snapshot(f"pub{i}", {
+        "pub_name": f"Pub {i}", "address": "20 Bridge Street Lower, Dublin", "xcoord": 53.3448, "ycoord": -6.2764,
+        "BER": "B2", "pub_image_url": "https://storage.googleapis.com/niteout/pub.jpg",
+        "email": "pub@example.com", "events": [f"EVENT{j}" for j in range(20)], "tables": 12,
+    })
+
+
+def per_field(doc, fields):
+    record = {"id": doc.id}
+    for field in fields:
+        record[field] = doc.to_dict().get(field)
+    return record
+
+
+def bench(label, docs, fields, projection, repeat=5):
+    old = min(timeit.repeat(lambda: [per_field(doc, fields) for doc in docs], number=1, repeat=repeat))
+    new = min(timeit.repeat(lambda: projection.serialize_all(docs), number=1, repeat=repeat))
+    per_doc_old = old / len(docs) * 1e6
+    per_doc_new = new / len(docs) * 1e6
+    print(f"{label:6} per-field to_dict: {per_doc_old:8.2f} us/doc   "
+          f"projection: {per_doc_new:8.2f} us/doc   speedup: {per_doc_old / per_doc_new:5.1f}x")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    bench("games", [game_doc(i) for i in range(count)], GAME_FIELDS, GAME_PROJECTION)
+    bench("pubs", [pub_doc(i) for i in range(count)], PUB_FIELDS, PUB_PROJECTION)
@@ -0,0 +1,130 @@
+"""
+Concurrency benchmark: many hosts creating games for one event at once.
+Compares the old client-computed counts (read the event, subtract, write it
+back) with SlotCounter transactions on the event document and on a sharded
+event. Every Firestore round trip sleeps for the given latency, and
+transactions lock the documents they read, as the server client libraries do.
+
+Run from the backend directory: python benchmarks/bench_slot_counter.py [requests] [latency_ms]
+"""
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "tests")))
+
+from fake_firestore import FakeCollection, FakeDocument, FakeFirestore, FakeTransaction
+from slot_counter import SlotCounter
+
+SLOTS = ("19:00-20:00", "20:00-21:00", "21:00-22:00")
+
+
+class LatencyDocument(FakeDocument):
+    def get(self, field_paths=None, transaction=None):
+        if transaction is not None:
+            transaction.lock(self.path)
+        time.sleep(self._latency)
+        return super().get(field_paths, transaction)
+
+    def update(self, data):
+        time.sleep(self._latency)
+        super().update(data)
+
+
+class LatencyCollection(FakeCollection):
+    def document(self, doc_id=None):
+        document = LatencyDocument(self._db, self._collection, doc_id or self._db.next_id())
+        document._latency = self._db.latency
+        return document
+
+
+class LockingTransaction(FakeTransaction):
+    def __init__(self, db):
+        super().__init__(db)
+        self.held = []
+
+    def lock(self, path):
+        lock = self._db.document_lock(path)
+        lock.acquire()
+        self.held.append(lock)
+
+
+class LatencyFirestore(FakeFirestore):
+    """FakeFirestore with a round-trip delay and per-document transaction locks."""
+
+    def __init__(self, store, latency):
+        super().__init__(store)
+        self.latency = latency
+        self.__locks = defaultdict(threading.Lock)
+        self.__guard = threading.Lock()
+
+    def document_lock(self, path):
+        with self.__guard:
+            return self.__locks[path]
+
+    def collection(self, name):
+        return LatencyCollection(self, name)
+
+    def transaction(self):
+        return LockingTransaction(self)
+
+
+def locking_transactional(fn):
+    def run(transaction, *args):
+        try:
+            result = fn(transaction, *args)
+            time.sleep(transaction._db.latency)  # commit round trip
+            with transaction._db.lock:
+                transaction._commit()
+            return result
+        finally:
+            for lock in reversed(transaction.held):
+                lock.release()
+    return run
+
+
+def client_computed(db, players):
+    # The old flow: the client subtracts from the counts it read and the server writes them back
+    ref = db.collection("events").document("E1")
+    slots = ref.get().to_dict()["available_slots"]
+    if any(slots[key] < players for key in SLOTS[:2]):
+        return False
+    ref.update({"available_slots": dict(slots, **{key: slots[key] - players for key in SLOTS[:2]})})
+    return True
+
+
+def run(name, requests, capacity, latency, claim, shards=0):
+    db = LatencyFirestore({"events": {"E1": {"available_slots": dict.fromkeys(SLOTS, capacity)}}}, latency)
+    counter = SlotCounter(db, locking_transactional)
+    if shards:
+        counter.shard_event("E1", shards)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=64) as executor:
+        results = list(executor.map(lambda i: claim(db, counter), range(requests)))
+    elapsed = time.perf_counter() - started
+
+    successes = results.count(True)
+    left = counter.totals("E1")["19:00-20:00"]
+    correct = left == capacity - successes and left >= 0
+    print(f"{name:<22} {successes:>6} claimed  {left:>6} left (expected {capacity - successes:>6})  "
+          f"{'correct' if correct else 'WRONG':<7}  {requests / elapsed:8.0f} req/s")
+
+
+def transactional_claim(db, counter):
+    return counter.claim("E1", "2025-03-20T19:00:00", "2025-03-20T21:00:00", 1).ok
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 1.0) / 1000
+    # Room for everyone, then fewer places than requests so the last places are contested too
+    for capacity in (requests * 2, requests * 3 // 4):
+        print(f"\n{requests} concurrent game creations, {capacity} places, {latency * 1e3:.1f} ms per round trip")
+        run("client-computed", requests, capacity, latency, lambda db, counter: client_computed(db, 1))
+        run("transaction", requests, capacity, latency, transactional_claim)
+        run("sharded (10 shards)", requests, capacity, latency, transactional_claim, shards=10)
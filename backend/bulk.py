@@ -0,0 +1,81 @@
+import threading
+import time
+from itertools import islice
+
+# Firestore limits a batch to 500 writes
+MAX_BATCH_WRITES = 500
+# Document references per get_all round trip
+GET_ALL_CHUNK = 300
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def iter_chunks(iterable, size):
+    """chunked() for any iterable, such as a query stream, without materializing it."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def existing_ids(db, collection, ids, chunk_size=GET_ALL_CHUNK):
+    """The subset of ids that already have a document in collection, checked with chunked get_all calls."""
+    ids = list(ids)
+    found = set()
+    for chunk in chunked(ids, chunk_size):
+        refs = [db.collection(collection).document(doc_id) for doc_id in chunk]
+        # An empty field mask asks only whether each document exists
+        for snapshot in db.get_all(refs, field_paths=[]):
+            if snapshot.exists:
+                found.add(snapshot.id)
+    return found
+
+
+def commit_sets(db, writes, batch_size=MAX_BATCH_WRITES):
+    """Commit (document_ref, data) sets in batches of at most batch_size; returns the number of commits."""
+    writes = list(writes)
+    commits = 0
+    for chunk in chunked(writes, batch_size):
+        batch = db.batch()
+        for ref, data in chunk:
+            batch.set(ref, data)
+        batch.commit()
+        commits += 1
+    return commits
+
+
+class Progress:
+    """Thread-safe named counters for long-running jobs, with elapsed time and throughput."""
+
+    def __init__(self, rate_counter="processed", clock=time.monotonic):
+        self.__rate_counter = rate_counter
+        self.__clock = clock
+        self.__started = clock()
+        self.__counts = {}
+        self.__lock = threading.Lock()
+
+    def add(self, **counts):
+        with self.__lock:
+            for name, value in counts.items():
+                self.__counts[name] = self.__counts.get(name, 0) + value
+
+    def get(self, name):
+        with self.__lock:
+            return self.__counts.get(name, 0)
+
+    def snapshot(self):
+        with self.__lock:
+            counts = dict(self.__counts)
+        elapsed = self.__clock() - self.__started
+        counts["elapsed_seconds"] = round(elapsed, 3)
+        counts["per_second"] = round(counts.get(self.__rate_counter, 0) / elapsed, 1) if elapsed > 0 else 0.0
+        return counts
+
+    def report(self):
+        """One-line summary for log output."""
+        return ", ".join(f"{name}={value}" for name, value in self.snapshot().items())
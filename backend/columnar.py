@@ -0,0 +1,197 @@
+import threading
+
+import numpy as np
+
+from spatial_index import EARTH_RADIUS_KM, to_coord
+from timeutil import parse_timestamp
+
+SORT_FIELDS = ("distance", "start_time", "end_time", "expires")
+
+
+def to_epoch(value):
+    """parse_timestamp as a float column value, NaN when the time is missing or unparseable."""
+    ts = parse_timestamp(value)
+    return float("nan") if ts is None else float(ts)
+
+
+def parse_game_filter(args):
+    """
+    Parse the optional attribute filters of a games feed request:
+    starts_after / ends_before / active_at (ISO timestamps), open_seats,
+    game_type (comma separated) and sort. Returns None when none were given
+    and raises ValueError for malformed values.
+    """
+    game_filter = {}
+    for key in ("starts_after", "ends_before", "active_at"):
+        if key in args:
+            game_filter[key] = to_epoch(args[key])
+            if np.isnan(game_filter[key]):
+                raise ValueError(f"{key} must be an ISO-8601 timestamp")
+    if "open_seats" in args:
+        game_filter["open_seats"] = int(args["open_seats"])
+        if game_filter["open_seats"] < 1:
+            raise ValueError("open_seats must be a positive integer")
+    if "game_type" in args:
+        game_filter["game_types"] = [game_type for game_type in args["game_type"].split(",") if game_type]
+    if "sort" in args:
+        if args["sort"] not in SORT_FIELDS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_FIELDS)}")
+        game_filter["sort"] = args["sort"]
+    return game_filter or None
+
+
+class GameColumns:
+    """
+    Column-oriented copy of serialized game records (game details or feed
+    records): coordinates, epoch times, capacity and game type as NumPy
+    arrays, so a feed query is a handful of vectorized comparisons instead of
+    a Python loop over every game.
+    """
+
+    def __init__(self, records):
+        self.__records = list(records)
+        count = len(self.__records)
+        coord = lambda value: np.nan if to_coord(value) is None else to_coord(value)
+        self.__lat = np.fromiter((coord(record.get("xcoord")) for record in self.__records), np.float64, count)
+        self.__lng = np.fromiter((coord(record.get("ycoord")) for record in self.__records), np.float64, count)
+        self.__times = {field: np.fromiter((to_epoch(record.get(field)) for record in self.__records), np.float64, count)
+                        for field in ("start_time", "end_time", "expires")}
+        self.__open_seats = np.fromiter((int(record.get("max_players") or 0) - len(record.get("participants") or ())
+                                         for record in self.__records), np.int64, count)
+        self.__type_codes = {}
+        self.__types = np.fromiter((self.__type_codes.setdefault(record.get("game_type"), len(self.__type_codes))
+                                    for record in self.__records), np.int64, count)
+
+    def __len__(self):
+        return len(self.__records)
+
+    def get_records(self):
+        return self.__records
+
+    def query(self, lat=None, lng=None, radius_km=None, bbox=None, starts_after=None, ends_before=None,
+              active_at=None, open_seats=None, game_types=None, sort=None, limit=None):
+        """
+        Records matching every given filter:
+          lat/lng/radius_km       great-circle distance (adds "distance_km")
+          bbox                    (min_lat, min_lng, max_lat, max_lng)
+          starts_after            start_time >= value (epoch seconds)
+          ends_before             end_time <= value
+          active_at               start_time <= value < end_time
+          open_seats              max_players - len(participants) >= value
+          game_types              game_type in the given list
+        Sorted by sort (one of SORT_FIELDS; nearest first for radius queries,
+        otherwise the records' own order) and cut to limit. Records missing a
+        filtered field never match.
+        """
+        mask = np.ones(len(self.__records), dtype=bool)
+        if bbox is not None:
+            min_lat, min_lng, max_lat, max_lng = bbox
+            mask &= (self.__lat >= min_lat) & (self.__lat <= max_lat)
+            mask &= (self.__lng >= min_lng) & (self.__lng <= max_lng)
+        if starts_after is not None:
+            mask &= self.__times["start_time"] >= starts_after
+        if ends_before is not None:
+            mask &= self.__times["end_time"] <= ends_before
+        if active_at is not None:
+            mask &= (self.__times["start_time"] <= active_at) & (self.__times["end_time"] > active_at)
+        if open_seats is not None:
+            mask &= self.__open_seats >= open_seats
+        if game_types is not None:
+            codes = [self.__type_codes[game_type] for game_type in game_types if game_type in self.__type_codes]
+            mask &= np.isin(self.__types, codes)
+
+        distance = None
+        if radius_km is not None:
+            # Trig only for rows that passed the cheaper filters; NaN elsewhere
+            distance = np.full(len(self.__records), np.nan)
+            candidates = np.flatnonzero(mask)
+            distance[candidates] = self.__distance_km(lat, lng, candidates)
+            mask &= distance <= radius_km
+
+        rows = np.flatnonzero(mask)
+        if sort is None and distance is not None:
+            sort = "distance"
+        if sort == "distance" and distance is None:
+            raise ValueError("sort=distance needs lat, lng and radius_km")
+        if sort is not None:
+            keys = distance if sort == "distance" else self.__times[sort]
+            # Stable, so ties keep the records' own order; NaN (unknown) sorts last
+            rows = rows[np.argsort(keys[rows], kind="stable")]
+        if limit is not None:
+            rows = rows[:limit]
+
+        if distance is None:
+            return [self.__records[row] for row in rows]
+        return [dict(self.__records[row], distance_km=round(float(distance[row]), 3)) for row in rows]
+
+    def __distance_km(self, lat, lng, rows):
+        lat1, lng1 = np.radians(lat), np.radians(lng)
+        lat2, lng2 = np.radians(self.__lat[rows]), np.radians(self.__lng[rows])
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+        # Rows without coordinates get NaN, which fails every comparison
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def start_thread(target):
+    threading.Thread(target=target, name="feed-columns", daemon=True).start()
+
+
+class FeedColumns:
+    """
+    GameColumns over a FeedCache. The first get() builds them; after that a
+    change to the feed's snapshot starts one rebuild through spawn (a daemon
+    thread by default) and get() keeps returning the previous columns until
+    the new ones are swapped in, so requests never wait on a rebuild.
+    """
+
+    def __init__(self, feed, spawn=start_thread):
+        self.__feed = feed
+        self.__spawn = spawn
+        self.__snapshot = None
+        self.__columns = None
+        self.__rebuilding = False
+        self.__lock = threading.Lock()
+
+    def get(self):
+        snapshot = self.__feed.snapshot()
+        with self.__lock:
+            if self.__columns is None:
+                self.__columns = GameColumns(snapshot)
+                self.__snapshot = snapshot
+            # The feed hands out the same list object until its contents change
+            start = snapshot is not self.__snapshot and not self.__rebuilding
+            if start:
+                self.__rebuilding = True
+        if start:
+            self.__spawn(self.__rebuild)
+        with self.__lock:
+            return self.__columns
+
+    def __rebuild(self):
+        # Loops until the columns match the feed, so changes made mid-rebuild are not left out
+        try:
+            while True:
+                snapshot = self.__feed.snapshot()
+                columns = GameColumns(snapshot)
+                with self.__lock:
+                    self.__columns = columns
+                    self.__snapshot = snapshot
+                    if self.__feed.snapshot() is snapshot:
+                        self.__rebuilding = False
+                        return
+        except Exception as e:
+            print(f"Error rebuilding feed columns: {e}")
+            with self.__lock:
+                self.__rebuilding = False
+
+    def query(self, geo_filter=None, game_filter=None):
+        """Run a feed query given parse_geo_filter/parse_game_filter results."""
+        options = dict(game_filter or {})
+        if geo_filter is not None:
+            options["limit"] = geo_filter["limit"]
+            if "radius_km" in geo_filter:
+                options.update(lat=geo_filter["lat"], lng=geo_filter["lng"], radius_km=geo_filter["radius_km"])
+            elif "min_lat" in geo_filter:
+                options["bbox"] = (geo_filter["min_lat"], geo_filter["min_lng"],
+                                   geo_filter["max_lat"], geo_filter["max_lng"])
+        return self.get().query(**options)
@@ -1,11 +1,23 @@
 import firebase_admin
 from firebase_admin import auth, firestore, credentials
+from concurrent.futures import ThreadPoolExecutor
+import argparse
 
-cred = credentials.Certificate("serviceAccountKey.json")
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+from bulk import Progress, commit_sets, existing_ids, iter_chunks
+from permissions import ROLE_CAPABILITIES
 
-def create_account_permissions():
+# The stored documents follow the shared role capability table
+PUBLICAN_PERMISSIONS = dict(ROLE_CAPABILITIES['publican'])
+GAMER_PERMISSIONS = dict(ROLE_CAPABILITIES['player'])
+
+# (source collection, permissions, collections that take precedence for the same ID)
+# Publicans go first, as in the one-by-one backfill
+ROLES = (
+    ('publicans', PUBLICAN_PERMISSIONS, ()),
+    ('gamers', GAMER_PERMISSIONS, ('publicans',)),
+)
+
+def create_account_permissions(db):
     try:
         publican_ref = db.collection('publicans')
         publican_docs = publican_ref.stream()
@@ -20,21 +32,11 @@ def create_account_permissions():
 
             if existing_perm.exists:
                 print(f"Skipping existing publican permission {email}.")
-                continue  
-
-            publican_perm_data = {
-                'can_create_events': True,
-                'can_update_details': True,
-                'can_create_games': False,
-                'can_add_remove_friends': False,
-                'can_join_leave_games': False,
-                'can_ban_gamers': True,
-                'can_delete_games': True,
-            }
-
-            perm_ref.set(publican_perm_data)
+                continue
+
+            perm_ref.set(PUBLICAN_PERMISSIONS)
             print(f"Added new publican permission {email} to Firestore")
-        
+
         gamer_ref = db.collection('gamers')
         gamer_docs = gamer_ref.stream()
 
@@ -48,22 +50,71 @@ def create_account_permissions():
 
             if existing_perm.exists:
                 print(f"Skipping existing gamer permission {email}.")
-                continue  
-
-            gamer_perm_data = {
-                'can_create_events': False,
-                'can_update_details': True,
-                'can_create_games': True,
-                'can_add_remove_friends': True,
-                'can_join_leave_games': True,
-                'can_ban_gamers': False,
-                'can_delete_games': False,
-            }
-
-            perm_ref.set(gamer_perm_data)
+                continue
+
+            perm_ref.set(GAMER_PERMISSIONS)
             print(f"Added new gamer permission {email} to Firestore")
 
     except Exception as e:
         print(f"Error creating permissions: {e}")
 
-create_account_permissions()
\ No newline at end of file
+def backfill_role(db, collection, permissions, precedence, page_size, dry_run, progress):
+    """Add the missing permissions documents for every document ID in one source collection."""
+    report = {'scanned': 0, 'existing': 0, 'other_role': 0, 'missing': 0}
+    # Only document IDs are needed, so stream an empty projection
+    for page in iter_chunks((doc.id for doc in db.collection(collection).select([]).stream()), page_size):
+        ids = page
+        # IDs that also belong to a role with precedence are left to that role's scan
+        for other in precedence:
+            owned = existing_ids(db, other, ids)
+            report['other_role'] += len(owned)
+            ids = [doc_id for doc_id in ids if doc_id not in owned]
+        existing = existing_ids(db, 'permissions', ids)
+        missing = [doc_id for doc_id in ids if doc_id not in existing]
+
+        if not dry_run:
+            commit_sets(db, [(db.collection('permissions').document(doc_id), permissions) for doc_id in missing])
+        report['scanned'] += len(page)
+        report['existing'] += len(existing)
+        report['missing'] += len(missing)
+        progress.add(processed=len(page), **{'would_create' if dry_run else 'created': len(missing)})
+        print(f"{collection}: {progress.report()}")
+    return report
+
+def backfill_permissions(db, dry_run=False, page_size=500, progress=None):
+    """
+    Bulk, idempotent version of create_account_permissions: both source
+    collections are scanned concurrently, existing permission IDs are
+    prefetched per page with get_all, and missing documents are written in
+    batches. With dry_run nothing is written and the report says what would be.
+    Returns {collection: {scanned, existing, other_role, missing}} plus the
+    progress counters under "progress".
+    """
+    progress = progress or Progress()
+    with ThreadPoolExecutor(max_workers=len(ROLES)) as executor:
+        futures = {collection: executor.submit(backfill_role, db, collection, permissions, precedence,
+                                               page_size, dry_run, progress)
+                   for collection, permissions, precedence in ROLES}
+        report = {collection: future.result() for collection, future in futures.items()}
+    report['progress'] = progress.snapshot()
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create missing permissions documents.")
+    parser.add_argument("--bulk", action="store_true", help="batched, concurrent backfill")
+    parser.add_argument("--dry-run", action="store_true", help="report without writing (implies --bulk)")
+    args = parser.parse_args()
+    # Only the bulk backfill can report without writing
+    args.bulk = args.bulk or args.dry_run
+
+    cred = credentials.Certificate("serviceAccountKey.json")
+    firebase_admin.initialize_app(cred)
+    db = firestore.client()
+
+    if args.bulk:
+        try:
+            print(f"Permissions backfill {'(dry run) ' if args.dry_run else ''}report: {backfill_permissions(db, args.dry_run)}")
+        except Exception as e:
+            print(f"Error creating permissions: {e}")
+    else:
+        create_account_permissions(db)
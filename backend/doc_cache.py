@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+
+from documents import LocalDocument
+
+
+class DocumentCache:
+    """
+    LRU + TTL cache of Firestore documents keyed by (collection, document_id).
+
+    Reads go through get()/get_async() with a loader that fetches the snapshot
+    on a miss; writes made by this app call invalidate() so the next read sees
+    them. Missing documents are cached too, so repeated lookups of unknown IDs
+    do not reach Firestore either.
+
+    Every invalidation is tagged with a generation number. A load records the
+    generation it started at (generation()) and put(since=...) drops its
+    result if the document was invalidated in the meantime, so a slow read
+    cannot put back data older than a write that finished during it.
+    """
+
+    def __init__(self, max_entries=5000, ttl=60, clock=time.monotonic):
+        self.__max_entries = max_entries
+        self.__ttl = ttl
+        self.__clock = clock
+        self.__entries = OrderedDict()
+        # key -> generation of its last invalidation, for the most recent max_entries keys;
+        # older invalidations are only known to be at or before __floor
+        self.__invalidated = OrderedDict()
+        self.__generation = self.__floor = 0
+        self.__lock = threading.Lock()
+        self.__stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def peek(self, collection, doc_id):
+        """The cached document, or None on a miss; counts towards hit/miss metrics."""
+        key = (collection, doc_id)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[1] <= self.__clock():
+                del self.__entries[key]
+                self.__stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self.__stats["misses"] += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.__stats["hits"] += 1
+            return entry[0]
+
+    def generation(self):
+        """Current invalidation generation; take it before loading a document to put()."""
+        with self.__lock:
+            return self.__generation
+
+    def put(self, collection, doc_id, snapshot, since=None):
+        """
+        Cache a loaded snapshot and return it as a document. With `since` (the
+        generation() taken before the load), nothing is cached if the document
+        has been invalidated after it.
+        """
+        # to_dict() hands out a copy, so callers can merge into what they get back
+        document = LocalDocument(doc_id, snapshot.to_dict() if snapshot.exists else None)
+        with self.__lock:
+            key = (collection, doc_id)
+            if since is not None and self.__invalidated.get(key, self.__floor) > since:
+                return document
+            self.__entries[key] = (document, self.__clock() + self.__ttl)
+            self.__entries.move_to_end((collection, doc_id))
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+                self.__stats["evictions"] += 1
+        return document
+
+    def get(self, collection, doc_id, load):
+        """Cached document, calling load() for the snapshot on a miss."""
+        document = self.peek(collection, doc_id)
+        if document is None:
+            since = self.generation()
+            document = self.put(collection, doc_id, load(), since)
+        return document
+
+    async def get_async(self, collection, doc_id, load):
+        """Same as get() with an async loader."""
+        document = self.peek(collection, doc_id)
+        if document is None:
+            since = self.generation()
+            document = self.put(collection, doc_id, await load(), since)
+        return document
+
+    def invalidate(self, collection, doc_id):
+        key = (collection, doc_id)
+        with self.__lock:
+            self.__generation += 1
+            self.__invalidated[key] = self.__generation
+            self.__invalidated.move_to_end(key)
+            if len(self.__invalidated) > self.__max_entries:
+                _, self.__floor = self.__invalidated.popitem(last=False)
+            if self.__entries.pop(key, None) is not None:
+                self.__stats["invalidations"] += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__generation += 1
+            self.__floor = self.__generation
+            self.__invalidated.clear()
+            self.__entries.clear()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def stats(self):
+        with self.__lock:
+            stats = dict(self.__stats, size=len(self.__entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
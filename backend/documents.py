@@ -0,0 +1,16 @@
+class LocalDocument:
+    """
+    A document held in memory that reads like a Firestore DocumentSnapshot
+    (id, exists, to_dict(), get()); data is None for a missing document.
+    """
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self.exists = data is not None
+        self.__data = data
+
+    def to_dict(self):
+        return dict(self.__data) if self.__data is not None else None
+
+    def get(self, field):
+        return self.__data.get(field) if self.__data is not None else None
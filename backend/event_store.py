@@ -0,0 +1,109 @@
+import bisect
+import itertools
+
+from timeutil import now_ts, parse_timestamp
+
+
+def to_ts(value):
+    # Query bounds may already be epoch seconds (or infinite)
+    return value if isinstance(value, (int, float)) else parse_timestamp(value)
+
+
+class EventStore:
+    """
+    Events keyed by event ID, in creation order, with a sorted index on start
+    time (epoch seconds) for upcoming and range queries, plus a
+    (start_time, game_type) lookup for deleting by slot.
+
+    Deletes are O(1): the event leaves the dicts straight away and its start
+    index entry is skipped until the next compaction, which runs once stale
+    entries outnumber live ones. Events whose start_time cannot be parsed are
+    stored but never match time queries.
+    """
+
+    def __init__(self):
+        self.__events = {}
+        self.__by_slot = {}
+        self.__start_index = []  # (start_ts, sequence, event_id), sorted
+        self.__indexed = {}  # event_id -> sequence of its live index entry
+        self.__stale = 0
+        self.__sequence = itertools.count()
+        self.__ids = itertools.count(1)
+
+    def __len__(self):
+        return len(self.__events)
+
+    def __iter__(self):
+        return iter(self.__events.values())
+
+    def __contains__(self, event_id):
+        return event_id in self.__events
+
+    def add(self, event, event_id=None):
+        """Store event under event_id (or the next free "E<n>" ID) and return the ID."""
+        if event_id is None:
+            event_id = next(self.__ids)
+            while f"E{event_id}" in self.__events:
+                event_id = next(self.__ids)
+            event_id = f"E{event_id}"
+        self.remove(event_id)
+        self.__events[event_id] = event
+        self.__by_slot.setdefault((event.get("start_time"), event.get("game_type")), {})[event_id] = None
+        start = parse_timestamp(event.get("start_time"))
+        if start is not None:
+            sequence = next(self.__sequence)
+            self.__indexed[event_id] = sequence
+            bisect.insort(self.__start_index, (start, sequence, event_id))
+        return event_id
+
+    def get(self, event_id):
+        return self.__events.get(event_id)
+
+    def remove(self, event_id):
+        """Remove and return an event, or None if there is none with that ID."""
+        event = self.__events.pop(event_id, None)
+        if event is None:
+            return None
+        slot = (event.get("start_time"), event.get("game_type"))
+        ids = self.__by_slot[slot]
+        del ids[event_id]
+        if not ids:
+            del self.__by_slot[slot]
+        if self.__indexed.pop(event_id, None) is not None:
+            self.__stale += 1
+            if self.__stale > len(self.__events):
+                self.__compact()
+        return event
+
+    def find(self, start_time, game_type):
+        """ID of the earliest-added event in a (start_time, game_type) slot, or None."""
+        ids = self.__by_slot.get((start_time, game_type))
+        return next(iter(ids)) if ids else None
+
+    def between(self, start, end, limit=None):
+        """
+        Events starting in [start, end) (epoch seconds or timestamp strings),
+        earliest first. Raises ValueError if a bound is not a valid time.
+        """
+        start, end = to_ts(start), to_ts(end)
+        if start is None or end is None:
+            raise ValueError("between bounds must be epoch seconds or ISO-8601 timestamps")
+        position = bisect.bisect_left(self.__start_index, (start,))
+        found = []
+        index = self.__start_index
+        for event_start, sequence, event_id in (index[i] for i in range(position, len(index))):
+            if event_start >= end or (limit is not None and len(found) >= limit):
+                break
+            # Entries of removed (or since re-added) events are stale
+            if self.__indexed.get(event_id) == sequence:
+                found.append(self.__events[event_id])
+        return found
+
+    def upcoming(self, now=None, limit=None):
+        """Events starting at or after now (default the current time), earliest first."""
+        now = now_ts() if now is None else now
+        return self.between(now, float("inf"), limit)
+
+    def __compact(self):
+        self.__start_index = [entry for entry in self.__start_index if self.__indexed.get(entry[2]) == entry[1]]
+        self.__stale = 0
@@ -0,0 +1,326 @@
+import hashlib
+import heapq
+import secrets
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+from documents import LocalDocument
+from pagination import order_key, record_values
+from spatial_index import GeoGrid
+from timeutil import format_local, now_ts, parse_timestamp
+
+
+class FeedCache:
+    """
+    Process-local materialized view of a Firestore query.
+
+    The view is kept fresh by an on_snapshot listener (see attach) and can be
+    filled directly from a query result while the listener is still starting
+    (see load). expires_field is parsed to epoch seconds once per record when
+    it is ingested; records whose expiry is no longer in the future are
+    dropped on the next read, so expired games never leave the cache.
+
+    Every change bumps a version number. Clients holding a cursor from
+    get_cursor() can ask for only the records changed since (changes_since);
+    removed and expired IDs are kept as tombstones for max_tombstones changes.
+
+    snapshot() is ordered by (order_by..., id), which defaults to the expiry
+    field, so it can be paginated with pagination.paginate_records.
+
+    Changes keep that order, and each record's dumps() encoding, up to date
+    as they arrive (bisect inserts and deletes), so a read after a change
+    copies or joins what is there instead of re-sorting and re-encoding the
+    whole feed. The ETag is a sum of per-record hashes, also kept as records
+    come and go.
+    """
+
+    def __init__(self, serialize, expires_field=None, clock=now_ts, dumps=None, max_tombstones=10000,
+                 order_by=None):
+        self.__serialize = serialize
+        self.__expires_field = expires_field
+        if order_by is None:
+            order_by = (expires_field,) if expires_field else ()
+        self.__order_by = tuple(order_by)
+        self.__clock = clock
+        self.__dumps = dumps
+        self.__lock = threading.RLock()
+        self.__ready = threading.Event()
+        self.__records = {}
+        self.__expires_at = {}
+        self.__expiry_heap = []
+        self.__index = GeoGrid()
+        # Sort keys, records and encoded records of the live set, all in snapshot order
+        self.__sort_keys = []
+        self.__sorted = []
+        self.__fragments = []
+        self.__sort_key_of = {}
+        self.__digests = {}
+        self.__digest_sum = 0
+        self.__version = 0
+        self.__snapshot = None
+        self.__payload = None
+        self.__etag = None
+        self.__watch = None
+        # Delta sync state: per-record change version, tombstones and the oldest usable cursor
+        self.__epoch = secrets.token_hex(4)
+        self.__changed_at = {}
+        self.__tombstones = OrderedDict()
+        self.__max_tombstones = max_tombstones
+        self.__horizon = 0
+
+    # Lifecycle
+    def attach(self, query):
+        """Start listening to query; the first snapshot marks the cache as ready."""
+        self.detach()
+        self.__watch = query.on_snapshot(self.on_snapshot)
+        return self.__watch
+
+    def detach(self):
+        if self.__watch is not None:
+            self.__watch.unsubscribe()
+            self.__watch = None
+
+    def is_ready(self):
+        return self.__ready.is_set()
+
+    def wait_ready(self, timeout=None):
+        return self.__ready.wait(timeout)
+
+    def get_version(self):
+        return self.__version
+
+    def __len__(self):
+        with self.__lock:
+            self.__purge_expired()
+            return len(self.__records)
+
+    # Writes
+    def load(self, docs):
+        """Replace the whole view with a query result (read-through fill)."""
+        with self.__lock:
+            self.__records.clear()
+            self.__expires_at.clear()
+            self.__expiry_heap.clear()
+            self.__index.clear()
+            self.__sort_keys.clear()
+            self.__sorted.clear()
+            self.__fragments.clear()
+            self.__sort_key_of.clear()
+            self.__digests.clear()
+            self.__digest_sum = 0
+            self.__changed_at.clear()
+            self.__tombstones.clear()
+            for doc in docs:
+                self.__put(doc.id, self.__serialize(doc))
+            self.__changed()
+            # Earlier cursors cannot be answered with a delta after a full reload
+            self.__horizon = self.__version
+            self.__ready.set()
+
+    def on_snapshot(self, docs, changes, read_time):
+        """Listener callback: apply the incremental ADDED/MODIFIED/REMOVED changes."""
+        with self.__lock:
+            for change in changes:
+                doc = change.document
+                if change.type.name == "REMOVED":
+                    self.__drop(doc.id)
+                else:
+                    self.__put(doc.id, self.__serialize(doc))
+            if changes or not self.__ready.is_set():
+                self.__changed()
+            self.__ready.set()
+
+    def __put(self, key, record):
+        self.__drop(key)
+        expires = parse_timestamp(record.get(self.__expires_field)) if self.__expires_field else None
+        if self.__expires_field and (expires is None or expires <= self.__clock()):
+            return
+        self.__records[key] = record
+        self.__index.insert(key, record.get("xcoord"), record.get("ycoord"))
+        sort_key = order_key(record_values(record, self.__order_by))
+        position = bisect_left(self.__sort_keys, sort_key)
+        self.__sort_keys.insert(position, sort_key)
+        self.__sorted.insert(position, record)
+        self.__sort_key_of[key] = sort_key
+        if self.__dumps is not None:
+            fragment = self.__dumps(record)
+            self.__fragments.insert(position, fragment)
+            digest = int.from_bytes(hashlib.blake2b(fragment.encode("utf-8"), digest_size=16).digest(), "big")
+            self.__digests[key] = digest
+            self.__digest_sum = (self.__digest_sum + digest) % (1 << 128)
+        self.__tombstones.pop(key, None)
+        self.__changed_at[key] = self.__version + 1
+        if expires is not None:
+            self.__expires_at[key] = expires
+            heapq.heappush(self.__expiry_heap, (expires, key))
+
+    def __drop(self, key):
+        # Heap entries for dropped keys are skipped lazily in __purge_expired
+        if self.__records.pop(key, None) is None:
+            return
+        self.__expires_at.pop(key, None)
+        self.__index.remove(key)
+        position = bisect_left(self.__sort_keys, self.__sort_key_of.pop(key))
+        del self.__sort_keys[position]
+        del self.__sorted[position]
+        if self.__dumps is not None:
+            del self.__fragments[position]
+            self.__digest_sum = (self.__digest_sum - self.__digests.pop(key)) % (1 << 128)
+        self.__changed_at.pop(key, None)
+        self.__tombstones.pop(key, None)
+        self.__tombstones[key] = self.__version + 1
+        if len(self.__tombstones) > self.__max_tombstones:
+            _, version = self.__tombstones.popitem(last=False)
+            self.__horizon = max(self.__horizon, version)
+
+    def __changed(self):
+        self.__version += 1
+        self.__snapshot = None
+        self.__payload = None
+        self.__etag = None
+
+    def __purge_expired(self):
+        if not self.__expiry_heap:
+            return
+        now = self.__clock()
+        purged = False
+        while self.__expiry_heap and self.__expiry_heap[0][0] <= now:
+            expires, key = heapq.heappop(self.__expiry_heap)
+            if self.__expires_at.get(key) == expires:
+                self.__drop(key)
+                purged = True
+        if purged:
+            self.__changed()
+
+    # Reads
+    def snapshot(self):
+        """All live records, ordered by (order_by..., id) like the Firestore query."""
+        with self.__lock:
+            self.__purge_expired()
+            # A copy, so lists already handed out never change under their readers
+            if self.__snapshot is None:
+                self.__snapshot = list(self.__sorted)
+            return self.__snapshot
+
+    def get_order_by(self):
+        return self.__order_by
+
+    def payload(self):
+        """The snapshot as a JSON array of the records' dumps encodings, cached until the view next changes."""
+        with self.__lock:
+            self.__purge_expired()
+            if self.__payload is None:
+                self.__payload = "[" + ",".join(self.__fragments) + "]"
+            return self.__payload
+
+    def etag(self):
+        """Content hash of the records in payload(), usable as a strong ETag."""
+        with self.__lock:
+            self.__purge_expired()
+            if self.__etag is None:
+                summary = f"{len(self.__fragments)}:{self.__digest_sum:032x}".encode("ascii")
+                self.__etag = hashlib.blake2b(summary, digest_size=16).hexdigest()
+            return self.__etag
+
+    def get_cursor(self):
+        """Opaque cursor for the current version, to be passed back to changes_since."""
+        with self.__lock:
+            self.__purge_expired()
+            return f"{self.__epoch}.{self.__version}"
+
+    def changes_since(self, cursor):
+        """
+        Records created or updated and IDs removed or expired since cursor, as
+        (updated, removed, new_cursor). Returns None when the cursor is unknown or
+        too old to answer with a delta, in which case the client needs a full resync.
+        """
+        epoch, _, version = (cursor or "").partition(".")
+        with self.__lock:
+            self.__purge_expired()
+            if epoch != self.__epoch or not version.isdigit():
+                return None
+            since = int(version)
+            if since < self.__horizon or since > self.__version:
+                return None
+            updated = [record for key, record in self.__records.items() if self.__changed_at.get(key, 0) > since]
+            updated.sort(key=lambda record: record["id"])
+            removed = sorted(key for key, changed in self.__tombstones.items() if changed > since)
+            return updated, removed, f"{self.__epoch}.{self.__version}"
+
+    def get(self, key):
+        with self.__lock:
+            self.__purge_expired()
+            return self.__records.get(key)
+
+    def get_expires_at(self, key):
+        """Epoch-second expiry of a live record, or None."""
+        with self.__lock:
+            return self.__expires_at.get(key)
+
+    def get_index(self):
+        """The GeoGrid over the live records, for use with apply_geo_filter."""
+        with self.__lock:
+            self.__purge_expired()
+            return self.__index
+
+
+class LocalChangeType:
+    def __init__(self, name):
+        self.name = name
+
+
+class LocalChange:
+    def __init__(self, name, document):
+        self.type = LocalChangeType(name)
+        self.document = document
+
+
+class LocalWatch:
+    def __init__(self, collection, callback):
+        self.__collection = collection
+        self.callback = callback
+
+    def unsubscribe(self):
+        self.__collection.unsubscribe(self)
+
+
+class LocalCollection:
+    """
+    In-memory stand-in for a Firestore collection/query, used in tests and
+    local runs: supports stream() and delivers on_snapshot callbacks
+    synchronously whenever set() or delete() is called.
+    """
+
+    def __init__(self, docs=None):
+        self.__docs = dict(docs or {})
+        self.__watches = []
+
+    def stream(self):
+        return iter([LocalDocument(doc_id, data) for doc_id, data in self.__docs.items()])
+
+    def on_snapshot(self, callback):
+        watch = LocalWatch(self, callback)
+        self.__watches.append(watch)
+        docs = list(self.stream())
+        callback(docs, [LocalChange("ADDED", doc) for doc in docs], format_local())
+        return watch
+
+    def unsubscribe(self, watch):
+        if watch in self.__watches:
+            self.__watches.remove(watch)
+
+    def set(self, doc_id, data):
+        name = "MODIFIED" if doc_id in self.__docs else "ADDED"
+        self.__docs[doc_id] = dict(data)
+        self.__notify(LocalChange(name, LocalDocument(doc_id, self.__docs[doc_id])))
+
+    def delete(self, doc_id):
+        data = self.__docs.pop(doc_id, None)
+        if data is not None:
+            self.__notify(LocalChange("REMOVED", LocalDocument(doc_id, data)))
+
+    def __notify(self, change):
+        docs = list(self.stream())
+        for watch in list(self.__watches):
+            watch.callback(docs, [change], format_local())
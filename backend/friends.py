@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from bulk import chunked
+from serializers import Projection
+
+# Firestore caps the number of values in an "in" filter
+IN_QUERY_LIMIT = 30
+
+# Missing fields are left out, so friend_summary's defaults apply to them only
+FRIEND_PROJECTION = Projection(["gamerId", "fullName", "profile", "statusMessage"], id_field="docId", skip_missing=True)
+
+
+def friend_summary(friend_id, friend_data):
+    """The friend entry returned by /api/fetch_friends; defaults fill in fields the document lacks."""
+    if not friend_data:
+        return {"gamerId": friend_id, "fullName": "Unknown User", "profile": "03"}
+    return {
+        "gamerId": friend_id,
+        "fullName": friend_data.get("fullName", "Unknown"),
+        "profile": friend_data.get("profile", "01"),
+        "statusMessage": friend_data.get("statusMessage", ""),
+    }
+
+
+class FriendResolver:
+    """
+    Resolves lists of public gamer IDs to gamer documents in bulk.
+
+    A gamerId -> document ID index lets known friends be fetched directly by
+    key with a single get_all; the rest are looked up with concurrent "in"
+    queries of up to IN_QUERY_LIMIT IDs, which also fills the index. A lookup
+    that fails only loses its own IDs, which come back as not found.
+    """
+
+    def __init__(self, db, collection="gamers", max_workers=4):
+        self.__db = db
+        self.__collection = collection
+        self.__max_workers = max_workers
+        self.__index = {}
+        self.__lock = threading.Lock()
+
+    def remember(self, gamer_id, doc_id):
+        with self.__lock:
+            self.__index[gamer_id] = doc_id
+
+    def forget(self, gamer_id):
+        with self.__lock:
+            self.__index.pop(gamer_id, None)
+
+    def lookup(self, gamer_id):
+        with self.__lock:
+            return self.__index.get(gamer_id)
+
+    def __fetch_by_key(self, doc_ids):
+        collection = self.__db.collection(self.__collection)
+        refs = [collection.document(doc_id) for doc_id in doc_ids]
+        snapshots = self.__db.get_all(refs, field_paths=list(FRIEND_PROJECTION.get_fields()))
+        return [FRIEND_PROJECTION(doc) for doc in snapshots if doc.exists]
+
+    def __fetch_by_query(self, gamer_ids):
+        query = self.__db.collection(self.__collection).where("gamerId", "in", gamer_ids)
+        return FRIEND_PROJECTION.serialize_all(FRIEND_PROJECTION.select(query).stream())
+
+    def resolve(self, gamer_ids):
+        """Return {gamerId: friend data} for every ID that matches a gamer document."""
+        gamer_ids = list(dict.fromkeys(gamer_ids))
+        with self.__lock:
+            known = {gamer_id: self.__index[gamer_id] for gamer_id in gamer_ids if gamer_id in self.__index}
+        unknown = [gamer_id for gamer_id in gamer_ids if gamer_id not in known]
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            keyed = executor.submit(self.__fetch_by_key, list(known.values())) if known else None
+            queried = [executor.submit(self.__fetch_by_query, chunk) for chunk in chunked(unknown, IN_QUERY_LIMIT)]
+
+            found = {}
+            keyed_records = self.__result(keyed, "by key") if keyed is not None else []
+            for record in keyed_records or []:
+                gamer_id = record.get("gamerId")
+                if gamer_id is not None and known.get(gamer_id) == record["docId"]:
+                    found[gamer_id] = record
+            # Index entries that no longer match (deleted doc, changed or removed gamerId) fall back to a query,
+            # as do all of them when the get_all failed
+            stale = [gamer_id for gamer_id in known if gamer_id not in found]
+            queried += [executor.submit(self.__fetch_by_query, chunk) for chunk in chunked(stale, IN_QUERY_LIMIT)]
+
+            for future in queried:
+                for record in self.__result(future, "by query") or []:
+                    if record.get("gamerId") is not None:
+                        found.setdefault(record["gamerId"], record)
+
+        with self.__lock:
+            # Only a successful get_all shows an entry is stale
+            for gamer_id in stale if keyed_records is not None else []:
+                self.__index.pop(gamer_id, None)
+            for gamer_id, record in found.items():
+                self.__index[gamer_id] = record["docId"]
+        return found
+
+    @staticmethod
+    def __result(future, lookup):
+        # None for a failed lookup, so one bad chunk does not fail the whole request
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Error fetching friends {lookup}: {e}")
+            return None
+
+    def fetch_friend_details(self, friends_list):
+        """Friend summaries in friends_list order, including placeholders for unknown IDs."""
+        found = self.resolve(friends_list)
+        return [friend_summary(friend_id, found.get(friend_id)) for friend_id in friends_list]
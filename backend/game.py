@@ -1,21 +1,30 @@
+from timeutil import now_ts, parse_timestamp
+
+
 class Game:
+    # Fixed attribute slots instead of a per-instance __dict__; feeds hold tens of thousands of games
+    __slots__ = ("__host", "__game_name", "__game_desc", "__game_type", "__start_time", "__end_time",
+                 "__expires", "__pub_id", "__location", "__xcoord", "__ycoord", "__max_players",
+                 "__is_private", "__access_code", "__participants")
+
     def __init__(self, host, game_name, game_desc, game_type, start_time, end_time, expires,
                  pub_id, location, xcoord, ycoord, max_players, is_private=False, access_code=None):
-        self.set_host(host)
-        self.set_game_name(game_name)
-        self.set_game_desc(game_desc)
-        self.set_game_type(game_type)
-        self.set_start_time(start_time)
-        self.set_end_time(end_time)
-        self.set_expires(expires)
-        self.set_pub_id(pub_id)
-        self.set_location(location)
-        self.set_xcoord(xcoord)
-        self.set_ycoord(ycoord)
-        self.set_max_players(max_players)
+        self.__host = host
+        self.__game_name = game_name
+        self.__game_desc = game_desc
+        self.__game_type = game_type
+        self.__start_time = start_time
+        self.__end_time = end_time
+        self.__expires = expires
+        self.__pub_id = pub_id
+        self.__location = location
+        self.__xcoord = xcoord
+        self.__ycoord = ycoord
+        self.__max_players = max_players
         self.__is_private = is_private
         self.__access_code = access_code
-        self.__participants = []
+        # dict used as an insertion-ordered set: O(1) membership/removal, join order kept
+        self.__participants = {}
 
     # Get functions
     def get_host(self): return self.__host  
@@ -25,12 +34,18 @@ class Game:
     def get_start_time(self): return self.__start_time
     def get_end_time(self): return self.__end_time
     def get_expires(self): return self.__expires
+    # Epoch-second times, parsed on first use; parse_timestamp memoizes the shared slot strings
+    def get_start_ts(self): return parse_timestamp(self.__start_time)
+    def get_end_ts(self): return parse_timestamp(self.__end_time)
+    def get_expires_ts(self): return parse_timestamp(self.__expires)
     def get_pub_id(self): return self.__pub_id
     def get_location(self): return self.__location
     def get_xcoord(self): return self.__xcoord
     def get_ycoord(self): return self.__ycoord
     def get_max_players(self): return self.__max_players
-    def get_participants(self): return self.__participants
+    def get_participants(self): return list(self.__participants)
+    def has_participant(self, participant): return participant in self.__participants
+    def get_participant_count(self): return len(self.__participants)
     def is_private(self): return self.__is_private
     def get_access_code(self): return self.__access_code
 
@@ -50,13 +65,18 @@ class Game:
     def set_private(self, is_private): self.__is_private = is_private
     def set_access_code(self, code): self.__access_code = code
 
+    # Whether the game has expired (games with no parseable expiry never do)
+    def is_expired(self, now=None):
+        expires_ts = self.get_expires_ts()
+        return expires_ts is not None and expires_ts <= (now_ts() if now is None else now)
+
     # Add participant
     def add_participant(self, participant, code=None):
         if self.__is_private and self.__access_code != code:
             return "Access denied. Invalid access code."
 
         if len(self.__participants) < self.__max_players:
-            self.__participants.append(participant)
+            self._add_participant(participant)
             return f"{participant} has joined the game."
         else:
             return "Game is full."
@@ -64,10 +84,17 @@ class Game:
     # Remove participant
     def remove_participant(self, participant):
         if participant in self.__participants:
-            self.__participants.remove(participant)
+            self._discard_participant(participant)
             return f"{participant} has left the game."
         return "Participant not found."
 
+    # Participant bookkeeping shared with the seat/table subclasses
+    def _add_participant(self, participant):
+        self.__participants[participant] = None
+
+    def _discard_participant(self, participant):
+        self.__participants.pop(participant, None)
+
     # Get game details
     def get_game_details(self):
         return {
@@ -83,18 +110,21 @@ class Game:
             "ycoord": self.__ycoord,
             "expires": self.__expires,
             "max_players": self.__max_players,
-            "participants": self.__participants,
+            "participants": list(self.__participants),
             "is_private": self.__is_private,
             "access_code": self.__access_code
         }
 
 
 class SeatBasedGame(Game):
+    __slots__ = ("__seats", "__seat_of")
+
     def __init__(self, host, game_name, game_desc, game_type, start_time, end_time, expires,
                  pub_id, location, xcoord, ycoord, max_players, is_private=False, access_code=None):
         super().__init__(host, game_name, game_desc, game_type, start_time, end_time, expires,
                          pub_id, location, xcoord, ycoord, max_players, is_private, access_code)
         self.__seats = {i + 1: None for i in range(max_players)}  # Initialize seats
+        self.__seat_of = {}  # participant -> seat number
 
     # Reserve a specific seat
     def reserve_seat(self, participant, seat_number, code=None):
@@ -105,21 +135,26 @@ class SeatBasedGame(Game):
             return "Invalid seat number."
         if self.__seats[seat_number] is not None:
             return "Seat already taken."
-        if participant in self.get_participants():
+        if self.has_participant(participant):
             return f"{participant} has already joined the game."
         
         self.__seats[seat_number] = participant
-        self.get_participants().append(participant)
+        self.__seat_of[participant] = seat_number
+        self._add_participant(participant)
         return f"{participant} has reserved seat {seat_number}."
 
     # Cancel seat reservation
     def cancel_reservation(self, participant):
-        for seat, occupant in self.__seats.items():
-            if occupant == participant:
-                self.__seats[seat] = None
-                self.get_participants().remove(participant)
-                return f"{participant}'s reservation for seat {seat} has been canceled."
-        return "Participant not found."
+        seat = self.__seat_of.pop(participant, None)
+        if seat is None:
+            return "Participant not found."
+        self.__seats[seat] = None
+        self._discard_participant(participant)
+        return f"{participant}'s reservation for seat {seat} has been canceled."
+
+    # Seat number held by a participant, or None
+    def get_seat(self, participant):
+        return self.__seat_of.get(participant)
 
     # Get seat details
     def get_seat_details(self):
@@ -127,11 +162,15 @@ class SeatBasedGame(Game):
 
 
 class TableBasedGame(Game):
+    __slots__ = ("__tables", "__table_of")
+
     def __init__(self, host, game_name, game_desc, game_type, start_time, end_time, expires,
                  pub_id, location, xcoord, ycoord, max_players, tables, is_private=False, access_code=None):
         super().__init__(host, game_name, game_desc, game_type, start_time, end_time, expires,
                          pub_id, location, xcoord, ycoord, max_players, is_private, access_code)
-        self.__tables = {table: [] for table in tables}  # Initialize tables
+        # Each table's occupants as an insertion-ordered set
+        self.__tables = {table: {} for table in tables}
+        self.__table_of = {}  # participant -> table name
 
     # Reserve a spot at a specific table
     def reserve_table_spot(self, participant, table_name, code=None):
@@ -142,22 +181,27 @@ class TableBasedGame(Game):
             return "Table not found."
         if len(self.__tables[table_name]) >= (self.get_max_players() // len(self.__tables)):
             return "Table is full."
-        if participant in self.get_participants():
+        if self.has_participant(participant):
             return f"{participant} has already joined the game."
 
-        self.__tables[table_name].append(participant)
-        self.get_participants().append(participant)
+        self.__tables[table_name][participant] = None
+        self.__table_of[participant] = table_name
+        self._add_participant(participant)
         return f"{participant} has reserved a spot at {table_name}."
 
     # Cancel table reservation
     def cancel_table_reservation(self, participant):
-        for table, participants in self.__tables.items():
-            if participant in participants:
-                participants.remove(participant)
-                self.get_participants().remove(participant)
-                return f"{participant}'s reservation at {table} has been canceled."
-        return "Participant not found."
+        table = self.__table_of.pop(participant, None)
+        if table is None:
+            return "Participant not found."
+        del self.__tables[table][participant]
+        self._discard_participant(participant)
+        return f"{participant}'s reservation at {table} has been canceled."
+
+    # Table a participant is seated at, or None
+    def get_table(self, participant):
+        return self.__table_of.get(participant)
 
     # Get table details
     def get_table_details(self):
-        return self.__tables
+        return {table: list(participants) for table, participants in self.__tables.items()}
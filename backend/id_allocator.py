@@ -0,0 +1,144 @@
+import hashlib
+import math
+import string
+import threading
+
+ALPHABET = string.ascii_uppercase + string.digits
+ID_LENGTH = 5
+KEYSPACE = len(ALPHABET) ** ID_LENGTH  # 60,466,176 five-character IDs
+# Every worker must use the same key, or their permutations (and so their IDs) could overlap
+DEFAULT_KEY = b"niteout-ids"
+
+
+def encode_id(number, length=ID_LENGTH):
+    """Fixed-width base-36 encoding of number using ALPHABET."""
+    chars = []
+    for _ in range(length):
+        number, digit = divmod(number, len(ALPHABET))
+        chars.append(ALPHABET[digit])
+    if number:
+        raise ValueError("number does not fit in the ID length")
+    return "".join(reversed(chars))
+
+
+class FeistelPermutation:
+    """
+    Keyed bijection on range(size), so consecutive counter values map to
+    unrelated-looking IDs while staying unique. A balanced Feistel network on
+    a side x side square covers the range; outputs past size are walked back
+    into it (cycle walking).
+    """
+
+    def __init__(self, size=KEYSPACE, key=DEFAULT_KEY, rounds=4):
+        self.__size = size
+        self.__side = math.isqrt(size - 1) + 1
+        self.__round_keys = [hashlib.blake2b(key, digest_size=8, person=b"round%d" % i).digest() for i in range(rounds)]
+
+    def __round(self, value, round_key):
+        digest = hashlib.blake2b(value.to_bytes(8, "big"), digest_size=8, key=round_key).digest()
+        return int.from_bytes(digest, "big") % self.__side
+
+    def __encrypt(self, value):
+        left, right = divmod(value, self.__side)
+        for round_key in self.__round_keys:
+            left, right = right, (left + self.__round(right, round_key)) % self.__side
+        return left * self.__side + right
+
+    def __call__(self, value):
+        if not 0 <= value < self.__size:
+            raise ValueError("value outside the permutation's range")
+        value = self.__encrypt(value)
+        while value >= self.__size:
+            value = self.__encrypt(value)
+        return value
+
+
+class LocalBlockSource:
+    """In-process counter blocks; unique within one process only."""
+
+    def __init__(self, start=0, limit=KEYSPACE):
+        self.__next = start
+        self.__limit = limit
+        self.__lock = threading.Lock()
+
+    def reserve(self, size):
+        with self.__lock:
+            start = self.__next
+            if start >= self.__limit:
+                raise RuntimeError("ID keyspace exhausted")
+            self.__next = min(start + size, self.__limit)
+            return start, self.__next
+
+
+class FirestoreBlockSource:
+    """
+    Counter blocks reserved from a shared counters/{name} document in a
+    transaction run with `transactional` (firestore.transactional), so every
+    worker gets a disjoint range.
+    """
+
+    def __init__(self, db, transactional, name, collection="counters", limit=KEYSPACE):
+        self.__db = db
+        self.__transactional = transactional
+        self.__ref = db.collection(collection).document(name)
+        self.__limit = limit
+
+    def reserve(self, size):
+        return self.__transactional(self.__reserve)(self.__db.transaction(), size)
+
+    def __reserve(self, transaction, size):
+        snapshot = self.__ref.get(transaction=transaction)
+        start = (snapshot.get("next") or 0) if snapshot.exists else 0
+        if start >= self.__limit:
+            raise RuntimeError("ID keyspace exhausted")
+        end = min(start + size, self.__limit)
+        transaction.set(self.__ref, {"next": end}, merge=True)
+        return start, end
+
+
+def legacy_ids(db, collection, *fields):
+    """
+    Loader for the IDs stored in `fields` of a collection's documents, for
+    IdAllocator's `taken`: IDs issued at random before the counters existed.
+    """
+    def load():
+        taken = set()
+        for snapshot in db.collection(collection).select(list(fields)).stream():
+            taken.update(value for value in (snapshot.get(field) for field in fields) if isinstance(value, str))
+        return taken
+    return load
+
+
+class IdAllocator:
+    """
+    Collision-free five-character IDs in O(1): counter values come from
+    blocks reserved up front (one round trip per block_size IDs), and each is
+    passed through a FeistelPermutation and base-36 encoded. Distinct counter
+    values always give distinct IDs, so nothing needs to be checked or retried.
+
+    `taken`, if given, is called once, before the first ID, for the IDs
+    handed out some other way (see legacy_ids); counter values mapping to one
+    of those are skipped.
+    """
+
+    def __init__(self, block_source, block_size=1000, permutation=None, taken=None):
+        self.__block_source = block_source
+        self.__block_size = block_size
+        self.__permutation = permutation or FeistelPermutation()
+        self.__load_taken = taken
+        self.__taken = None
+        self.__next = self.__end = 0
+        self.__lock = threading.Lock()
+
+    def next_id(self):
+        with self.__lock:
+            if self.__taken is None:
+                self.__taken = self.__load_taken() if self.__load_taken is not None else frozenset()
+            while True:
+                if self.__next >= self.__end:
+                    self.__next, self.__end = self.__block_source.reserve(self.__block_size)
+                value = self.__next
+                self.__next += 1
+                new_id = encode_id(self.__permutation(value))
+                if new_id not in self.__taken:
+                    return new_id
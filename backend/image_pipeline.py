@@ -0,0 +1,147 @@
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Variant names and their maximum widths, smallest first
+VARIANT_WIDTHS = (("thumb", 160), ("small", 480), ("medium", 960), ("large", 1600))
+# Served when a client asks for no particular width
+DEFAULT_VARIANT = "medium"
+# Encoded formats: file extension -> (Pillow format, content type, save options)
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+# Variant paths include the source's content hash, so a path's bytes never change
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Larger sources are refused rather than decoded (decompression bombs)
+MAX_PIXELS = 40_000_000
+
+
+def variant_names(manifest):
+    """Variant names of a manifest, narrowest first."""
+    return sorted(manifest["widths"], key=lambda name: manifest["widths"][name][0])
+
+
+def variant_url(manifest, width=None, image_format=None):
+    """
+    URL of the narrowest variant at least `width` pixels wide (the widest if
+    none is, DEFAULT_VARIANT if no width is given), as WebP when the client
+    asks for it and JPEG otherwise.
+    """
+    names = variant_names(manifest)
+    if width is None:
+        name = DEFAULT_VARIANT if DEFAULT_VARIANT in manifest["widths"] else names[-1]
+    else:
+        name = next((name for name in names if manifest["widths"][name][0] >= width), names[-1])
+    extension = image_format if image_format in manifest["formats"] else "jpeg"
+    return f"{manifest['base']}/{name}.{extension}"
+
+
+def with_image_variant(record, width=None, image_format=None, url_field="pub_image_url", manifest_field="pub_image_variants"):
+    """Copy of a feed record with url_field pointing at its best variant; records without variants are returned as is."""
+    manifest = record.get(manifest_field)
+    if not manifest:
+        return record
+    return dict(record, **{url_field: variant_url(manifest, width, image_format)})
+
+
+def parse_variant_args(args):
+    """(image_width, image_format) from query args, or None when a client asks for neither."""
+    width, image_format = args.get("image_width"), args.get("image_format")
+    if width is None and image_format is None:
+        return None
+    if width is not None:
+        width = int(width)
+        if width <= 0:
+            raise ValueError("image_width must be positive")
+    if image_format is not None and image_format not in FORMATS:
+        raise ValueError(f"image_format must be one of {sorted(FORMATS)}")
+    return width, image_format
+
+
+def open_image(source):
+    """Open and orient an uploaded image (bytes or a file object); raises ValueError if it is not one."""
+    try:
+        image = Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+        if image.width * image.height > MAX_PIXELS:
+            raise ValueError("Image is too large.")
+        # JPEGs can decode straight at a reduced scale when every variant is much smaller
+        image.draft("RGB", (VARIANT_WIDTHS[-1][1], VARIANT_WIDTHS[-1][1]))
+        image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ValueError("Not a valid image.") from e
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+    return image
+
+
+def render_variants(image):
+    """
+    Resize an opened image to every VARIANT_WIDTHS width it reaches (never
+    upscaling), widest first, each from the previous one. Returns
+    [(name, image)], one per distinct width.
+    """
+    widths = {}
+    for name, width in VARIANT_WIDTHS:
+        widths.setdefault(min(width, image.width), name)
+    variants = []
+    for width in sorted(widths, reverse=True):
+        if width < image.width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        variants.append((widths[width], image))
+    return variants
+
+
+def encode(image, extension):
+    pillow_format, _, options = FORMATS[extension]
+    if pillow_format == "JPEG" and image.mode == "RGBA":
+        # JPEG has no alpha channel, so transparent areas go white
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
+
+
+class ImagePipeline:
+    """
+    Turns an uploaded image into resized WebP and JPEG variants stored in a
+    Cloud Storage bucket under {prefix}/{owner}/{content hash}/{variant}.{ext}.
+    Since the path changes whenever the image does, every blob is uploaded
+    with an immutable, year-long Cache-Control and can sit in any CDN or
+    client cache. publish() returns the manifest clients pick URLs from with
+    variant_url().
+    """
+
+    def __init__(self, bucket, prefix="pub_images", max_workers=8):
+        self.__bucket = bucket
+        self.__prefix = prefix
+        self.__max_workers = max_workers
+
+    def publish(self, owner_id, source):
+        """Store every variant of source (bytes or a file object) and return its manifest."""
+        data = source if isinstance(source, bytes) else source.read()
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        path = f"{self.__prefix}/{owner_id}/{digest}"
+        variants = render_variants(open_image(data))
+
+        # Encode here, then overlap the uploads' round trips
+        uploads = [(f"{path}/{name}.{extension}", encode(image, extension), FORMATS[extension][1])
+                   for name, image in variants for extension in FORMATS]
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            list(executor.map(lambda upload: self.__upload(*upload), uploads))
+
+        return {
+            "base": self.__bucket.blob(path).public_url,
+            "widths": {name: [image.width, image.height] for name, image in variants},
+            "formats": list(FORMATS),
+        }
+
+    def __upload(self, blob_name, data, content_type):
+        blob = self.__bucket.blob(blob_name)
+        blob.cache_control = CACHE_CONTROL
+        blob.upload_from_string(data, content_type=content_type)
+        blob.make_public()
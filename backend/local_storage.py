@@ -0,0 +1,95 @@
+import io
+import os
+import tempfile
+from urllib.parse import quote
+
+from werkzeug.utils import safe_join
+
+
+class LocalBlobWriter(io.RawIOBase):
+    """
+    Write side of LocalBlob.open("wb"). Data goes to a temporary file next to
+    the target and is moved into place on close, so readers never see a
+    partial file; leaving a with block on an exception (or calling
+    terminate) discards it, like an abandoned resumable upload.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.__path = path
+        descriptor, self.__temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".upload-")
+        self.__file = os.fdopen(descriptor, "wb")
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.__file.write(data)
+
+    def close(self):
+        if not self.closed:
+            self.__file.close()
+            os.replace(self.__temp_path, self.__path)
+        super().close()
+
+    def terminate(self):
+        if not self.closed:
+            self.__file.close()
+            os.remove(self.__temp_path)
+        super().close()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.terminate()
+        else:
+            self.close()
+
+
+class LocalBlob:
+    def __init__(self, bucket, name, path):
+        self.bucket = bucket
+        self.name = name
+        self.cache_control = None
+        self.__path = path
+
+    @property
+    def public_url(self):
+        return f"{self.bucket.base_url}/{quote(self.name)}"
+
+    def open(self, mode="wb", chunk_size=None, content_type=None, **kwargs):
+        if mode != "wb":
+            raise ValueError("LocalBlob only supports opening for binary writes")
+        return LocalBlobWriter(self.__path)
+
+    def upload_from_string(self, data, content_type=None):
+        with self.open("wb") as file:
+            file.write(data)
+
+    def make_public(self):
+        # Everything under the root is served as is
+        pass
+
+    def exists(self):
+        return os.path.isfile(self.__path)
+
+    def delete(self):
+        os.remove(self.__path)
+
+
+class LocalBucket:
+    """
+    Filesystem stand-in for the Cloud Storage bucket: blobs are files under
+    root and public URLs point at base_url (the /images route in main.py).
+    Covers the blob calls the upload code makes: open("wb"),
+    upload_from_string, make_public and public_url.
+    """
+
+    def __init__(self, root, base_url):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def blob(self, name):
+        path = safe_join(os.path.abspath(self.root), name)
+        if path is None:
+            raise ValueError(f"Blob name escapes the storage root: {name}")
+        return LocalBlob(self, name, path)
@@ -3,12 +3,31 @@ from flask_apscheduler import APScheduler
 from Gamer import Gamer
 from Publican import Publican
 from game import Game, SeatBasedGame, TableBasedGame
+from spatial_index import parse_geo_filter, apply_geo_filter
+from feed_cache import FeedCache
+from serializers import GAME_PROJECTION, PUB_PROJECTION
+from friends import FriendResolver
+from pagination import GAME_ORDER, PUB_ORDER, parse_page_args, paginate_records, paginate_query
+from streaming import stream_format, iter_stream
+from columnar import FeedColumns, parse_game_filter
+from timeutil import epoch_fields, now_ts
+from sweeper import ExpirySweeper
+from slot_counter import SlotCounter, DEFAULT_SHARDS
+from permissions import PermissionEngine
+from async_db import AsyncFirestore
+from user_types import UserTypeCache
+from doc_cache import DocumentCache
+from image_pipeline import ImagePipeline, parse_variant_args, variant_url, with_image_variant
+from local_storage import LocalBucket
+from uploads import StreamingUploads, iter_request
+from id_allocator import FirestoreBlockSource, IdAllocator, legacy_ids
 from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
-from firebase_admin import credentials, firestore, storage, initialize_app
+from werkzeug.exceptions import RequestEntityTooLarge
+from firebase_admin import credentials, firestore, firestore_async, storage, initialize_app
 from flask import jsonify, request
-import moment
 
+import asyncio
 import os
 import time
 import firebase_admin
@@ -21,6 +40,8 @@ app.config.from_object(Config())
 app.config['UPLOAD_FOLDER'] = 'backend/assets'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+# Files in UPLOAD_FOLDER keep their names when replaced, so they are cached for a day and revalidated by ETag
+IMAGE_MAX_AGE = 24 * 60 * 60
 
 scheduler = APScheduler()
 scheduler.init_app(app)
@@ -36,21 +57,114 @@ else:
     default_app = firebase_admin.get_app()
 
 bucket = storage.bucket('niteout-storage-49dc5', app=default_app)
+# Uploads go to Cloud Storage, or under UPLOAD_FOLDER (served by /images) when LOCAL_UPLOADS is set
+upload_bucket = LocalBucket(app.config['UPLOAD_FOLDER'], "/images") if os.environ.get("LOCAL_UPLOADS") else bucket
 db_firestore = firestore.client()
+# Resized WebP/JPEG variants of uploaded pub images, stored in the bucket under content-hashed paths
+image_pipeline = ImagePipeline(upload_bucket)
+# Async client for views that issue independent reads/writes concurrently
+async_firestore = AsyncFirestore(lambda: firestore_async.client(default_app))
+# users/{id} -> publican or gamer, so profile writes can skip the users read
+user_types = UserTypeCache()
+# Cached permissions/{user_id} capability checks for the route decorators below
+permission_engine = PermissionEngine(db_firestore)
+# Transactional (optionally sharded) accounting of events' available_slots
+slot_counter = SlotCounter(db_firestore, firestore.transactional)
+# Gamer IDs come from a counter shared by every worker, skipping the random IDs issued before it
+Gamer.set_id_allocator(IdAllocator(FirestoreBlockSource(db_firestore, firestore.transactional, "gamer_ids"),
+                                   taken=legacy_ids(db_firestore, "gamers", "gamerId", "gamer_id")))
+# Short-lived cache of users/gamers/publican documents; writes below invalidate it
+doc_cache = DocumentCache()
+
+# Read a document through doc_cache, loading it with the sync client on a miss
+def cached_document(collection, doc_id):
+    return doc_cache.get(collection, doc_id, db_firestore.collection(collection).document(doc_id).get)
+
+# Async variant of cached_document for the async views
+async def cached_document_async(collection, doc_id):
+    return await doc_cache.get_async(collection, doc_id, lambda: async_firestore.get_document(collection, doc_id))
+
+# Games store epoch-second expires_ts next to their time strings (backfill_times.py fills in older ones)
+def active_games_query():
+    return db_firestore.collection("games").where("expires_ts", ">", now_ts())
+
+# In-memory view of unexpired games, kept fresh by a Firestore listener
+games_feed = FeedCache(GAME_PROJECTION, expires_field="expires_ts", dumps=app.json.dumps, order_by=GAME_ORDER)
+games_feed.attach(active_games_query())
+# NumPy column view of games_feed for attribute filters (time window, open seats, type)
+games_columns = FeedColumns(games_feed)
+pubs_feed = FeedCache(PUB_PROJECTION, dumps=app.json.dumps, order_by=PUB_ORDER)
+pubs_feed.attach(db_firestore.collection("publicans"))
+
+# Batched friend lookups with a gamerId -> document ID index
+friend_resolver = FriendResolver(db_firestore)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-@app.route('/images/<filename>')
+# Images pass allowed_file and magic-byte checks and are streamed into upload_bucket without buffering
+streaming_uploads = StreamingUploads(upload_bucket, allowed_file, max_bytes=app.config['MAX_CONTENT_LENGTH'])
+
+@app.route('/images/<path:filename>')
 def serve_image(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    return send_from_directory(app.config['UPLOAD_FOLDER'], filename, max_age=IMAGE_MAX_AGE)
+
+# Streams the "image" part of a multipart body straight into storage; returns its URL
+@app.route("/api/upload_image", methods=["POST"])
+@permission_engine.require("can_update_details", "user_id")
+def upload_image():
+    boundary = request.mimetype_params.get("boundary")
+    if request.mimetype != "multipart/form-data" or not boundary:
+        return jsonify({"error": "Expected a multipart/form-data body"}), 400
+
+    try:
+        result = streaming_uploads.receive(iter_request(request.stream), boundary, request.args["user_id"])
+        return jsonify(result), 201
+    except RequestEntityTooLarge:
+        return jsonify({"error": "Image is too large"}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error uploading image: {e}")
+        return jsonify({"error": "Failed to upload image"}), 500
+
+# Stores resized variants of a pub's image and points the publican document at them
+@app.route("/api/upload_pub_image", methods=["POST"])
+@permission_engine.require("can_update_details", "pub_id")
+def upload_pub_image():
+    pub_id = request.args.get("pub_id")
+    image_file = request.files.get("image")
+    if image_file is None or image_file.filename == "":
+        return jsonify({"error": "No image file provided"}), 400
+    if not allowed_file(image_file.filename):
+        return jsonify({"error": "Unsupported image type"}), 400
+
+    try:
+        pub_ref = db_firestore.collection("publicans").document(pub_id)
+        if not pub_ref.get(field_paths=[]).exists:
+            return jsonify({"error": "Publican not found"}), 404
+        manifest = image_pipeline.publish(pub_id, image_file.stream)
+        # pub_image_url stays for clients that do not ask for a variant
+        image_url = variant_url(manifest)
+        pub_ref.update({"pub_image_url": image_url, "pub_image_variants": manifest})
+        return jsonify({"pub_image_url": image_url, "pub_image_variants": manifest}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error uploading pub image: {e}")
+        return jsonify({"error": "Failed to upload pub image"}), 500
 
 
 
+# Archives expired games and events in bounded, rate-limited batches so the hot collections stay small
+expiry_sweeper = ExpirySweeper(db_firestore)
+
 # Define a function to perform the refresh
 def refresh_data():
-    # Include logic to refresh or update data here
-    print("Data refreshed at interval")
+    archived = expiry_sweeper.sweep()
+    # Sharded events keep their totals in shard documents; copy them back for clients reading the event
+    synced = slot_counter.sync_totals()
+    print(f"Data refreshed at interval, archived expired documents: {archived}, synced sharded events: {synced}")
 
 # Schedule the function to run every 10 minutes
 scheduler.add_job(id='Scheduled Task', func=refresh_data, trigger='interval', minutes=30)
@@ -66,31 +180,40 @@ Returns:
 """
 
 @app.route("/api/create_game", methods=["POST"])
+@permission_engine.require("can_create_games", "host")
 def create_game():
     try:
         game_data = request.get_json()
 
         required_fields = [
             "game_name", "start_time", "end_time", "pub_id", "host",
-            "location", "max_players", "event_id", "game_code",
-            "updated_slots", "game_type"
+            "location", "max_players", "event_id", "game_code", "game_type"
         ]
         if not all(field in game_data for field in required_fields):
             return jsonify({"error": "Missing required fields."}), 400
 
-        batch = db_firestore.batch()
+        # Slot counts are worked out server-side; a client-computed updated_slots is ignored
+        game_data.pop("updated_slots", None)
+        game_data.update(epoch_fields(game_data))
 
         game_doc_ref = db_firestore.collection("games").document()
-        batch.set(game_doc_ref, game_data)
-
-        event_doc_ref = db_firestore.collection("events").document(game_data["event_id"])
-
-        batch.update(event_doc_ref, {"available_slots": game_data["updated_slots"]})
-
         host_doc_ref = db_firestore.collection("gamers").document(game_data["host"])
-        batch.update(host_doc_ref, {"hosted_games": firestore.ArrayUnion([game_doc_ref.id])})
 
-        batch.commit()
+        # Committed in the same transaction as the slot claim
+        def write_game(transaction):
+            transaction.set(game_doc_ref, game_data)
+            transaction.update(host_doc_ref, {"hosted_games": firestore.ArrayUnion([game_doc_ref.id])})
+
+        try:
+            claim = slot_counter.claim(game_data["event_id"], game_data["start_time"], game_data["end_time"],
+                                       game_data["max_players"], then=write_game)
+        except KeyError:
+            return jsonify({"error": "Event not found."}), 404
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if not claim.ok:
+            return jsonify({"error": claim.message}), 409
+        doc_cache.invalidate("gamers", game_data["host"])
 
         return jsonify({"message": "Game created successfully!", "gameId": game_doc_ref.id}), 201 
 
@@ -98,6 +221,78 @@ def create_game():
         print(f"Error creating game: {e}")
         return jsonify({"error": str(e)}), 500
 
+# Deletes a hosted game and gives its places back to the event in the same transaction
+@app.route("/api/delete_game", methods=["POST"])
+@permission_engine.require("can_create_games", "host")
+def delete_game():
+    data = request.get_json()
+    game_id = data.get("game_id")
+    if not game_id:
+        return jsonify({"error": "game_id is required"}), 400
+
+    try:
+        game_doc_ref = db_firestore.collection("games").document(game_id)
+        game = game_doc_ref.get()
+        if not game.exists:
+            return jsonify({"error": "Game not found."}), 404
+        game_data = game.to_dict()
+        if game_data.get("host") != data["host"]:
+            return jsonify({"error": "Permission denied: not this host's game"}), 403
+        participants = game_data.get("participants", [])
+
+        # Refuses the release if another request deleted the game first
+        def remove_game(transaction):
+            if not game_doc_ref.get(transaction=transaction).exists:
+                return False
+            transaction.delete(game_doc_ref)
+            transaction.update(db_firestore.collection("gamers").document(game_data["host"]),
+                               {"hosted_games": firestore.ArrayRemove([game_id])})
+            for participant in participants:
+                transaction.update(db_firestore.collection("gamers").document(participant),
+                                   {"joined_games": firestore.ArrayRemove([game_id])})
+
+        try:
+            released = slot_counter.release(game_data["event_id"], game_data["start_time"], game_data["end_time"],
+                                            game_data["max_players"], then=remove_game)
+        except (KeyError, ValueError) as e:
+            # The event is gone or its slots no longer fit the game's times, so there are
+            # no places to give back; the game is still deleted
+            print(f"Not releasing slots for game {game_id}: {e}")
+            released = None
+            if firestore.transactional(remove_game)(db_firestore.transaction()) is False:
+                return jsonify({"error": "Game not found."}), 404
+        if released is not None and not released.ok:
+            return jsonify({"error": "Game not found."}), 404
+        for gamer_id in [game_data["host"], *participants]:
+            doc_cache.invalidate("gamers", gamer_id)
+
+        return jsonify({"message": "Game deleted successfully!"}), 200
+    except Exception as e:
+        print(f"Error deleting game: {e}")
+        return jsonify({"error": str(e)}), 500
+
+# Splits a busy event's slot counts over shard documents, so concurrent game creation stops contending on the event
+@app.route("/api/shard_event_slots", methods=["POST"])
+@permission_engine.require("can_create_events", "pub_id")
+def shard_event_slots():
+    data = request.get_json()
+    event_id = data.get("event_id")
+    if not event_id:
+        return jsonify({"error": "event_id is required"}), 400
+
+    try:
+        event = db_firestore.collection("events").document(event_id).get()
+        if not event.exists:
+            return jsonify({"error": "Event not found."}), 404
+        if event.get("pub_id") != data["pub_id"]:
+            return jsonify({"error": "Permission denied: not this pub's event"}), 403
+        sharded = slot_counter.shard_event(event_id, data.get("shards", DEFAULT_SHARDS))
+        return jsonify({"event_id": event_id, "sharded": sharded}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
 #  To store Gamer UID
 @app.route("/api/store_gamer_id", methods=["POST"])
 def store_gamer_id():
@@ -112,6 +307,8 @@ def store_gamer_id():
         # Store or update the gamer ID in the database
         gamers_ref = db_firestore.collection("gamers").document(gamer_id)
         gamers_ref.set({"gamerId": gamer_id, "email": email}, merge=True)
+        friend_resolver.remember(gamer_id, gamer_id)
+        doc_cache.invalidate("gamers", gamer_id)
 
         return jsonify({"message": "Gamer ID stored successfully"}), 200
 
@@ -128,52 +325,164 @@ def get_location():
     except Exception as e:
         return jsonify({"error": f"Error retrieving location: {str(e)}"}), 500
 
+# Hit/miss counters for the document cache
+@app.route("/api/cache_stats", methods=["GET"])
+def cache_stats():
+    return jsonify(doc_cache.stats()), 200
+
+# Counters for the scheduled expiry sweeper
+@app.route("/api/sweeper_stats", methods=["GET"])
+def sweeper_stats():
+    return jsonify(expiry_sweeper.get_metrics()), 200
+
+# Adds an ETag (content hash unless one is given) and answers If-None-Match with 304
+def conditional_response(response, etag=None):
+    if etag is None:
+        response.add_etag()
+    else:
+        response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+# Full feed from memory, with the cursor clients pass back as ?since= for deltas
+# transform, if given, rewrites each record for this client, so the pre-serialized payload is bypassed
+def feed_response(feed, transform=None):
+    cursor = feed.get_cursor()
+    if transform is not None:
+        response = jsonify([transform(record) for record in feed.snapshot()])
+        response.headers["X-Feed-Cursor"] = cursor
+        return conditional_response(response)
+    response = app.response_class(feed.payload(), status=200, mimetype="application/json")
+    response.headers["X-Feed-Cursor"] = cursor
+    return conditional_response(response, feed.etag())
+
+# Records created/updated and IDs removed/expired since the cursor; full resync if the cursor is stale
+def feed_delta_response(feed, since, geo_filter=None, transform=None):
+    delta = feed.changes_since(since)
+    if delta is None:
+        cursor = feed.get_cursor()
+        updated, removed, full = feed.snapshot(), [], True
+    else:
+        updated, removed, cursor = delta
+        full = False
+    if geo_filter is not None:
+        # Only the area applies: a limit would drop changes the moved cursor never sends again
+        updated = apply_geo_filter(updated, dict(geo_filter, limit=None))
+    if transform is not None:
+        updated = [transform(record) for record in updated]
+    response = jsonify({"cursor": cursor, "full": full, "updated": updated, "removed": removed})
+    response.headers["X-Feed-Cursor"] = cursor
+    return conditional_response(response)
+
+# One keyset page: from memory once the feed is ready, otherwise straight from Firestore with start_after
+def feed_page_response(feed, query, projection, page_args, transform=None):
+    page_size, after = page_args
+    order_fields = feed.get_order_by()
+    if feed.is_ready():
+        page, next_cursor = paginate_records(feed.snapshot(), order_fields, page_size, after)
+    else:
+        page, next_cursor = paginate_query(projection.select(query), order_fields, page_size, projection, after)
+    if transform is not None:
+        page = [transform(record) for record in page]
+    return conditional_response(jsonify({"items": page, "next_cursor": next_cursor}))
+
+# Streams records as they arrive: from memory once the feed is ready, otherwise from query.stream()
+def feed_stream_response(feed, query, projection, fmt, transform=None):
+    records = feed.snapshot() if feed.is_ready() else map(projection, projection.select(query).stream())
+    if transform is not None:
+        records = map(transform, records)
+    chunks, mimetype = iter_stream(records, fmt, app.json.dumps)
+    return app.response_class(chunks, status=200, mimetype=mimetype)
+
 @app.route("/api/fetch_pubs", methods=["GET"])
 def fetch_pubs():
+    # Optional keyset pagination ordered by (pub_name, id): page_size and cursor
     try:
-        pubs_ref = db_firestore.collection("publicans")
-        pubs = [
-            {
-                "id": doc.id,
-                "pub_name": doc.to_dict().get("pub_name"),
-                "address": doc.to_dict().get("address"),
-                "xcoord": doc.to_dict().get("xcoord"),
-                "ycoord": doc.to_dict().get("ycoord"),
-                "BER": doc.to_dict().get("BER"),
-                "pub_image_url": doc.to_dict().get("pub_image_url"),
-            }
-            for doc in pubs_ref.stream()
-        ]
-        return jsonify(pubs), 200
+        page_args = parse_page_args(request.args, PUB_ORDER)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid pagination: {str(e)}"}), 400
+
+    # Optional streaming: ?stream=1 for a JSON array, Accept: application/x-ndjson for NDJSON
+    fmt = stream_format(request.args, request.accept_mimetypes)
+    if fmt is not None and (page_args is not None or "since" in request.args):
+        return jsonify({"error": "stream cannot be combined with pagination or since"}), 400
+
+    # Optional image_width (display width in pixels) and image_format=webp pick each pub's image variant
+    try:
+        variant_args = parse_variant_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid image variant: {str(e)}"}), 400
+    transform = None if variant_args is None else lambda record: with_image_variant(record, *variant_args)
+
+    try:
+        if fmt is not None:
+            return feed_stream_response(pubs_feed, db_firestore.collection("publicans"), PUB_PROJECTION, fmt, transform)
+        if page_args is not None:
+            return feed_page_response(pubs_feed, db_firestore.collection("publicans"), PUB_PROJECTION, page_args,
+                                      transform)
+
+        # Served from the in-memory feed; fall back to a direct read until the listener delivers
+        if not pubs_feed.is_ready():
+            pubs_ref = db_firestore.collection("publicans")
+            pubs_feed.load(PUB_PROJECTION.select(pubs_ref).stream())
+
+        if "since" in request.args:
+            return feed_delta_response(pubs_feed, request.args["since"], transform=transform)
+        return feed_response(pubs_feed, transform)
     except Exception as e:
         return jsonify({"error": f"Error fetching pubs: {str(e)}"}), 500
 
 @app.route("/api/fetch_games", methods=["GET"])
 def fetch_games():
+    # Optional location filter: lat/lng/radius_km or min_lat/min_lng/max_lat/max_lng, plus limit
     try:
-        now = moment.now().format("YYYY-MM-DDTHH:mm:ss")
-        games_ref = db_firestore.collection("games")
-        query = games_ref.where("expires", ">", now)
-        games = [
-            {
-                "id": doc.id,
-                "game_name": doc.to_dict().get("game_name"),
-                "location": doc.to_dict().get("location"),
-                "xcoord": doc.to_dict().get("xcoord"),
-                "ycoord": doc.to_dict().get("ycoord"),
-                "start_time": doc.to_dict().get("start_time"),
-                "end_time": doc.to_dict().get("end_time"),
-                "expires": doc.to_dict().get("expires"),
-                "max_players": doc.to_dict().get("max_players"),
-                "participants": doc.to_dict().get("participants"),
-                "host": doc.to_dict().get("host"),
-                "game_desc": doc.to_dict().get("game_desc"),
-                "game_type": doc.to_dict().get("game_type"),
-                "pub_id": doc.to_dict().get("pub_id"),
-            }
-            for doc in query.stream()
-        ]
-        return jsonify(games), 200
+        geo_filter = parse_geo_filter(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid location filter: {str(e)}"}), 400
+
+    # Optional attribute filters: starts_after/ends_before/active_at, open_seats, game_type and sort
+    try:
+        game_filter = parse_game_filter(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid game filter: {str(e)}"}), 400
+    if game_filter is not None and game_filter.get("sort") == "distance" and "radius_km" not in (geo_filter or {}):
+        return jsonify({"error": "sort=distance needs lat, lng and radius_km"}), 400
+    filtered = geo_filter is not None or game_filter is not None
+    if game_filter is not None and "since" in request.args:
+        return jsonify({"error": "since cannot be combined with game filters"}), 400
+
+    # Optional keyset pagination ordered by (expires_ts, id): page_size and cursor
+    try:
+        page_args = parse_page_args(request.args, GAME_ORDER)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid pagination: {str(e)}"}), 400
+    if page_args is not None and (filtered or "since" in request.args):
+        return jsonify({"error": "page_size/cursor cannot be combined with since or a filter"}), 400
+
+    # Optional streaming: ?stream=1 for a JSON array, Accept: application/x-ndjson for NDJSON
+    fmt = stream_format(request.args, request.accept_mimetypes)
+    if fmt is not None and (page_args is not None or filtered or "since" in request.args):
+        return jsonify({"error": "stream cannot be combined with pagination, since or a filter"}), 400
+
+    try:
+        if fmt is not None:
+            return feed_stream_response(games_feed, active_games_query(), GAME_PROJECTION, fmt)
+        if page_args is not None:
+            return feed_page_response(games_feed, active_games_query(), GAME_PROJECTION, page_args)
+
+        # Served from the in-memory feed; fall back to a direct read until the listener delivers
+        if not games_feed.is_ready():
+            games_feed.load(GAME_PROJECTION.select(active_games_query()).stream())
+
+        if "since" in request.args:
+            return feed_delta_response(games_feed, request.args["since"], geo_filter)
+        if game_filter is not None:
+            return conditional_response(jsonify(games_columns.query(geo_filter, game_filter)))
+        if geo_filter is None:
+            return feed_response(games_feed)
+
+        games = apply_geo_filter(games_feed.snapshot(), geo_filter, games_feed.get_index())
+        return conditional_response(jsonify(games))
     except Exception as e:
         return jsonify({"error": f"Error fetching games: {str(e)}"}), 500
 
@@ -182,8 +491,7 @@ def fetch_user_info():
     data = request.get_json()
     gamer_id = data.get("gamerId")
     try:
-        doc_ref = db_firestore.collection("gamers").document(gamer_id)
-        doc = doc_ref.get()
+        doc = cached_document("gamers", gamer_id)
         if doc.exists:
             user_data = doc.to_dict()
             return jsonify(user_data), 200
@@ -196,67 +504,20 @@ def fetch_friends():
     data = request.get_json()
     gamer_id = data.get("gamerId")
     try:
-        print(f"Starting to fetch friends for gamer ID: {gamer_id}")
-
         # Fetch the user's document to get the friends list
-        gamer_ref = db_firestore.collection("gamers").document(gamer_id)
-        gamer_doc = gamer_ref.get()
+        gamer_doc = cached_document("gamers", gamer_id)
 
         if not gamer_doc.exists:
-            print(f"No gamer document found with ID: {gamer_id}")
             return jsonify({"error": "User not found"}), 404
 
         user_data = gamer_doc.to_dict()
         friends_list = user_data.get("friends_list", [])
 
         if not friends_list:
-            print("No friends found in the list.")
             return jsonify([]), 200
 
-        # Fetch details for each friend ID in the friends list
-        fetched_friend_details = []
-        gamers_ref = db_firestore.collection("gamers")
-
-        for friend_id in friends_list:
-            print(f"Processing friend ID: {friend_id}")
-            friend_data = None
-
-            # Use a query to find the document where gamerId matches
-            try:
-                query = gamers_ref.where("gamerId", "==", friend_id).limit(1)
-                results = query.stream()
-
-                for doc in results:
-                    friend_data = doc.to_dict()
-                    if friend_data:
-                        print(f"Found friend data: {friend_data}")
-                        break
-
-                if not friend_data:
-                    print(f"No data found for friend ID: {friend_id}")
-
-            except Exception as e:
-                print(f"Error fetching friend data: {str(e)}")
-
-            profile = friend_data.get("profile", "01") if friend_data else "01"
-            print(f"Profile for friend ID {friend_id}: {profile}")
-            
-            # Add friend to result if found
-            if friend_data:
-                fetched_friend_details.append({
-                    "gamerId": friend_id,
-                    "fullName": friend_data.get("fullName", "Unknown"),
-                    "profile": profile,
-                    "statusMessage": friend_data.get("statusMessage", "")
-                })
-            else:
-                fetched_friend_details.append({
-                    "gamerId": friend_id,
-                    "fullName": "Unknown User",
-                    "profile": "03"
-                })
-
-        print(f"Final fetched friend details: {fetched_friend_details}")
+        # Resolve the whole friends list in batched, concurrent lookups
+        fetched_friend_details = friend_resolver.fetch_friend_details(friends_list)
         return jsonify(fetched_friend_details), 200
 
     except Exception as e:
@@ -265,7 +526,7 @@ def fetch_friends():
     
 
 @app.route('/api/fetch_profile', methods=['POST'])
-def fetch_profile():
+async def fetch_profile():
     try:
         data = request.json
         gamer_id = data.get('gamerId')
@@ -273,31 +534,29 @@ def fetch_profile():
         if not gamer_id:
             return jsonify({"error": "Gamer ID is required"}), 400
         
-        # Get user from users collection
-        user_ref = db_firestore.collection('users').document(gamer_id)
-        user_doc = user_ref.get()
+        # Read the users and gamers documents concurrently; the gamer document
+        # is only used if the user turns out not to be a publican
+        user_doc, gamer_doc = await asyncio.gather(cached_document_async('users', gamer_id),
+                                                   cached_document_async('gamers', gamer_id))
         
         if not user_doc.exists:
             return jsonify({"error": "User not found"}), 404
         
         user_data = user_doc.to_dict()
         is_publican = user_data.get('isPublican', False)
+        user_types.put(gamer_id, user_data)
         
         # Get additional data based on user type
         if is_publican:
             publican_id = user_data.get('userIdToDisplay')
             if publican_id:
-                publican_ref = db_firestore.collection('publican').document(publican_id)
-                publican_doc = publican_ref.get()
+                publican_doc = await cached_document_async('publican', publican_id)
                 if publican_doc.exists:
                     publican_data = publican_doc.to_dict()
                     user_data.update(publican_data)
-        else:
-            gamer_ref = db_firestore.collection('gamers').document(gamer_id)
-            gamer_doc = gamer_ref.get()
-            if gamer_doc.exists:
-                gamer_data = gamer_doc.to_dict()
-                user_data.update(gamer_data)
+        elif gamer_doc.exists:
+            gamer_data = gamer_doc.to_dict()
+            user_data.update(gamer_data)
         
         # Format created_at date if it exists
         if 'createdAt' in user_data and user_data['createdAt']:
@@ -310,7 +569,7 @@ def fetch_profile():
         return jsonify({"error": "Server error while fetching user data"}), 500
 
 @app.route('/api/update_profile', methods=['POST'])
-def update_profile():
+async def update_profile():
     try:
         data = request.json
         gamer_id = data.get('gamerId')
@@ -322,17 +581,18 @@ def update_profile():
         if not all([gamer_id, field, value is not None]):
             return jsonify({"error": "Missing required fields"}), 400
         
-        # Update user in users collection
-        user_ref = db_firestore.collection('users').document(gamer_id)
-        user_ref.update({field: value})
-        
         # Update in appropriate collection based on user type
         if is_publican and user_id_to_display:
-            target_ref = db_firestore.collection('publican').document(user_id_to_display)
+            target = ('publican', user_id_to_display)
         else:
-            target_ref = db_firestore.collection('gamers').document(gamer_id)
+            target = ('gamers', gamer_id)
         
-        target_ref.update({field: value})
+        # Update the users document and the role document atomically in one batch
+        await async_firestore.batch_update(('users', gamer_id, {field: value}), target + ({field: value},))
+        doc_cache.invalidate('users', gamer_id)
+        doc_cache.invalidate(*target)
+        if field in ('isPublican', 'userIdToDisplay'):
+            user_types.invalidate(gamer_id)
         
         return jsonify({"success": True, "message": f"{field} updated successfully"})
     
@@ -385,7 +645,7 @@ def check_pub_name_exists():
         return jsonify({"error": "Server error while checking pub name"}), 500
 
 @app.route('/api/update_profile_picture', methods=['POST'])
-def update_profile_picture():
+async def update_profile_picture():
     try:
         data = request.json
         gamer_id = data.get('gamerId')
@@ -394,27 +654,22 @@ def update_profile_picture():
         if not all([gamer_id, profile]):
             return jsonify({"error": "Missing required fields"}), 400
         
-        # Update user in users collection
-        user_ref = db_firestore.collection('users').document(gamer_id)
-        user_doc = user_ref.get()
-        
-        if not user_doc.exists:
-            return jsonify({"error": "User not found"}), 404
+        # Look up whether this is a publican or a gamer, reading users only on a cache miss
+        user_type = user_types.get(gamer_id)
+        if user_type is None:
+            user_doc = await cached_document_async('users', gamer_id)
+            if not user_doc.exists:
+                return jsonify({"error": "User not found"}), 404
+            user_type = user_types.put(gamer_id, user_doc.to_dict())
         
-        user_data = user_doc.to_dict()
-        is_publican = user_data.get('isPublican', False)
-        
-        user_ref.update({"profile": profile})
-        
-        # Update in appropriate collection based on user type
-        if is_publican:
-            publican_id = user_data.get('userIdToDisplay')
-            if publican_id:
-                publican_ref = db_firestore.collection('publican').document(publican_id)
-                publican_ref.update({"profile": profile})
-        else:
-            gamer_ref = db_firestore.collection('gamers').document(gamer_id)
-            gamer_ref.update({"profile": profile})
+        # Update users and the matching role document atomically in one batch
+        updates = [('users', gamer_id, {"profile": profile})]
+        role_document = user_type.role_document(gamer_id)
+        if role_document:
+            updates.append(role_document + ({"profile": profile},))
+        await async_firestore.batch_update(*updates)
+        for name, doc_id, _ in updates:
+            doc_cache.invalidate(name, doc_id)
         
         return jsonify({"success": True, "message": "Profile picture updated successfully"})
     
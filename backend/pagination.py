@@ -0,0 +1,112 @@
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Keyset orderings; the document ID is always the final tie-breaker
+GAME_ORDER = ("expires_ts",)
+PUB_ORDER = ("pub_name",)
+# JSON types a cursor may hold for each ordered field (besides null)
+ORDER_TYPES = {"expires_ts": (int, float), "pub_name": (str,)}
+
+
+def encode_cursor(values):
+    data = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, order_fields):
+    """Decode a page cursor into its keyset values (one per order field, then the ID)."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(values, list) or len(values) != len(order_fields) + 1 or not isinstance(values[-1], str):
+        raise ValueError("Cursor does not match this feed")
+    for field, value in zip(order_fields, values):
+        types = ORDER_TYPES.get(field, (str, int, float))
+        if value is not None and (isinstance(value, bool) or not isinstance(value, types)):
+            raise ValueError("Cursor does not match this feed")
+    return values
+
+
+def parse_page_args(args, order_fields):
+    """
+    Parse page_size/cursor query parameters. Returns None when the request is
+    not paginated, otherwise (page_size, after) where after are the decoded
+    keyset values of the last record already seen (or None for the first page).
+    """
+    if "page_size" not in args and "cursor" not in args:
+        return None
+    page_size = int(args.get("page_size", DEFAULT_PAGE_SIZE))
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+    after = decode_cursor(args["cursor"], order_fields) if args.get("cursor") else None
+    return page_size, after
+
+
+def order_key(values):
+    # Firestore's cross-type order: nulls, then booleans, numbers, and strings; anything else last
+    return tuple((0,) if value is None else (1, value) if isinstance(value, bool)
+                 else (2, value) if isinstance(value, (int, float)) else (3, value) if isinstance(value, str)
+                 else (4, str(value)) for value in values)
+
+
+def record_values(record, order_fields, id_field="id"):
+    return [record.get(field) for field in order_fields] + [record[id_field]]
+
+
+def is_ordered(record, order_fields):
+    """Whether a record has every ordered field; Firestore's order_by leaves out documents that do not."""
+    return all(record.get(field) is not None for field in order_fields)
+
+
+def paginate_records(records, order_fields, page_size, after=None, id_field="id"):
+    """
+    One page of records that are already sorted by (order_fields..., id), starting
+    strictly after the keyset values in after. Records missing an ordered field
+    are skipped, as paginate_query's order_by does. Returns (page, next_cursor),
+    with next_cursor None on the last page.
+    """
+    # Those sort first, so with a single order field they are a prefix
+    start = 0
+    while start < len(records) and not is_ordered(records[start], order_fields):
+        start += 1
+    if len(order_fields) > 1:
+        records, start = [record for record in records[start:] if is_ordered(record, order_fields)], 0
+    if after is not None:
+        target = order_key(after)
+        low, high = start, len(records)
+        while low < high:
+            mid = (low + high) // 2
+            if order_key(record_values(records[mid], order_fields, id_field)) <= target:
+                low = mid + 1
+            else:
+                high = mid
+        start = low
+
+    page = records[start:start + page_size]
+    has_more = start + page_size < len(records)
+    next_cursor = encode_cursor(record_values(page[-1], order_fields, id_field)) if page and has_more else None
+    return page, next_cursor
+
+
+def paginate_query(query, order_fields, page_size, serialize, after=None, id_field="id"):
+    """
+    One page straight from Firestore using order_by + start_after on the same
+    keyset. One extra document is requested to know whether a next page exists.
+    """
+    for field in order_fields:
+        query = query.order_by(field)
+    query = query.order_by("__name__")
+    if after is not None:
+        query = query.start_after(list(after))
+
+    page = [serialize(doc) for doc in query.limit(page_size + 1).stream()]
+    has_more = len(page) > page_size
+    page = page[:page_size]
+    next_cursor = encode_cursor(record_values(page[-1], order_fields, id_field)) if has_more else None
+    # Documents storing an explicit null are returned by order_by, but not by paginate_records
+    return [record for record in page if is_ordered(record, order_fields)], next_cursor
@@ -1,5 +1,39 @@
+import functools
+import inspect
+from types import MappingProxyType
+
+from flask import jsonify, request
+
 from Gamer import Gamer
 from Publican import Publican
+from doc_cache import DocumentCache
+from documents import LocalDocument
+
+# Role -> capability table, built once and read-only; the same schema is stored in permissions/{user_id}
+ROLE_CAPABILITIES = MappingProxyType({
+    'publican': MappingProxyType({
+        'can_create_events': True,
+        'can_update_details': True,
+        'can_create_games': False,
+        'can_add_remove_friends': False,
+        'can_join_leave_games': False,
+        'can_ban_gamers': True,
+        'can_delete_games': True,
+    }),
+    'player': MappingProxyType({
+        'can_create_events': False,
+        'can_update_details': True,
+        'can_create_games': True,
+        'can_add_remove_friends': True,
+        'can_join_leave_games': True,
+        'can_ban_gamers': False,
+        'can_delete_games': False,
+    }),
+})
+
+# Role documents that give a user without a permissions document its role's defaults;
+# publicans take precedence, as in the create_permissions backfill
+ROLE_COLLECTIONS = (('publicans', 'publican'), ('gamers', 'player'))
 
 class Permissions:
     def __init__(self, user):
@@ -10,28 +44,95 @@ class Permissions:
         else:
             raise ValueError("Invalid user type. Must be a Gamer or Publican instance.")
 
-        self.__permissions = {
-            'publican': {
-                'can_host_game': False,
-                'can_join_game': False,
-                'can_manage_friends': False
-            },
-            'player': {
-                'can_host_game': True,
-                'can_join_game': True,
-                'can_manage_friends': True
-            }
-        }
+        self.__capabilities = ROLE_CAPABILITIES[self.__role]
 
     def get_role(self):
         return self.__role
 
     def can_host_game(self):
-        return self.__permissions[self.__role]['can_host_game']
+        return self.__capabilities['can_create_games']
 
     def can_join_game(self):
-        return self.__permissions[self.__role]['can_join_game']
+        return self.__capabilities['can_join_leave_games']
 
     def can_manage_friends(self):
-        return self.__permissions[self.__role]['can_manage_friends']
+        return self.__capabilities['can_add_remove_friends']
+
+class PermissionEngine:
+    """
+    Capability checks against the permissions/{user_id} documents.
+
+    Documents are cached (LRU + TTL) so a check is a dict lookup with no
+    Firestore read on a hit; call invalidate() after changing a user's
+    permissions. Users without a permissions document (signup does not write
+    one) get ROLE_CAPABILITIES for the role document they have; users with
+    neither have no capabilities, and that miss is not cached, so a later
+    signup or backfill takes effect straight away.
+    """
+
+    def __init__(self, db, collection='permissions', ttl=300, max_entries=10000, cache=None):
+        self.__db = db
+        self.__collection = collection
+        self.__cache = cache or DocumentCache(max_entries=max_entries, ttl=ttl)
+
+    def __document(self, user_id):
+        document = self.__cache.peek(self.__collection, user_id)
+        if document is not None:
+            return document
+        since = self.__cache.generation()
+        snapshot = self.__db.collection(self.__collection).document(user_id).get()
+        if not snapshot.exists:
+            snapshot = self.__role_defaults(user_id)
+            if not snapshot.exists:
+                return snapshot
+        return self.__cache.put(self.__collection, user_id, snapshot, since)
+
+    def __role_defaults(self, user_id):
+        for collection, role in ROLE_COLLECTIONS:
+            if self.__db.collection(collection).document(user_id).get().exists:
+                return LocalDocument(user_id, dict(ROLE_CAPABILITIES[role]))
+        return LocalDocument(user_id, None)
+
+    def capabilities(self, user_id):
+        return self.__document(user_id).to_dict() or {}
+
+    def has(self, user_id, capability):
+        return self.__document(user_id).get(capability) is True
+
+    def invalidate(self, user_id):
+        self.__cache.invalidate(self.__collection, user_id)
+
+    def stats(self):
+        return self.__cache.stats()
+
+    def require(self, capability, user_field):
+        """
+        Flask view decorator: answers 400 when the request names no user in
+        user_field (JSON body or query string) and 403 when that user lacks
+        capability; otherwise runs the view.
+
+        The user ID is whatever the client sends, so this keeps honest clients
+        within their role but is not an authorization boundary: it does not
+        authenticate the caller as that user.
+        """
+        def check():
+            body = request.get_json(silent=True) or {}
+            user_id = body.get(user_field) or request.args.get(user_field)
+            if not user_id:
+                return jsonify({"error": f"{user_field} is required"}), 400
+            if not self.has(user_id, capability):
+                return jsonify({"error": f"Permission denied: {capability}"}), 403
+            return None
+
+        def decorator(view):
+            if inspect.iscoroutinefunction(view):
+                @functools.wraps(view)
+                async def async_wrapper(*args, **kwargs):
+                    return check() or await view(*args, **kwargs)
+                return async_wrapper
 
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                return check() or view(*args, **kwargs)
+            return wrapper
+        return decorator
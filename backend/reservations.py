@@ -0,0 +1,192 @@
+import threading
+from collections import namedtuple
+
+from game import SeatBasedGame, TableBasedGame
+
+ReservationResult = namedtuple("ReservationResult", ["ok", "messages"])
+
+
+class ReservationEngine:
+    """
+    Serializes joins, seat/table reservations and cancellations on in-memory
+    games with one lock per game, so concurrent requests cannot both pass the
+    capacity check before either writes.
+
+    Only one process sees these games; use FirestoreReservations when several
+    workers take reservations for the same game.
+    """
+
+    def __init__(self):
+        self.__games = {}
+        self.__locks = {}
+        self.__registry_lock = threading.Lock()
+
+    def add_game(self, game_id, game):
+        with self.__registry_lock:
+            self.__games[game_id] = game
+            self.__locks.setdefault(game_id, threading.Lock())
+
+    def remove_game(self, game_id):
+        with self.__registry_lock:
+            self.__games.pop(game_id, None)
+            self.__locks.pop(game_id, None)
+
+    def get_game(self, game_id):
+        with self.__registry_lock:
+            return self.__games.get(game_id)
+
+    def __entry(self, game_id):
+        with self.__registry_lock:
+            if game_id not in self.__games:
+                raise KeyError(f"Unknown game: {game_id}")
+            return self.__games[game_id], self.__locks[game_id]
+
+    def reserve(self, game_id, participant, spot=None, code=None):
+        """Join a game, taking seat/table `spot` for seat- and table-based games; returns the game's message."""
+        game, lock = self.__entry(game_id)
+        with lock:
+            return self.__reserve(game, participant, spot, code)[1]
+
+    def cancel(self, game_id, participant):
+        game, lock = self.__entry(game_id)
+        with lock:
+            return self.__cancel(game, participant)
+
+    def reserve_many(self, game_id, requests, code=None):
+        """
+        Reserve (participant, spot) pairs under a single lock acquisition.
+        All or nothing: if any reservation fails the earlier ones are undone.
+        """
+        game, lock = self.__entry(game_id)
+        with lock:
+            messages, reserved = [], []
+            for participant, spot in requests:
+                ok, message = self.__reserve(game, participant, spot, code)
+                messages.append(message)
+                if not ok:
+                    for done in reversed(reserved):
+                        self.__cancel(game, done)
+                    return ReservationResult(False, messages)
+                reserved.append(participant)
+            return ReservationResult(True, messages)
+
+    @staticmethod
+    def __reserve(game, participant, spot, code):
+        if game.has_participant(participant):
+            return False, f"{participant} has already joined the game."
+        if isinstance(game, SeatBasedGame):
+            message = game.reserve_seat(participant, spot, code)
+        elif isinstance(game, TableBasedGame):
+            message = game.reserve_table_spot(participant, spot, code)
+        else:
+            message = game.add_participant(participant, code)
+        return game.has_participant(participant), message
+
+    @staticmethod
+    def __cancel(game, participant):
+        if isinstance(game, SeatBasedGame):
+            return game.cancel_reservation(participant)
+        if isinstance(game, TableBasedGame):
+            return game.cancel_table_reservation(participant)
+        return game.remove_participant(participant)
+
+
+class FirestoreReservations:
+    """
+    The same reservation API on games/{id} documents, with every check and
+    write done inside a Firestore transaction so all workers agree.
+
+    Joined players are kept in "participants", never more than max_players
+    whatever the mode. Seat reservations go in a "seats" map of seat number ->
+    participant, valid seats being 1..max_players. Games with a "tables" map
+    of table name -> occupants are table-based: every join names a table, each
+    holding max_players // len(tables), as in TableBasedGame. Transactions
+    are run with `transactional`, i.e. firestore.transactional.
+    """
+
+    def __init__(self, db, transactional, collection="games"):
+        self.__db = db
+        self.__transactional = transactional
+        self.__collection = collection
+
+    def __run(self, fn, *args):
+        return self.__transactional(fn)(self.__db.transaction(), *args)
+
+    def reserve(self, game_id, participant, spot=None, code=None):
+        return self.reserve_many(game_id, [(participant, spot)], code).messages[-1]
+
+    def reserve_many(self, game_id, requests, code=None):
+        """All-or-nothing reservation of (participant, spot) pairs in one transaction."""
+        ref = self.__db.collection(self.__collection).document(game_id)
+        return self.__run(self.__reserve_many, ref, list(requests), code)
+
+    def cancel(self, game_id, participant):
+        ref = self.__db.collection(self.__collection).document(game_id)
+        return self.__run(self.__cancel, ref, participant)
+
+    @staticmethod
+    def __reserve_many(transaction, ref, requests, code):
+        snapshot = ref.get(transaction=transaction)
+        if not snapshot.exists:
+            return ReservationResult(False, ["Game not found."])
+        game = snapshot.to_dict()
+        if game.get("is_private") and game.get("access_code") != code:
+            return ReservationResult(False, ["Access denied. Invalid access code."])
+
+        max_players = game.get("max_players", 0)
+        participants = list(game.get("participants", []))
+        seats = dict(game.get("seats", {}))
+        tables = {table: list(occupants) for table, occupants in game["tables"].items()} if "tables" in game else None
+        messages = []
+        for participant, spot in requests:
+            if participant in participants:
+                messages.append(f"{participant} has already joined the game.")
+                return ReservationResult(False, messages)
+            if len(participants) >= max_players:
+                messages.append("Game is full.")
+                return ReservationResult(False, messages)
+            if tables is not None:
+                if spot not in tables:
+                    messages.append("Table not found.")
+                    return ReservationResult(False, messages)
+                if len(tables[spot]) >= max_players // len(tables):
+                    messages.append("Table is full.")
+                    return ReservationResult(False, messages)
+                tables[spot].append(participant)
+                messages.append(f"{participant} has reserved a spot at {spot}.")
+            elif spot is None:
+                messages.append(f"{participant} has joined the game.")
+            else:
+                if not isinstance(spot, int) or not 1 <= spot <= max_players:
+                    messages.append("Invalid seat number.")
+                    return ReservationResult(False, messages)
+                if seats.get(str(spot)) is not None:
+                    messages.append("Seat already taken.")
+                    return ReservationResult(False, messages)
+                seats[str(spot)] = participant
+                messages.append(f"{participant} has reserved seat {spot}.")
+            participants.append(participant)
+
+        update = {"participants": participants, "seats": seats}
+        if tables is not None:
+            update["tables"] = tables
+        transaction.update(ref, update)
+        return ReservationResult(True, messages)
+
+    @staticmethod
+    def __cancel(transaction, ref, participant):
+        snapshot = ref.get(transaction=transaction)
+        if not snapshot.exists:
+            return "Game not found."
+        game = snapshot.to_dict()
+        participants = list(game.get("participants", []))
+        if participant not in participants:
+            return "Participant not found."
+        participants.remove(participant)
+        seats = {seat: occupant for seat, occupant in game.get("seats", {}).items() if occupant != participant}
+        update = {"participants": participants, "seats": seats}
+        if "tables" in game:
+            update["tables"] = {table: [occupant for occupant in occupants if occupant != participant]
+                                for table, occupants in game["tables"].items()}
+        transaction.update(ref, update)
+        return f"{participant} has left the game."
@@ -0,0 +1,44 @@
+class Projection:
+    """
+    Field projection shared by the feed endpoints.
+
+    select() applies a Firestore field mask so unused fields never leave the
+    server, and serialize() decodes each snapshot once with a single to_dict().
+    Fields a document lacks come out as None, or are left out with
+    skip_missing so callers can tell them from stored values.
+    """
+
+    def __init__(self, fields, id_field="id", skip_missing=False):
+        self.__fields = tuple(fields)
+        self.__id_field = id_field
+        self.__skip_missing = skip_missing
+
+    def get_fields(self):
+        return self.__fields
+
+    def select(self, query):
+        """Apply the field mask to a Firestore query (not supported by listeners)."""
+        return query.select(list(self.__fields))
+
+    def serialize(self, doc):
+        data = doc.to_dict() or {}
+        record = {self.__id_field: doc.id}
+        for field in self.__fields:
+            if field in data or not self.__skip_missing:
+                record[field] = data.get(field)
+        return record
+
+    __call__ = serialize
+
+    def serialize_all(self, docs):
+        return [self.serialize(doc) for doc in docs]
+
+
+GAME_FIELDS = (
+    "game_name", "location", "xcoord", "ycoord", "start_time", "end_time", "expires", "expires_ts",
+    "max_players", "participants", "host", "game_desc", "game_type", "pub_id",
+)
+PUB_FIELDS = ("pub_name", "address", "xcoord", "ycoord", "BER", "pub_image_url", "pub_image_variants")
+
+GAME_PROJECTION = Projection(GAME_FIELDS)
+PUB_PROJECTION = Projection(PUB_FIELDS)
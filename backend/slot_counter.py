@@ -0,0 +1,246 @@
+import random
+from collections import namedtuple
+
+SlotClaim = namedtuple("SlotClaim", ["ok", "message"])
+
+# Shards per event when an event is split for heavy contention
+DEFAULT_SHARDS = 10
+# Single-shard transactions tried before one spanning every shard
+SHARD_ATTEMPTS = 3
+
+
+def slot_bounds(key):
+    start, _, end = key.partition("-")
+    return start.strip(), end.strip()
+
+
+def slot_range(available_slots, start_time, end_time):
+    """
+    Keys of an event's "HH:MM-HH:MM" slots covered by a game running from
+    start_time to end_time ("YYYY-MM-DDTHH:MM:SS"), in time order. Raises
+    ValueError when the times do not line up with the event's slots.
+    """
+    start, end = str(start_time)[11:16], str(end_time)[11:16]
+    keys = sorted(available_slots, key=lambda key: slot_bounds(key)[0])
+    starts = [slot_bounds(key)[0] for key in keys]
+    ends = [slot_bounds(key)[1] for key in keys]
+    if start not in starts or end not in ends or ends.index(end) < starts.index(start):
+        raise ValueError("Game times do not match the event's time slots.")
+    return keys[starts.index(start):ends.index(end) + 1]
+
+
+def split_slots(available_slots, shards):
+    """Spread each slot's count as evenly as possible over `shards` maps."""
+    split = [{} for _ in range(shards)]
+    for key, count in available_slots.items():
+        share, extra = divmod(count, shards)
+        for index, shard in enumerate(split):
+            shard[key] = share + (index < extra)
+    return split
+
+
+class SlotCounter:
+    """
+    Server-side accounting of events' available_slots, replacing the counts
+    clients used to compute and write back. Each claim checks and decrements
+    the slots inside a Firestore transaction, so concurrent games cannot both
+    take the last places or overwrite each other's counts.
+
+    Events with heavy contention can be sharded: their counts are split over
+    `shards` documents in shard_collection and a claim only locks one shard
+    (falling back to a transaction over all of them when no single shard has
+    room). The event's own available_slots then becomes a display copy,
+    refreshed by sync_totals; anything written straight to that copy since
+    the last sync is folded into the shards first rather than lost.
+    """
+
+    def __init__(self, db, transactional, collection="events", shard_collection="event_slot_shards", rng=None):
+        self.__db = db
+        # firestore.transactional
+        self.__transactional = transactional
+        self.__collection = collection
+        self.__shard_collection = shard_collection
+        self.__rng = rng or random.Random()
+
+    def __run(self, fn, *args):
+        return self.__transactional(fn)(self.__db.transaction(), *args)
+
+    def __event_ref(self, event_id):
+        return self.__db.collection(self.__collection).document(event_id)
+
+    def __shard_refs(self, event_id, shards):
+        return [self.__db.collection(self.__shard_collection).document(f"{event_id}_{index}") for index in range(shards)]
+
+    def __event(self, event_id, transaction=None):
+        snapshot = self.__event_ref(event_id).get(transaction=transaction)
+        if not snapshot.exists:
+            raise KeyError(f"Unknown event: {event_id}")
+        return snapshot.to_dict()
+
+    def claim(self, event_id, start_time, end_time, count, then=None):
+        """
+        Take `count` places in every slot the game's times cover. `then`, if
+        given, is called with the transaction once the claim has succeeded, so
+        the caller's own writes (the game document, say) commit with it.
+        Raises KeyError for an unknown event and ValueError for times that do
+        not match its slots.
+        """
+        if not isinstance(count, int) or isinstance(count, bool) or count <= 0:
+            raise ValueError("The number of players must be a positive integer.")
+        event = self.__event(event_id)
+        shards = event.get("slot_shards") or 0
+        if not shards:
+            claim = self.__run(self.__claim_event, event_id, start_time, end_time, count, then)
+            # None: the event was sharded in the meantime
+            return claim if claim is not None else self.claim(event_id, start_time, end_time, count, then)
+
+        keys = slot_range(event.get("available_slots") or {}, start_time, end_time)
+        refs = self.__shard_refs(event_id, shards)
+        for ref in self.__rng.sample(refs, min(SHARD_ATTEMPTS, shards)):
+            claim = self.__run(self.__claim_shards, [ref], keys, count, then)
+            if claim.ok:
+                return claim
+        return self.__run(self.__claim_shards, refs, keys, count, then)
+
+    def __claim_event(self, transaction, event_id, start_time, end_time, count, then):
+        event = self.__event(event_id, transaction)
+        if event.get("slot_shards"):
+            return None
+        slots = dict(event.get("available_slots") or {})
+        keys = slot_range(slots, start_time, end_time)
+        short = [key for key in keys if slots[key] < count]
+        if short:
+            return SlotClaim(False, f"Not enough places left in {', '.join(short)}.")
+        for key in keys:
+            slots[key] -= count
+        transaction.update(self.__event_ref(event_id), {"available_slots": slots})
+        if then is not None:
+            then(transaction)
+        return SlotClaim(True, "Slots claimed.")
+
+    def __claim_shards(self, transaction, refs, keys, count, then):
+        # Takes from the given shards in order, so one shard covers the claim whenever it can
+        shard_slots = [dict(ref.get(transaction=transaction).get("available_slots") or {}) for ref in refs]
+        short = [key for key in keys if sum(slots.get(key, 0) for slots in shard_slots) < count]
+        if short:
+            return SlotClaim(False, f"Not enough places left in {', '.join(short)}.")
+        changed = set()
+        for key in keys:
+            needed = count
+            for index, slots in enumerate(shard_slots):
+                taken = min(needed, slots.get(key, 0))
+                if taken:
+                    slots[key] -= taken
+                    needed -= taken
+                    changed.add(index)
+                if not needed:
+                    break
+        for index in sorted(changed):
+            transaction.update(refs[index], {"available_slots": shard_slots[index]})
+        if then is not None:
+            then(transaction)
+        return SlotClaim(True, "Slots claimed.")
+
+    def release(self, event_id, start_time, end_time, count, then=None):
+        """
+        Give back places a claim took, e.g. when its game is deleted. `then`,
+        if given, is called with the transaction before the counts are
+        written and may read and write with it (deleting the game, say); if
+        it returns False nothing is released, so a game deleted twice only
+        gives its places back once.
+        """
+        event = self.__event(event_id)
+        shards = event.get("slot_shards") or 0
+        if shards:
+            keys = slot_range(event.get("available_slots") or {}, start_time, end_time)
+            ref = self.__rng.choice(self.__shard_refs(event_id, shards))
+            return self.__run(self.__release_shard, ref, keys, count, then)
+        released = self.__run(self.__release_event, event_id, start_time, end_time, count, then)
+        return released if released is not None else self.release(event_id, start_time, end_time, count, then)
+
+    def __release_event(self, transaction, event_id, start_time, end_time, count, then):
+        event = self.__event(event_id, transaction)
+        if event.get("slot_shards"):
+            return None
+        slots = dict(event.get("available_slots") or {})
+        keys = slot_range(slots, start_time, end_time)
+        if then is not None and then(transaction) is False:
+            return SlotClaim(False, "Nothing to release.")
+        for key in keys:
+            slots[key] += count
+        transaction.update(self.__event_ref(event_id), {"available_slots": slots})
+        return SlotClaim(True, "Slots released.")
+
+    @staticmethod
+    def __release_shard(transaction, ref, keys, count, then):
+        slots = dict(ref.get(transaction=transaction).get("available_slots") or {})
+        if then is not None and then(transaction) is False:
+            return SlotClaim(False, "Nothing to release.")
+        for key in keys:
+            slots[key] = slots.get(key, 0) + count
+        transaction.update(ref, {"available_slots": slots})
+        return SlotClaim(True, "Slots released.")
+
+    def shard_event(self, event_id, shards=DEFAULT_SHARDS):
+        """Split an event's counts over `shards` shard documents; does nothing if it is already sharded."""
+        if not isinstance(shards, int) or isinstance(shards, bool) or shards < 1:
+            raise ValueError("The number of shards must be a positive integer.")
+        return self.__run(self.__shard_event, event_id, shards)
+
+    def __shard_event(self, transaction, event_id, shards):
+        event = self.__event(event_id, transaction)
+        if event.get("slot_shards"):
+            return False
+        available_slots = event.get("available_slots") or {}
+        for ref, slots in zip(self.__shard_refs(event_id, shards), split_slots(available_slots, shards)):
+            transaction.set(ref, {"event_id": event_id, "available_slots": slots})
+        # synced_slots: the display copy as last written, so sync_totals can spot direct writes
+        transaction.update(self.__event_ref(event_id), {"slot_shards": shards, "synced_slots": dict(available_slots)})
+        return True
+
+    def totals(self, event_id):
+        """Current available_slots of an event, summed over its shards if it has any."""
+        event = self.__event(event_id)
+        shards = event.get("slot_shards") or 0
+        if not shards:
+            return dict(event.get("available_slots") or {})
+        totals = dict.fromkeys(event.get("available_slots") or {}, 0)
+        for snapshot in self.__db.get_all(self.__shard_refs(event_id, shards)):
+            for key, count in (snapshot.get("available_slots") or {}).items():
+                totals[key] = totals.get(key, 0) + count
+        return totals
+
+    def sync_totals(self):
+        """Copy shard totals onto every sharded event's available_slots; returns the number of events updated."""
+        synced = 0
+        for snapshot in self.__db.collection(self.__collection).where("slot_shards", ">", 0).select(["slot_shards"]).stream():
+            self.__run(self.__sync_event, snapshot.id)
+            synced += 1
+        return synced
+
+    def __sync_event(self, transaction, event_id):
+        event = self.__event(event_id, transaction)
+        refs = self.__shard_refs(event_id, event["slot_shards"])
+        shard_slots = [dict(ref.get(transaction=transaction).get("available_slots") or {}) for ref in refs]
+        available_slots = event.get("available_slots") or {}
+        synced_slots = event.get("synced_slots")
+        changed = set()
+        if synced_slots is not None:
+            # Changes made to the display copy since the last sync go into the shards
+            for key, count in available_slots.items():
+                delta = count - synced_slots.get(key, count)
+                for index, slots in enumerate(shard_slots):
+                    if not delta:
+                        break
+                    step = delta if delta > 0 else -min(-delta, slots.get(key, 0))
+                    if step:
+                        slots[key] = slots.get(key, 0) + step
+                        delta -= step
+                        changed.add(index)
+        for index in sorted(changed):
+            transaction.update(refs[index], {"available_slots": shard_slots[index]})
+        totals = dict.fromkeys(available_slots, 0)
+        for slots in shard_slots:
+            for key, count in slots.items():
+                totals[key] = totals.get(key, 0) + count
+        transaction.update(self.__event_ref(event_id), {"available_slots": totals, "synced_slots": totals})
@@ -0,0 +1,181 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_coord(value):
+    """Coerce a stored xcoord/ycoord (float or numeric string) to a float, or None."""
+    try:
+        coord = float(value)
+    except (TypeError, ValueError):
+        return None
+    return coord if math.isfinite(coord) else None
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometres between two lat/lng points."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoGrid:
+    """
+    Uniform lat/lng grid over points keyed by id (xcoord = latitude, ycoord = longitude).
+
+    Each point lives in exactly one cell, so a radius or bounding box query
+    only visits the cells that overlap it instead of every point.
+    """
+
+    def __init__(self, cell_deg=0.05):
+        self.__cell_deg = cell_deg
+        self.__cells = {}
+        self.__points = {}
+
+    def __len__(self):
+        return len(self.__points)
+
+    def __contains__(self, key):
+        return key in self.__points
+
+    def __cell(self, lat, lng):
+        return (math.floor(lat / self.__cell_deg), math.floor(lng / self.__cell_deg))
+
+    def insert(self, key, lat, lng):
+        lat, lng = to_coord(lat), to_coord(lng)
+        self.remove(key)
+        if lat is None or lng is None:
+            return False
+        cell = self.__cell(lat, lng)
+        self.__cells.setdefault(cell, set()).add(key)
+        self.__points[key] = (lat, lng, cell)
+        return True
+
+    def remove(self, key):
+        point = self.__points.pop(key, None)
+        if point is None:
+            return False
+        bucket = self.__cells[point[2]]
+        bucket.discard(key)
+        if not bucket:
+            del self.__cells[point[2]]
+        return True
+
+    def clear(self):
+        self.__cells.clear()
+        self.__points.clear()
+
+    def __scan(self, min_lat, min_lng, max_lat, max_lng):
+        lat_lo, lng_lo = self.__cell(min_lat, min_lng)
+        lat_hi, lng_hi = self.__cell(max_lat, max_lng)
+        # Fall back to a flat scan when the box covers more cells than exist
+        if (lat_hi - lat_lo + 1) * (lng_hi - lng_lo + 1) > len(self.__cells):
+            for key, (lat, lng, _) in self.__points.items():
+                if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
+                    yield key, lat, lng
+            return
+        for i in range(lat_lo, lat_hi + 1):
+            for j in range(lng_lo, lng_hi + 1):
+                for key in self.__cells.get((i, j), ()):
+                    lat, lng, _ = self.__points[key]
+                    if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
+                        yield key, lat, lng
+
+    def query_bbox(self, min_lat, min_lng, max_lat, max_lng, limit=None):
+        """Return ids inside the box, ordered by id for a stable response."""
+        keys = sorted(key for key, _, _ in self.__scan(min_lat, min_lng, max_lat, max_lng))
+        return keys[:limit] if limit is not None else keys
+
+    def query_radius(self, lat, lng, radius_km, limit=None):
+        """Return (id, distance_km) pairs within radius_km, nearest first."""
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        cos_lat = math.cos(math.radians(lat))
+        dlng = 180.0 if cos_lat < 1e-9 else min(180.0, dlat / cos_lat)
+        hits = []
+        for key, plat, plng in self.__scan(lat - dlat, lng - dlng, lat + dlat, lng + dlng):
+            distance = haversine_km(lat, lng, plat, plng)
+            if distance <= radius_km:
+                hits.append((key, distance))
+        hits.sort(key=lambda hit: (hit[1], hit[0]))
+        return hits[:limit] if limit is not None else hits
+
+
+RADIUS_KEYS = ("lat", "lng", "radius_km")
+BBOX_KEYS = ("min_lat", "min_lng", "max_lat", "max_lng")
+
+
+# Valid range of each location parameter; no two points are further apart than half the Earth's circumference
+PARAM_RANGES = {
+    "lat": (-90.0, 90.0), "min_lat": (-90.0, 90.0), "max_lat": (-90.0, 90.0),
+    "lng": (-180.0, 180.0), "min_lng": (-180.0, 180.0), "max_lng": (-180.0, 180.0),
+    "radius_km": (0.0, math.pi * EARTH_RADIUS_KM),
+}
+
+
+def parse_param(args, key):
+    """A location parameter as a finite float within PARAM_RANGES; raises ValueError otherwise."""
+    value = float(args[key])
+    low, high = PARAM_RANGES[key]
+    if not math.isfinite(value) or not low <= value <= high:
+        raise ValueError(f"{key} must be between {low:g} and {high:g}")
+    return value
+
+
+def parse_geo_filter(args):
+    """
+    Parse the optional location filter of a feed request: a radius
+    (lat, lng, radius_km) or a bounding box (min_lat, min_lng, max_lat, max_lng),
+    plus an optional limit. Returns None when nothing was requested and raises
+    ValueError for incomplete, non-numeric or out-of-range parameters.
+    """
+    geo_filter = {"limit": None}
+
+    if "limit" in args:
+        geo_filter["limit"] = int(args["limit"])
+        if geo_filter["limit"] < 1:
+            raise ValueError("limit must be a positive integer")
+
+    if any(key in args for key in RADIUS_KEYS):
+        if not all(key in args for key in RADIUS_KEYS):
+            raise ValueError("lat, lng and radius_km must be given together")
+        geo_filter.update({key: parse_param(args, key) for key in RADIUS_KEYS})
+        if not geo_filter["radius_km"] > 0:
+            raise ValueError("radius_km must be positive")
+    elif any(key in args for key in BBOX_KEYS):
+        if not all(key in args for key in BBOX_KEYS):
+            raise ValueError("min_lat, min_lng, max_lat and max_lng must be given together")
+        geo_filter.update({key: parse_param(args, key) for key in BBOX_KEYS})
+        if geo_filter["min_lat"] > geo_filter["max_lat"]:
+            raise ValueError("min_lat must not be greater than max_lat")
+        # A box crossing the antimeridian is not supported; it would silently match nothing
+        if geo_filter["min_lng"] > geo_filter["max_lng"]:
+            raise ValueError("min_lng must not be greater than max_lng")
+    elif geo_filter["limit"] is None:
+        return None
+
+    return geo_filter
+
+
+def apply_geo_filter(records, geo_filter, index=None):
+    """
+    Narrow serialized records (dicts with id/xcoord/ycoord) to the requested area.
+    Radius queries come back nearest first with a "distance_km" field added.
+    """
+    if geo_filter is None:
+        return records
+    by_id = {record["id"]: record for record in records}
+    if index is None:
+        index = GeoGrid()
+        for record in records:
+            index.insert(record["id"], record.get("xcoord"), record.get("ycoord"))
+
+    limit = geo_filter["limit"]
+    if "radius_km" in geo_filter:
+        hits = index.query_radius(geo_filter["lat"], geo_filter["lng"], geo_filter["radius_km"], limit)
+        return [dict(by_id[key], distance_km=round(distance, 3)) for key, distance in hits if key in by_id]
+    if "min_lat" in geo_filter:
+        keys = index.query_bbox(geo_filter["min_lat"], geo_filter["min_lng"],
+                                geo_filter["max_lat"], geo_filter["max_lng"], limit)
+        return [by_id[key] for key in keys if key in by_id]
+    return records[:limit]
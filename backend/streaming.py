@@ -0,0 +1,44 @@
+import json
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+JSON_MIMETYPE = "application/json"
+
+
+def stream_format(args, accept_mimetypes):
+    """
+    The streaming format a feed request opted into: "ndjson" when the client
+    accepts application/x-ndjson ahead of JSON or asks for ?stream=ndjson,
+    "json" for ?stream=1, or None for a regular buffered response.
+    """
+    stream = args.get("stream", "").lower()
+    if stream == "ndjson":
+        return "ndjson"
+    # JSON is listed first so wildcard Accept headers keep the regular response
+    if accept_mimetypes.best_match([JSON_MIMETYPE, NDJSON_MIMETYPE]) == NDJSON_MIMETYPE:
+        return "ndjson"
+    if stream in ("1", "true", "json"):
+        return "json"
+    return None
+
+
+def iter_json_array(records, dumps=json.dumps):
+    """Encode records as one JSON array, one element at a time."""
+    yield "["
+    first = True
+    for record in records:
+        yield dumps(record) if first else "," + dumps(record)
+        first = False
+    yield "]"
+
+
+def iter_ndjson(records, dumps=json.dumps):
+    """Encode records as newline-delimited JSON."""
+    for record in records:
+        yield dumps(record) + "\n"
+
+
+def iter_stream(records, fmt, dumps=json.dumps):
+    """Returns (chunks, mimetype) for a streaming response in the given format."""
+    if fmt == "ndjson":
+        return iter_ndjson(records, dumps), NDJSON_MIMETYPE
+    return iter_json_array(records, dumps), JSON_MIMETYPE
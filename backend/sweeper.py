@@ -0,0 +1,120 @@
+import threading
+import time
+
+from timeutil import format_local, now_ts, parse_timestamp
+
+# Firestore batches hold at most 500 writes and every archived document takes two (copy + delete)
+MAX_BATCH_DOCUMENTS = 250
+
+
+class ExpirySweeper:
+    """
+    Moves expired documents out of hot collections into "<collection>_archive".
+
+    Each sweep pages through documents whose expiry field is in the past,
+    oldest first, and archives each page in one batch (copy to the archive
+    with an "archived_at" time, then delete). Commits are spaced so no more
+    than max_writes_per_second writes are issued, and at most max_batches
+    batches run per collection per sweep, so one run stays bounded however
+    large the backlog is; the next run picks up where this one stopped.
+
+    The query compares the epoch-second expires_ts fields (see
+    backfill_times.py) with the current time; every candidate is re-checked
+    with parse_timestamp, and documents whose expiry is not a time are
+    skipped rather than archived. get_metrics takes its own short lock, so it
+    answers while a sweep is running.
+    """
+
+    def __init__(self, db, collections=(("games", "expires_ts"), ("events", "expires_ts")), batch_size=200,
+                 max_batches=20, max_writes_per_second=500, clock=now_ts, sleep=time.sleep,
+                 archive_suffix="_archive"):
+        if not 1 <= batch_size <= MAX_BATCH_DOCUMENTS:
+            raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_DOCUMENTS}")
+        self.__db = db
+        self.__collections = tuple(collections)
+        self.__batch_size = batch_size
+        self.__max_batches = max_batches
+        self.__max_writes_per_second = max_writes_per_second
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__archive_suffix = archive_suffix
+        self.__lock = threading.Lock()
+        self.__metrics_lock = threading.Lock()
+        self.__metrics = {"runs": 0, "batches": 0, "archived": {}, "skipped": 0, "errors": 0,
+                          "last_run_at": None, "last_run_seconds": None, "last_run_archived": 0}
+
+    def get_metrics(self):
+        with self.__metrics_lock:
+            return dict(self.__metrics, archived=dict(self.__metrics["archived"]))
+
+    def __count(self, name, value=1, collection=None):
+        with self.__metrics_lock:
+            if collection is None:
+                self.__metrics[name] += value
+            else:
+                self.__metrics[name][collection] = self.__metrics[name].get(collection, 0) + value
+
+    def sweep(self):
+        """Archive expired documents in every configured collection; returns {collection: archived count}."""
+        # APScheduler may overlap runs of a slow job; a second concurrent sweep just returns
+        if not self.__lock.acquire(blocking=False):
+            return {}
+        try:
+            started = time.monotonic()
+            now = self.__clock()
+            results = {}
+            for collection, expires_field in self.__collections:
+                try:
+                    results[collection] = self.__sweep_collection(collection, expires_field, now)
+                except Exception as e:
+                    print(f"Error sweeping {collection}: {e}")
+                    self.__count("errors")
+                    results[collection] = 0
+            with self.__metrics_lock:
+                metrics = self.__metrics
+                metrics["runs"] += 1
+                metrics["last_run_at"] = now
+                metrics["last_run_seconds"] = round(time.monotonic() - started, 3)
+                metrics["last_run_archived"] = sum(results.values())
+            return results
+        finally:
+            self.__lock.release()
+
+    def __sweep_collection(self, collection, expires_field, now):
+        source = self.__db.collection(collection)
+        archive = self.__db.collection(collection + self.__archive_suffix)
+        query = (source.where(expires_field, "<=", now)
+                 .order_by(expires_field).order_by("__name__").limit(self.__batch_size))
+        archived, after = 0, None
+        next_commit = time.monotonic()
+        for _ in range(self.__max_batches):
+            page = list((query.start_after(after) if after else query).stream())
+            if not page:
+                break
+            last = page[-1]
+            after = [last.get(expires_field), last.id]
+
+            batch = self.__db.batch()
+            count = 0
+            for doc in page:
+                expires = parse_timestamp(doc.get(expires_field))
+                if expires is None or expires > now:
+                    self.__count("skipped")
+                    continue
+                batch.set(archive.document(doc.id), dict(doc.to_dict(), archived_at=format_local(now)))
+                batch.delete(source.document(doc.id))
+                count += 1
+
+            if count:
+                # Rate limit: wait until this batch's share of the write budget is available
+                delay = next_commit - time.monotonic()
+                if delay > 0:
+                    self.__sleep(delay)
+                batch.commit()
+                next_commit = time.monotonic() + 2 * count / self.__max_writes_per_second
+                archived += count
+                self.__count("batches")
+                self.__count("archived", count, collection)
+            if len(page) < self.__batch_size:
+                break
+        return archived
@@ -0,0 +1,274 @@
+"""
+Minimal in-memory stand-in for the parts of the Firestore client the backend uses.
+Every round trip is counted in FakeFirestore.calls so tests can assert on batching.
+"""
+import copy
+import threading
+from collections import Counter
+
+OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "in": lambda a, b: a in b,
+    "array_contains": lambda a, b: isinstance(a, list) and b in a,
+}
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data, field_paths=None):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        if data is not None and field_paths is not None:
+            data = {field: data[field] for field in field_paths if field in data}
+        self.__data = copy.deepcopy(data)
+
+    def to_dict(self):
+        return copy.deepcopy(self.__data)
+
+    def get(self, field):
+        return self.__data.get(field) if self.__data is not None else None
+
+
+class FakeDocument:
+    def __init__(self, db, collection, doc_id):
+        self.__db = db
+        self.__collection = collection
+        self.id = doc_id
+        self.path = f"{collection}/{doc_id}"
+
+    def _data(self):
+        return self.__db.store.get(self.__collection, {}).get(self.id)
+
+    def _write(self, data):
+        docs = self.__db.store.setdefault(self.__collection, {})
+        if data is None:
+            docs.pop(self.id, None)
+        else:
+            docs[self.id] = data
+
+    def get(self, field_paths=None, transaction=None):
+        self.__db.record("get")
+        return FakeSnapshot(self, self._data(), field_paths)
+
+    def set(self, data, merge=False):
+        self.__db.record("set")
+        self._apply_set(data, merge)
+
+    def update(self, data):
+        self.__db.record("update")
+        self._apply_update(data)
+
+    def delete(self):
+        self.__db.record("delete")
+        self._write(None)
+
+    def _apply_set(self, data, merge=False):
+        with self.__db.lock:
+            current = dict(self._data() or {}) if merge else {}
+            current.update(copy.deepcopy(data))
+            self._write(current)
+
+    def _apply_update(self, data):
+        with self.__db.lock:
+            current = self._data()
+            if current is None:
+                raise KeyError(f"No document to update: {self.path}")
+            current = dict(current)
+            current.update(copy.deepcopy(data))
+            self._write(current)
+
+
+def sort_value(value):
+    # Nulls sort first, as in Firestore
+    return (0,) if value is None else (1, value)
+
+
+class FakeQuery:
+    def __init__(self, db, collection, filters=(), limit=None, field_paths=None, orders=(), start_after=None):
+        self._db = db
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._limit = limit
+        self._field_paths = field_paths
+        self._orders = tuple(orders)
+        self._start_after = start_after
+
+    def __copy_with(self, **changes):
+        state = {"filters": self._filters, "limit": self._limit, "field_paths": self._field_paths,
+                 "orders": self._orders, "start_after": self._start_after}
+        state.update(changes)
+        return FakeQuery(self._db, self._collection, **state)
+
+    def order_by(self, field):
+        return self.__copy_with(orders=self._orders + (field,))
+
+    def start_after(self, values):
+        return self.__copy_with(start_after=list(values))
+
+    def __key(self, doc_id, data):
+        return tuple(sort_value(doc_id if field == "__name__" else data.get(field)) for field in self._orders)
+
+    def where(self, field, op, value):
+        return self.__copy_with(filters=self._filters + ((field, op, value),))
+
+    def limit(self, count):
+        return self.__copy_with(limit=count)
+
+    def select(self, field_paths):
+        return self.__copy_with(field_paths=list(field_paths))
+
+    def stream(self):
+        self._db.record("query")
+        matches = []
+        for doc_id, data in sorted(self._db.store.get(self._collection, {}).items()):
+            if all(OPERATORS[op](data.get(field), value) for field, op, value in self._filters):
+                matches.append((doc_id, data))
+        if self._orders:
+            # As in Firestore, documents without an ordered field are left out
+            matches = [(doc_id, data) for doc_id, data in matches
+                       if all(field == "__name__" or field in data for field in self._orders)]
+            matches.sort(key=lambda match: self.__key(*match))
+        if self._start_after is not None:
+            after = tuple(sort_value(value) for value in self._start_after)
+            matches = [match for match in matches if self.__key(*match) > after]
+        results = [FakeSnapshot(FakeDocument(self._db, self._collection, doc_id), data, self._field_paths)
+                   for doc_id, data in matches]
+        return iter(results[:self._limit] if self._limit is not None else results)
+
+    def get(self):
+        return list(self.stream())
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db, name):
+        super().__init__(db, name)
+        self.id = name
+
+    def document(self, doc_id=None):
+        if doc_id is None:
+            doc_id = self._db.next_id()
+        return FakeDocument(self._db, self._collection, doc_id)
+
+
+class FakeBatch:
+    MAX_WRITES = 500
+
+    def __init__(self, db):
+        self.__db = db
+        self.__writes = []
+
+    def __len__(self):
+        return len(self.__writes)
+
+    def set(self, ref, data, merge=False):
+        self.__writes.append(lambda: ref._apply_set(data, merge))
+
+    def update(self, ref, data):
+        self.__writes.append(lambda: ref._apply_update(data))
+
+    def delete(self, ref):
+        self.__writes.append(lambda: ref._write(None))
+
+    def commit(self):
+        if len(self.__writes) > self.MAX_WRITES:
+            raise ValueError("A batch can contain at most 500 writes")
+        self.__db.record("commit")
+        with self.__db.lock:
+            # All or nothing, like a Firestore batch
+            saved = copy.deepcopy(self.__db.store)
+            try:
+                for write in self.__writes:
+                    write()
+            except Exception:
+                self.__db.store.clear()
+                self.__db.store.update(saved)
+                raise
+        self.__writes = []
+
+
+class FakeTransaction:
+    def __init__(self, db):
+        self._db = db
+        self.__writes = []
+
+    def set(self, ref, data, merge=False):
+        self.__writes.append(lambda: ref._apply_set(data, merge))
+
+    def update(self, ref, data):
+        self.__writes.append(lambda: ref._apply_update(data))
+
+    def delete(self, ref):
+        self.__writes.append(lambda: ref._write(None))
+
+    def _commit(self):
+        self._db.record("commit")
+        for write in self.__writes:
+            write()
+        self.__writes = []
+
+
+def fake_transactional(fn):
+    """
+    Stand-in for firestore.transactional. Server client libraries lock the
+    documents a transaction reads, so the fake simply runs the whole
+    transaction under the store lock.
+    """
+    def run(transaction, *args):
+        with transaction._db.lock:
+            result = fn(transaction, *args)
+            transaction._commit()
+        return result
+    return run
+
+
+def hammer(worker, threads=32):
+    """Run worker(0..threads-1) on that many threads at once; returns their results in order."""
+    # Release every thread at once to maximise contention
+    barrier = threading.Barrier(threads)
+    results = [None] * threads
+
+    def run(i):
+        barrier.wait()
+        results[i] = worker(i)
+
+    pool = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return results
+
+
+class FakeFirestore:
+    def __init__(self, store=None):
+        self.store = copy.deepcopy(store or {})
+        self.calls = Counter()
+        self.lock = threading.RLock()
+        self.__next_id = 0
+
+    def record(self, call):
+        with self.lock:
+            self.calls[call] += 1
+
+    def next_id(self):
+        with self.lock:
+            self.__next_id += 1
+            return f"auto{self.__next_id:06d}"
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    def get_all(self, refs, field_paths=None):
+        self.record("get_all")
+        return iter([FakeSnapshot(ref, ref._data(), field_paths) for ref in refs])
@@ -0,0 +1,42 @@
+"""
+Minimal in-memory stand-in for the google.cloud.storage bucket/blob calls the backend makes.
+Uploaded blobs are kept in FakeBucket.blobs by name.
+"""
+import threading
+from urllib.parse import quote
+
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.cache_control = None
+        self.content_type = None
+        self.public = False
+
+    @property
+    def public_url(self):
+        return f"https://storage.googleapis.com/{self.bucket.name}/{quote(self.name)}"
+
+    def upload_from_string(self, data, content_type=None):
+        self.content_type = content_type
+        with self.bucket.lock:
+            self.bucket.blobs[self.name] = self
+            self.bucket.data[self.name] = bytes(data)
+
+    def make_public(self):
+        self.public = True
+
+    def download_as_bytes(self):
+        return self.bucket.data[self.name]
+
+
+class FakeBucket:
+    def __init__(self, name="test-bucket"):
+        self.name = name
+        self.blobs = {}
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def blob(self, name):
+        return FakeBlob(self, name)
@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from async_db import AsyncFirestore
+from fake_firestore import FakeFirestore
+
+class FakeAsyncDocument:
+    def __init__(self, client, name, doc_id):
+        self.__client = client
+        self.ref = client.db.collection(name).document(doc_id)
+
+    async def get(self):
+        return await self.__client.call(self.ref.get)
+
+    async def update(self, data):
+        return await self.__client.call(self.ref.update, data)
+
+class FakeAsyncCollection:
+    def __init__(self, client, name):
+        self.__client = client
+        self.__name = name
+
+    def document(self, doc_id):
+        return FakeAsyncDocument(self.__client, self.__name, doc_id)
+
+class FakeAsyncBatch:
+    def __init__(self, client):
+        self.__client = client
+        self.__batch = client.db.batch()
+
+    def update(self, document, data):
+        self.__batch.update(document.ref, data)
+
+    async def commit(self):
+        return await self.__client.call(self.__batch.commit)
+
+class FakeAsyncClient:
+    """Wraps FakeFirestore and records how many calls were in flight at once."""
+
+    def __init__(self, db, delay=0.05):
+        self.db = db
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.loop = asyncio.get_running_loop()
+
+    def collection(self, name):
+        return FakeAsyncCollection(self, name)
+
+    def batch(self):
+        return FakeAsyncBatch(self)
+
+    async def call(self, fn, *args):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return fn(*args)
+        finally:
+            self.in_flight -= 1
+
+@pytest.fixture
+def store():
+    db = FakeFirestore({
+        "users": {"u1": {"isPublican": False, "fullName": "Alice"}},
+        "gamers": {"u1": {"gamerId": "G0001", "profile": "04"}},
+    })
+    clients = []
+    runner = AsyncFirestore(lambda: clients.append(FakeAsyncClient(db)) or clients[-1])
+    yield db, runner, clients
+    runner.close()
+
+def test_reads_run_concurrently(store):
+    db, runner, clients = store
+    user_doc, gamer_doc, missing = asyncio.run(
+        runner.get_documents(("users", "u1"), ("gamers", "u1"), ("gamers", "nobody")))
+
+    assert user_doc.to_dict()["fullName"] == "Alice"
+    assert gamer_doc.to_dict()["gamerId"] == "G0001"
+    assert not missing.exists
+    assert clients[0].max_in_flight == 3
+
+def test_client_reused_across_request_loops(store):
+    db, runner, clients = store
+    # Each async Flask view runs on its own event loop; the client must stay on one loop
+    for _ in range(3):
+        asyncio.run(runner.get_documents(("users", "u1")))
+    assert len(clients) == 1
+
+def test_errors_propagate(store):
+    db, runner, clients = store
+    with pytest.raises(KeyError):
+        asyncio.run(runner.batch_update(("users", "missing", {"profile": "07"})))
+
+def test_close_and_restart(store):
+    db, runner, clients = store
+    asyncio.run(runner.get_documents(("users", "u1")))
+    runner.close()
+    runner.close()
+    asyncio.run(runner.get_documents(("users", "u1")))
+    assert len(clients) == 2
+
+def test_batch_update_single_commit(store):
+    db, runner, clients = store
+    asyncio.run(runner.batch_update(("users", "u1", {"profile": "09"}), ("gamers", "u1", {"profile": "09"})))
+
+    assert db.store["users"]["u1"]["profile"] == "09"
+    assert db.store["gamers"]["u1"]["profile"] == "09"
+    assert db.calls["commit"] == 1 and db.calls["update"] == 0
+
+def test_batch_update_is_all_or_nothing(store):
+    db, runner, clients = store
+    with pytest.raises(KeyError):
+        asyncio.run(runner.batch_update(("users", "u1", {"profile": "10"}), ("publican", "missing", {"profile": "10"})))
+    assert "profile" not in db.store["users"]["u1"]
@@ -0,0 +1,111 @@
+import random
+import threading
+
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from availability import SLOT_SECONDS, TableAvailability
+from timeutil import parse_timestamp
+
+EVENING = parse_timestamp("2025-03-20T18:00:00")
+
+def hours(start, end):
+    return EVENING + int(start * 3600), EVENING + int(end * 3600)
+
+def test_free_tables_over_overlapping_reservations():
+    availability = TableAvailability()
+    assert availability.reserve(4, *hours(0, 2), capacity=10)
+    assert availability.reserve(3, *hours(1, 3), capacity=10)
+
+    assert availability.get_free(*hours(0, 1), capacity=10) == 6
+    assert availability.get_free(*hours(1, 2), capacity=10) == 3
+    assert availability.get_free(*hours(2, 4), capacity=10) == 7
+    assert availability.get_free(*hours(3, 4), capacity=10) == 10
+    assert availability.get_peak() == 7
+    # Only 3 tables are free while both overlap
+    assert not availability.reserve(4, *hours(1.5, 2.5), capacity=10)
+    assert availability.reserve(4, *hours(2, 3), capacity=10)
+
+def test_accepts_timestamp_strings_and_rounds_to_slots():
+    availability = TableAvailability()
+    assert availability.reserve(2, "2025-03-20T19:05:00", "2025-03-20T19:20:00", 5)
+
+    # 19:05-19:20 holds the 19:00 and 19:15 slots
+    assert availability.get_free("2025-03-20T19:00:00", "2025-03-20T19:01:00", 5) == 3
+    assert availability.get_free("2025-03-20T19:25:00", "2025-03-20T19:30:00", 5) == 3
+    assert availability.get_free("2025-03-20T19:30:00", "2025-03-20T20:00:00", 5) == 5
+
+def test_invalid_times_raise():
+    availability = TableAvailability()
+    with pytest.raises(ValueError):
+        availability.reserve(1, *reversed(hours(0, 1)), capacity=5)
+    with pytest.raises(ValueError):
+        availability.get_peak("18:00", "21:00")
+
+def test_cancel_releases_only_what_is_held():
+    availability = TableAvailability()
+    availability.reserve(3, *hours(0, 2), capacity=5)
+
+    assert not availability.cancel(4, *hours(0, 2))
+    assert not availability.cancel(1, *hours(0, 1))
+    assert availability.cancel(2, *hours(0, 2))
+    assert availability.get_free(*hours(0, 2), capacity=5) == 4
+    assert availability.cancel(1, *hours(0, 2))
+    assert availability.get_peak() == 0
+
+def test_reserve_many_is_all_or_nothing():
+    availability = TableAvailability()
+    schedule = [(4, *hours(0, 2)), (4, *hours(1, 3)), (3, *hours(1.5, 2))]
+
+    assert availability.reserve_many(schedule, capacity=10) == 2
+    assert availability.get_peak() == 0
+    assert availability.reserve_many(schedule[:2], capacity=10) is None
+    assert availability.get_free(*hours(1, 2), capacity=10) == 2
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    availability = TableAvailability()
+    slots = 96
+    reserved = [0] * slots
+    capacity = 12
+    held = []
+    for _ in range(500):
+        first = rng.randrange(slots)
+        last = rng.randrange(first + 1, slots + 1)
+        span = (EVENING + first * SLOT_SECONDS, EVENING + last * SLOT_SECONDS)
+        if held and rng.random() < 0.3:
+            count, cancel_span = held.pop(rng.randrange(len(held)))
+            assert availability.cancel(count, *cancel_span)
+            for slot in range((cancel_span[0] - EVENING) // SLOT_SECONDS, (cancel_span[1] - EVENING) // SLOT_SECONDS):
+                reserved[slot] -= count
+            continue
+        count = rng.randint(1, 4)
+        fits = capacity - max(reserved[first:last]) >= count
+        assert availability.get_free(*span, capacity=capacity) == capacity - max(reserved[first:last])
+        assert availability.reserve(count, *span, capacity=capacity) == fits
+        if fits:
+            held.append((count, span))
+            for slot in range(first, last):
+                reserved[slot] += count
+    assert availability.get_peak() == max(reserved)
+
+def test_concurrent_reservations_never_overbook():
+    availability = TableAvailability()
+    barrier = threading.Barrier(16)
+    results = []
+
+    def book():
+        barrier.wait()
+        results.append(availability.reserve(1, *hours(0, 3), capacity=10))
+
+    threads = [threading.Thread(target=book) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 10
+    assert availability.get_free(*hours(0, 3), capacity=10) == 0
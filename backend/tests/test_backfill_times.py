@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backfill_times import backfill_times
+from timeutil import parse_timestamp
+from fake_firestore import FakeFirestore
+
+def make_db():
+    games = {f"game{i:03d}": {"start_time": "2025-03-20T19:00:00", "end_time": "2025-03-20T21:00:00",
+                              "expires": "2025-03-20T23:00:00Z"} for i in range(120)}
+    games["game000"]["expires_ts"] = 1
+    games["noexpiry"] = {"start_time": "2025-03-20T19:00:00", "end_time": "2025-03-20T21:00:00"}
+    events = {"E1": {"start_time": "2025-03-20T18:00:00", "end_time": "2025-03-21T00:00:00", "expires": "2025-03-21T01:00:00",
+                     "start_ts": parse_timestamp("2025-03-20T18:00:00"), "end_ts": parse_timestamp("2025-03-21T00:00:00"),
+                     "expires_ts": parse_timestamp("2025-03-21T01:00:00")}}
+    return FakeFirestore({"games": games, "events": events})
+
+def test_backfill_writes_epoch_fields():
+    db = make_db()
+
+    counts = backfill_times(db)
+
+    assert counts["processed"] == 122
+    assert counts["updated"] == 121
+    game = db.store["games"]["game000"]
+    assert game["expires_ts"] == parse_timestamp("2025-03-20T23:00:00Z")
+    assert game["end_ts"] - game["start_ts"] == 2 * 3600
+    # Without an expiry a game expires when it ends
+    assert db.store["games"]["noexpiry"]["expires_ts"] == db.store["games"]["noexpiry"]["end_ts"]
+
+def test_backfill_rerun_writes_nothing():
+    db = make_db()
+    backfill_times(db)
+    commits = db.calls["commit"]
+
+    counts = backfill_times(db)
+
+    assert counts["updated"] == 0
+    assert db.calls["commit"] == commits
@@ -0,0 +1,43 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bulk import Progress, chunked, commit_sets, existing_ids
+from fake_firestore import FakeFirestore
+
+def test_chunked():
+    assert list(chunked([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+    assert list(chunked([], 2)) == []
+
+def test_existing_ids_uses_chunked_get_all():
+    db = FakeFirestore({"gamers": {f"u{i}": {"email": f"u{i}@example.com"} for i in range(0, 700, 2)}})
+    found = existing_ids(db, "gamers", [f"u{i}" for i in range(700)], chunk_size=300)
+    assert found == {f"u{i}" for i in range(0, 700, 2)}
+    assert db.calls["get_all"] == 3
+    assert db.calls["get"] == 0
+
+def test_commit_sets_batches_writes():
+    db = FakeFirestore()
+    writes = [(db.collection("permissions").document(f"u{i}"), {"n": i}) for i in range(1201)]
+    assert commit_sets(db, writes) == 3
+    assert len(db.store["permissions"]) == 1201
+    assert db.calls["commit"] == 3 and db.calls["set"] == 0
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_progress_counters():
+    clock = FakeClock()
+    progress = Progress(clock=clock)
+    progress.add(processed=100, written=40)
+    progress.add(processed=100)
+    clock.now = 4.0
+
+    assert progress.get("written") == 40
+    assert progress.snapshot() == {"processed": 200, "written": 40, "elapsed_seconds": 4.0, "per_second": 50.0}
+    assert progress.report().startswith("processed=200, written=40")
@@ -0,0 +1,105 @@
+import math
+import random
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from columnar import GameColumns, FeedColumns, parse_game_filter, to_epoch
+from feed_cache import FeedCache, LocalDocument
+from spatial_index import haversine_km
+
+def game(i, lat, lng, start_hour, game_type="Trivia", max_players=4, joined=0):
+    return {
+        "id": f"game{i:05d}", "xcoord": lat, "ycoord": lng, "game_type": game_type,
+        "start_time": f"2025-03-20T{start_hour:02d}:00:00", "end_time": f"2025-03-20T{start_hour + 2:02d}:00:00",
+        "expires": f"2025-03-20T{start_hour + 3:02d}:00:00",
+        "max_players": max_players, "participants": [f"P{j}" for j in range(joined)],
+    }
+
+GAMES = [
+    game(0, 53.3448, -6.2764, 18),
+    game(1, "53.3400", "-6.2600", 20, game_type="Poker", joined=4),
+    game(2, 53.2707, -9.0568, 19, game_type="Poker", joined=1),
+    game(3, None, None, 17),
+]
+
+def ids(records):
+    return [record["id"] for record in records]
+
+def test_parse_game_filter():
+    assert parse_game_filter({}) is None
+    game_filter = parse_game_filter({"active_at": "2025-03-20T19:30:00", "open_seats": "2", "game_type": "Trivia,Poker"})
+    assert game_filter == {"active_at": to_epoch("2025-03-20T19:30:00"), "open_seats": 2, "game_types": ["Trivia", "Poker"]}
+    assert to_epoch("2025-03-20T19:30:00Z") == to_epoch("2025-03-20T20:30:00+01:00")
+    for bad in ({"starts_after": "tonight"}, {"open_seats": "0"}, {"open_seats": "x"}, {"sort": "name"}):
+        with pytest.raises(ValueError):
+            parse_game_filter(bad)
+
+def test_time_seat_and_type_filters():
+    columns = GameColumns(GAMES)
+    assert ids(columns.query(starts_after=to_epoch("2025-03-20T19:00:00"))) == ["game00001", "game00002"]
+    assert ids(columns.query(ends_before=to_epoch("2025-03-20T20:00:00"))) == ["game00000", "game00003"]
+    assert ids(columns.query(active_at=to_epoch("2025-03-20T19:30:00"))) == ["game00000", "game00002"]
+    assert ids(columns.query(open_seats=1)) == ["game00000", "game00002", "game00003"]
+    assert ids(columns.query(game_types=["Poker"], open_seats=1)) == ["game00002"]
+    assert columns.query(game_types=["Chess"]) == []
+
+def test_distance_filter_and_sort():
+    columns = GameColumns(GAMES)
+    nearby = columns.query(lat=53.3430, lng=-6.2700, radius_km=5)
+    assert ids(nearby) == ["game00000", "game00001"]
+    assert nearby[0]["distance_km"] == round(haversine_km(53.3430, -6.2700, 53.3448, -6.2764), 3)
+    assert "distance_km" not in GAMES[0]
+
+    assert ids(columns.query(bbox=(53.0, -10.0, 54.0, -8.0))) == ["game00002"]
+    assert ids(columns.query(sort="start_time", limit=2)) == ["game00003", "game00000"]
+    with pytest.raises(ValueError):
+        columns.query(sort="distance")
+
+def test_matches_a_plain_python_filter():
+    rng = random.Random(7)
+    records = [game(i, rng.uniform(53.2, 53.5), rng.uniform(-6.5, -6.0), rng.randrange(12, 22),
+                    game_type=rng.choice(["Trivia", "Poker", "Chess"]), max_players=8, joined=rng.randrange(0, 9))
+               for i in range(2000)]
+    columns = GameColumns(records)
+    active_at = to_epoch("2025-03-20T18:30:00")
+
+    result = columns.query(lat=53.35, lng=-6.26, radius_km=8, active_at=active_at, open_seats=2, game_types=["Poker"])
+    expected = sorted(
+        (haversine_km(53.35, -6.26, r["xcoord"], r["ycoord"]), r["id"]) for r in records
+        if haversine_km(53.35, -6.26, r["xcoord"], r["ycoord"]) <= 8
+        and to_epoch(r["start_time"]) <= active_at < to_epoch(r["end_time"])
+        and 8 - len(r["participants"]) >= 2 and r["game_type"] == "Poker")
+    assert ids(result) == [key for _, key in expected]
+    assert all(math.isclose(r["distance_km"], d, abs_tol=1e-3) for r, (d, _) in zip(result, expected))
+
+def test_feed_columns_rebuild_only_on_change():
+    feed = FeedCache(lambda doc: dict(doc.to_dict(), id=doc.id))
+    feed.load([LocalDocument(record["id"], {k: v for k, v in record.items() if k != "id"}) for record in GAMES[:2]])
+    view = FeedColumns(feed, spawn=lambda rebuild: rebuild())
+
+    first = view.get()
+    assert view.get() is first
+    assert ids(view.query(game_filter={"game_types": ["Poker"]})) == ["game00001"]
+
+    feed.load([LocalDocument("game00009", {"game_type": "Poker"})])
+    assert view.get() is not first
+    geo_filter = {"limit": 1, "min_lat": 53.0, "min_lng": -7.0, "max_lat": 54.0, "max_lng": -6.0}
+    assert view.query(geo_filter, {"game_types": ["Poker"]}) == []
+
+def test_feed_columns_serve_stale_until_swapped():
+    feed = FeedCache(lambda doc: dict(doc.to_dict(), id=doc.id))
+    feed.load([LocalDocument(record["id"], {k: v for k, v in record.items() if k != "id"}) for record in GAMES[:2]])
+    pending = []
+    view = FeedColumns(feed, spawn=pending.append)
+    first = view.get()
+
+    feed.load([LocalDocument("game00009", {"game_type": "Poker"})])
+    assert view.get() is first
+    assert view.get() is first
+    assert len(pending) == 1
+
+    pending.pop()()
+    assert ids(view.get().get_records()) == ["game00009"]
+    assert pending == []
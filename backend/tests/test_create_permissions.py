@@ -0,0 +1,55 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from create_permissions import (backfill_permissions, create_account_permissions,
+                                GAMER_PERMISSIONS, PUBLICAN_PERMISSIONS)
+from fake_firestore import FakeFirestore
+
+@pytest.fixture
+def store():
+    return {
+        "publicans": {f"pub{i:03d}": {"email": f"pub{i}@example.com"} for i in range(30)},
+        "gamers": dict({f"gam{i:04d}": {"email": f"gamer{i}@example.com"} for i in range(1200)},
+                       pub000={"email": "both@example.com"}),
+        "permissions": {"gam0000": {"custom": True}, "pub001": {"custom": True}},
+    }
+
+def test_bulk_backfill(store):
+    db = FakeFirestore(store)
+    report = backfill_permissions(db, page_size=500)
+
+    permissions = db.store["permissions"]
+    assert len(permissions) == 1230
+    assert permissions["gam0000"] == {"custom": True} and permissions["pub001"] == {"custom": True}
+    assert permissions["pub000"] == PUBLICAN_PERMISSIONS
+    assert permissions["gam0001"] == GAMER_PERMISSIONS
+
+    assert report["publicans"] == {"scanned": 30, "existing": 1, "other_role": 0, "missing": 29}
+    assert report["gamers"] == {"scanned": 1201, "existing": 1, "other_role": 1, "missing": 1199}
+    assert report["progress"]["processed"] == 1231 and report["progress"]["created"] == 1228
+    assert db.calls["get"] == 0 and db.calls["set"] == 0
+
+def test_bulk_backfill_is_idempotent(store):
+    db = FakeFirestore(store)
+    backfill_permissions(db)
+    commits = db.calls["commit"]
+
+    report = backfill_permissions(db)
+    assert report["gamers"]["missing"] == 0 and report["publicans"]["missing"] == 0
+    assert db.calls["commit"] == commits
+
+def test_dry_run_writes_nothing(store):
+    db = FakeFirestore(store)
+    report = backfill_permissions(db, dry_run=True)
+
+    assert len(db.store["permissions"]) == 2
+    assert db.calls["commit"] == 0
+    assert report["progress"]["would_create"] == 1228
+
+def test_bulk_matches_one_by_one(store):
+    one_by_one, bulk = FakeFirestore(store), FakeFirestore(store)
+    create_account_permissions(one_by_one)
+    backfill_permissions(bulk)
+    assert bulk.store["permissions"] == one_by_one.store["permissions"]
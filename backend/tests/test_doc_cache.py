@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from doc_cache import DocumentCache
+from fake_firestore import FakeFirestore
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def db():
+    return FakeFirestore({
+        "gamers": {"g1": {"gamerId": "g1", "fullName": "Ann"}},
+        "users": {"g1": {"isPublican": False}},
+    })
+
+def load(db, collection, doc_id):
+    return db.collection(collection).document(doc_id).get
+
+def test_repeated_reads_hit_the_cache(db):
+    cache = DocumentCache()
+    for _ in range(5):
+        doc = cache.get("gamers", "g1", load(db, "gamers", "g1"))
+        assert doc.exists and doc.id == "g1"
+        assert doc.to_dict()["fullName"] == "Ann"
+    assert db.calls["get"] == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (4, 1, 1)
+    assert stats["hit_rate"] == 0.8
+
+def test_missing_documents_are_cached(db):
+    cache = DocumentCache()
+    assert not cache.get("gamers", "nope", load(db, "gamers", "nope")).exists
+    assert not cache.get("gamers", "nope", load(db, "gamers", "nope")).exists
+    assert db.calls["get"] == 1
+
+def test_to_dict_returns_a_copy(db):
+    cache = DocumentCache()
+    doc = cache.get("gamers", "g1", load(db, "gamers", "g1"))
+    doc.to_dict().update({"fullName": "Changed"})
+    assert doc.to_dict()["fullName"] == "Ann"
+
+def test_ttl_expiry(db):
+    clock = FakeClock()
+    cache = DocumentCache(ttl=30, clock=clock)
+    cache.get("gamers", "g1", load(db, "gamers", "g1"))
+    db.store["gamers"]["g1"]["fullName"] = "Bea"
+
+    clock.now = 29
+    assert cache.get("gamers", "g1", load(db, "gamers", "g1")).get("fullName") == "Ann"
+    clock.now = 30
+    assert cache.get("gamers", "g1", load(db, "gamers", "g1")).get("fullName") == "Bea"
+    assert cache.stats()["expirations"] == 1
+
+def test_invalidate_after_write(db):
+    cache = DocumentCache()
+    cache.get("gamers", "g1", load(db, "gamers", "g1"))
+    db.collection("gamers").document("g1").update({"fullName": "Bea"})
+    cache.invalidate("gamers", "g1")
+    assert cache.get("gamers", "g1", load(db, "gamers", "g1")).get("fullName") == "Bea"
+    assert cache.stats()["invalidations"] == 1
+
+def test_invalidate_during_load_is_not_undone(db):
+    cache = DocumentCache()
+
+    def slow_load():
+        snapshot = db.collection("gamers").document("g1").get()
+        # A write lands and invalidates while the stale read is still in flight
+        db.collection("gamers").document("g1").update({"fullName": "Bea"})
+        cache.invalidate("gamers", "g1")
+        return snapshot
+
+    assert cache.get("gamers", "g1", slow_load).get("fullName") == "Ann"
+    assert cache.get("gamers", "g1", load(db, "gamers", "g1")).get("fullName") == "Bea"
+
+def test_old_invalidations_still_block_stale_puts(db):
+    cache = DocumentCache(max_entries=1)
+    since = cache.generation()
+    snapshot = db.collection("gamers").document("g1").get()
+    cache.invalidate("gamers", "g1")
+    cache.invalidate("users", "g1")
+
+    # g1's own invalidation was pruned, but it is known to be newer than since
+    cache.put("gamers", "g1", snapshot, since)
+    assert cache.peek("gamers", "g1") is None
+    cache.put("gamers", "g1", snapshot, cache.generation())
+    assert cache.peek("gamers", "g1") is not None
+
+def test_lru_eviction(db):
+    cache = DocumentCache(max_entries=2)
+    cache.get("gamers", "g1", load(db, "gamers", "g1"))
+    cache.get("users", "g1", load(db, "users", "g1"))
+    cache.get("gamers", "g1", load(db, "gamers", "g1"))
+    cache.get("gamers", "g2", load(db, "gamers", "g2"))
+
+    assert len(cache) == 2
+    assert cache.peek("gamers", "g1") is not None
+    assert cache.peek("users", "g1") is None
+    assert cache.stats()["evictions"] == 1
+
+def test_get_async(db):
+    cache = DocumentCache()
+
+    async def fetch():
+        return db.collection("users").document("g1").get()
+
+    async def read_twice():
+        first = await cache.get_async("users", "g1", fetch)
+        second = await cache.get_async("users", "g1", fetch)
+        return first, second
+
+    first, second = asyncio.run(read_twice())
+    assert first is second
+    assert first.to_dict() == {"isPublican": False}
+    assert db.calls["get"] == 1
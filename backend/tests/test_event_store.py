@@ -0,0 +1,73 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from event_store import EventStore
+from timeutil import parse_timestamp
+
+def make_event(start_time, game_type="Seat Based"):
+    return {"start_time": start_time, "game_type": game_type}
+
+def test_add_generates_ids_and_keeps_creation_order():
+    store = EventStore()
+    first = store.add(make_event("2025-03-20T21:00:00"))
+    second = store.add(make_event("2025-03-20T19:00:00"))
+
+    assert (first, second) == ("E1", "E2")
+    assert [event["start_time"] for event in store] == ["2025-03-20T21:00:00", "2025-03-20T19:00:00"]
+    assert len(store) == 2
+    assert first in store
+
+def test_add_with_explicit_id_replaces_existing():
+    store = EventStore()
+    store.add(make_event("2025-03-20T19:00:00"), "E1")
+    store.add(make_event("2025-03-20T20:00:00"), "E1")
+
+    assert len(store) == 1
+    assert store.get("E1")["start_time"] == "2025-03-20T20:00:00"
+    assert store.find("2025-03-20T19:00:00", "Seat Based") is None
+    assert [event["start_time"] for event in store.between(0, float("inf"))] == ["2025-03-20T20:00:00"]
+    # The next generated ID skips the one already taken
+    assert store.add(make_event("2025-03-20T21:00:00")) == "E2"
+
+def test_remove_and_find():
+    store = EventStore()
+    first = store.add(make_event("18:00"))
+    second = store.add(make_event("18:00"))
+    store.add(make_event("18:00", "Table Based"))
+
+    assert store.find("18:00", "Seat Based") == first
+    assert store.remove(first)["start_time"] == "18:00"
+    assert store.remove(first) is None
+    assert store.find("18:00", "Seat Based") == second
+    assert store.remove(second) is not None
+    assert store.find("18:00", "Seat Based") is None
+    assert len(store) == 1
+
+def test_between_and_upcoming_use_start_order():
+    store = EventStore()
+    for hour in (22, 18, 20, 19, 21):
+        store.add(make_event(f"2025-03-20T{hour}:00:00"))
+    store.add(make_event("18:00"))  # unparseable, never matched by time queries
+
+    start = parse_timestamp("2025-03-20T19:00:00")
+    end = parse_timestamp("2025-03-20T21:00:00")
+    assert [event["start_time"][11:13] for event in store.between(start, end)] == ["19", "20"]
+    assert [event["start_time"][11:13] for event in store.between("2025-03-20T19:00:00", "2025-03-20T23:00:00", limit=2)] == ["19", "20"]
+    assert [event["start_time"][11:13] for event in store.upcoming(now=end)] == ["21", "22"]
+    assert store.upcoming(now=parse_timestamp("2025-03-21T00:00:00")) == []
+    for start, end in (("tonight", "2025-03-20T23:00:00"), ("2025-03-20T19:00:00", None)):
+        with pytest.raises(ValueError):
+            store.between(start, end)
+
+def test_removed_events_leave_time_queries_and_compaction_keeps_survivors():
+    store = EventStore()
+    ids = [store.add(make_event(f"2025-03-20T{hour}:00:00")) for hour in range(10, 20)]
+    for event_id in ids[:8]:
+        store.remove(event_id)
+
+    assert [event["start_time"][11:13] for event in store.upcoming(now=0)] == ["18", "19"]
+    # Re-adding under a removed ID indexes the new start only
+    store.add(make_event("2025-03-20T09:00:00"), ids[0])
+    assert [event["start_time"][11:13] for event in store.upcoming(now=0)] == ["09", "18", "19"]
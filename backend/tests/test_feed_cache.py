@@ -0,0 +1,208 @@
+import json
+import time
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from feed_cache import FeedCache, LocalCollection, LocalDocument
+from timeutil import parse_timestamp
+
+class FakeClock:
+    # Set as a local "YYYY-MM-DDTHH:mm:ss" string, read as epoch seconds like timeutil.now_ts
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return parse_timestamp(self.now)
+
+def serialize(doc):
+    data = doc.to_dict()
+    return {"id": doc.id, "game_name": data.get("game_name"), "expires": data.get("expires"),
+            "xcoord": data.get("xcoord"), "ycoord": data.get("ycoord")}
+
+def game(name, expires, xcoord=53.3455, ycoord=-6.2643):
+    return {"game_name": name, "expires": expires, "xcoord": xcoord, "ycoord": ycoord}
+
+@pytest.fixture
+def clock():
+    return FakeClock("2025-03-20T20:00:00")
+
+@pytest.fixture
+def games():
+    return LocalCollection({
+        "g2": game("Darts", "2025-03-20T23:00:00"),
+        "g1": game("Trivia", "2025-03-20T21:00:00"),
+        "old": game("Expired", "2025-03-20T19:00:00"),
+    })
+
+def test_listener_primes_cache(games, clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock)
+    assert not feed.is_ready()
+    feed.attach(games)
+
+    assert feed.is_ready()
+    # Already expired games never enter the view; order follows (expires, id)
+    assert [record["id"] for record in feed.snapshot()] == ["g1", "g2"]
+
+def test_listener_applies_changes(games, clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock)
+    feed.attach(games)
+    version = feed.get_version()
+
+    games.set("g3", game("Poker", "2025-03-20T22:00:00"))
+    games.set("g1", game("Trivia Night", "2025-03-20T21:00:00"))
+    games.delete("g2")
+
+    assert feed.get_version() > version
+    assert [record["id"] for record in feed.snapshot()] == ["g1", "g3"]
+    assert feed.get("g1")["game_name"] == "Trivia Night"
+    assert feed.get("g2") is None
+
+def test_expired_entries_dropped_on_read(games, clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock)
+    feed.attach(games)
+
+    clock.now = "2025-03-20T21:00:00"
+    assert [record["id"] for record in feed.snapshot()] == ["g2"]
+    assert len(feed) == 1
+    assert feed.get_index().query_radius(53.3455, -6.2643, 1) == [("g2", 0.0)]
+
+    # Extending a game's expiry keeps it alive past its old deadline
+    games.set("g2", game("Darts", "2025-03-21T01:00:00"))
+    clock.now = "2025-03-20T23:30:00"
+    assert [record["id"] for record in feed.snapshot()] == ["g2"]
+
+def test_detach_stops_updates(games, clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock)
+    feed.attach(games)
+    feed.detach()
+    games.set("g3", game("Poker", "2025-03-20T22:00:00"))
+    assert feed.get("g3") is None
+
+def test_load_read_through(games, clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock)
+    feed.load(games.stream())
+    assert feed.is_ready()
+    assert [record["id"] for record in feed.snapshot()] == ["g1", "g2"]
+
+def test_payload_cached_until_change(games, clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock, dumps=json.dumps)
+    feed.attach(games)
+
+    payload = feed.payload()
+    assert [record["id"] for record in json.loads(payload)] == ["g1", "g2"]
+    assert feed.payload() is payload
+
+    games.set("g3", game("Poker", "2025-03-20T22:00:00"))
+    assert [record["id"] for record in json.loads(feed.payload())] == ["g1", "g3", "g2"]
+
+def test_feed_read_latency(clock):
+    games = LocalCollection({
+        f"g{i}": game(f"Game {i}", f"2025-03-2{1 + i % 8}T{i % 24:02d}:00:00", 53 + i % 100 / 100, -6 - i % 70 / 100)
+        for i in range(10000)
+    })
+    feed = FeedCache(serialize, expires_field="expires", clock=clock, dumps=json.dumps)
+    feed.attach(games)
+    feed.payload()
+
+    timings = []
+    for _ in range(200):
+        start = time.perf_counter()
+        feed.payload()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    assert timings[int(len(timings) * 0.99)] < 0.005
+
+def test_etag_tracks_content(games, clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock, dumps=json.dumps)
+    feed.attach(games)
+
+    etag = feed.etag()
+    assert etag == feed.etag()
+    games.set("g3", game("Poker", "2025-03-20T22:00:00"))
+    assert feed.etag() != etag
+
+def test_incremental_payload_matches_reload(games, clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock, dumps=json.dumps)
+    feed.attach(games)
+    feed.payload()
+    games.set("g3", game("Poker", "2025-03-20T22:00:00"))
+    games.set("g1", game("Chess", "2025-03-21T23:30:00"))
+    games.delete("g2")
+
+    fresh = FeedCache(serialize, expires_field="expires", clock=clock, dumps=json.dumps)
+    fresh.load(games.stream())
+    assert json.loads(feed.payload()) == feed.snapshot() == fresh.snapshot()
+    assert feed.payload() == fresh.payload()
+    assert feed.etag() == fresh.etag()
+
+def test_changes_since_cursor(games, clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock)
+    feed.attach(games)
+    cursor = feed.get_cursor()
+
+    updated, removed, next_cursor = feed.changes_since(cursor)
+    assert (updated, removed, next_cursor) == ([], [], cursor)
+
+    games.set("g3", game("Poker", "2025-03-20T22:00:00"))
+    games.set("g2", game("Darts Final", "2025-03-20T23:00:00"))
+    games.delete("g1")
+
+    updated, removed, next_cursor = feed.changes_since(cursor)
+    assert [record["id"] for record in updated] == ["g2", "g3"]
+    assert removed == ["g1"]
+    assert next_cursor != cursor
+
+    # Expiry shows up as a removal in the next delta
+    clock.now = "2025-03-20T22:30:00"
+    updated, removed, _ = feed.changes_since(next_cursor)
+    assert updated == [] and removed == ["g3"]
+
+def test_readded_record_is_not_a_removal(games, clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock)
+    feed.attach(games)
+    cursor = feed.get_cursor()
+
+    games.delete("g1")
+    games.set("g1", game("Trivia", "2025-03-20T21:00:00"))
+
+    updated, removed, _ = feed.changes_since(cursor)
+    assert [record["id"] for record in updated] == ["g1"] and removed == []
+
+@pytest.mark.parametrize("cursor", [None, "", "garbage", "deadbeef.1", "deadbeef.x"])
+def test_unknown_cursor_needs_full_resync(games, clock, cursor):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock)
+    feed.attach(games)
+    assert feed.changes_since(cursor) is None
+
+def test_stale_cursor_after_reload_or_tombstone_overflow(games, clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock, max_tombstones=1)
+    feed.attach(games)
+    cursor = feed.get_cursor()
+
+    games.delete("g1")
+    assert feed.changes_since(cursor) is not None
+    games.delete("g2")
+    # Only one tombstone is kept, so the old cursor can no longer be answered with a delta
+    assert feed.changes_since(cursor) is None
+
+    cursor = feed.get_cursor()
+    feed.load(games.stream())
+    assert feed.changes_since(cursor) is None
+    assert feed.changes_since(feed.get_cursor()) == ([], [], feed.get_cursor())
+
+def test_snapshot_follows_order_by(clock):
+    pubs = LocalCollection({"p1": {"game_name": "Zed's"}, "p2": {"game_name": None}, "p3": {"game_name": "Annie's"}})
+    feed = FeedCache(serialize, clock=clock, order_by=("game_name",))
+    feed.attach(pubs)
+    assert feed.get_order_by() == ("game_name",)
+    assert [record["id"] for record in feed.snapshot()] == ["p2", "p3", "p1"]
+
+def test_expiry_accepts_any_timestamp_format(clock):
+    feed = FeedCache(serialize, expires_field="expires", clock=clock)
+    feed.load([LocalDocument("utc", game("UTC", "2099-01-01T00:00:00Z")),
+               LocalDocument("bad", game("Bad", "23:59")),
+               LocalDocument("none", game("None", None))])
+    assert [record["id"] for record in feed.snapshot()] == ["utc"]
+    assert feed.get_expires_at("utc") == parse_timestamp("2099-01-01T00:00:00Z")
@@ -0,0 +1,116 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from friends import FriendResolver, friend_summary, IN_QUERY_LIMIT
+from fake_firestore import FakeFirestore, FakeQuery
+
+def make_db(count):
+    return FakeFirestore({"gamers": {
+        f"uid{i}": {"gamerId": f"G{i:04d}", "fullName": f"Gamer {i}", "profile": "05",
+                    "statusMessage": "Up for darts", "email": f"g{i}@example.com"}
+        for i in range(count)
+    }})
+
+def test_friend_summary():
+    assert friend_summary("G1", None) == {"gamerId": "G1", "fullName": "Unknown User", "profile": "03"}
+    assert friend_summary("G1", {"fullName": "Alice"}) == {
+        "gamerId": "G1", "fullName": "Alice", "profile": "01", "statusMessage": ""}
+    # Stored values are kept even when falsy
+    assert friend_summary("G1", {"fullName": "", "profile": "02", "statusMessage": ""})["fullName"] == ""
+
+def test_missing_fields_get_defaults_but_empty_ones_are_kept():
+    db = FakeFirestore({"gamers": {"uid0": {"gamerId": "G0000", "fullName": ""}}})
+
+    details = FriendResolver(db).fetch_friend_details(["G0000"])
+
+    assert details == [{"gamerId": "G0000", "fullName": "", "profile": "01", "statusMessage": ""}]
+
+def test_resolve_batches_in_queries():
+    db = make_db(200)
+    resolver = FriendResolver(db)
+    friends = [f"G{i:04d}" for i in range(200)]
+
+    details = resolver.fetch_friend_details(friends)
+
+    assert [friend["gamerId"] for friend in details] == friends
+    assert details[7] == {"gamerId": "G0007", "fullName": "Gamer 7", "profile": "05", "statusMessage": "Up for darts"}
+    # 200 friends cost ceil(200 / 30) queries instead of 200
+    assert db.calls["query"] == -(-200 // IN_QUERY_LIMIT)
+    assert resolver.lookup("G0007") == "uid7"
+
+def test_known_friends_fetched_by_key():
+    db = make_db(50)
+    resolver = FriendResolver(db)
+    friends = [f"G{i:04d}" for i in range(50)]
+    resolver.resolve(friends)
+    db.calls.clear()
+
+    assert len(resolver.resolve(friends)) == 50
+    assert db.calls == {"get_all": 1}
+
+def test_unknown_and_duplicate_friends():
+    db = make_db(3)
+    resolver = FriendResolver(db)
+
+    details = resolver.fetch_friend_details(["G0001", "NOPE1", "G0001"])
+
+    assert [friend["fullName"] for friend in details] == ["Gamer 1", "Unknown User", "Gamer 1"]
+    assert resolver.lookup("NOPE1") is None
+
+def test_stale_index_entry_falls_back_to_query():
+    db = make_db(3)
+    resolver = FriendResolver(db)
+    resolver.remember("G0002", "deleted_doc")
+
+    found = resolver.resolve(["G0002"])
+
+    assert found["G0002"]["fullName"] == "Gamer 2"
+    assert resolver.lookup("G0002") == "uid2"
+
+def test_failed_chunk_only_loses_its_own_friends(monkeypatch):
+    db = make_db(60)
+    stream = FakeQuery.stream
+
+    def flaky_stream(query):
+        if any(field == "gamerId" and "G0000" in value for field, op, value in query._filters):
+            raise RuntimeError("deadline exceeded")
+        return stream(query)
+
+    monkeypatch.setattr(FakeQuery, "stream", flaky_stream)
+    friends = [f"G{i:04d}" for i in range(60)]
+
+    details = FriendResolver(db).fetch_friend_details(friends)
+
+    names = [friend["fullName"] for friend in details]
+    assert names[:IN_QUERY_LIMIT] == ["Unknown User"] * IN_QUERY_LIMIT
+    assert names[IN_QUERY_LIMIT:] == [f"Gamer {i}" for i in range(IN_QUERY_LIMIT, 60)]
+
+def test_failed_get_all_falls_back_to_queries():
+    class BrokenGetAll(FakeFirestore):
+        def get_all(self, refs, field_paths=None):
+            raise RuntimeError("unavailable")
+
+    db = BrokenGetAll(make_db(3).store)
+    resolver = FriendResolver(db)
+    resolver.remember("G0001", "uid1")
+
+    assert resolver.resolve(["G0001"])["G0001"]["fullName"] == "Gamer 1"
+    assert resolver.lookup("G0001") == "uid1"
+
+def test_indexed_document_without_gamer_id_is_stale():
+    db = make_db(3)
+    del db.store["gamers"]["uid1"]["gamerId"]
+    resolver = FriendResolver(db)
+    resolver.remember("G0001", "uid1")
+
+    assert resolver.fetch_friend_details(["G0001"])[0]["fullName"] == "Unknown User"
+    assert resolver.lookup("G0001") is None
+
+def test_remember_and_forget():
+    resolver = FriendResolver(make_db(1))
+    resolver.remember("G0000", "uid0")
+    assert resolver.lookup("G0000") == "uid0"
+    resolver.forget("G0000")
+    assert resolver.lookup("G0000") is None
@@ -49,4 +49,65 @@ def test_table_based_game():
     assert table_game.reserve_table_spot("Charlie", "Table 1") == "Charlie has reserved a spot at Table 1."
     assert table_game.reserve_table_spot("Eve", "Table 3") == "Table not found."
     assert table_game.cancel_table_reservation("Charlie") == "Charlie's reservation at Table 1 has been canceled."
-    assert table_game.cancel_table_reservation("Eve") == "Participant not found."
\ No newline at end of file
+    assert table_game.cancel_table_reservation("Eve") == "Participant not found."
+
+def test_games_use_slots():
+    game = Game("Alice", "Poker Night", "A fun poker game.", "Card Game", "18:00", "21:00", "23:00", "PUB123", "Pub A", 10.0, 20.0, 5)
+    seat_game = SeatBasedGame("Alice", "Chess Tournament", "Competitive chess event.", "Board Game", "17:00", "19:00", "23:59", "PUB456", "Pub B", 10.5, 20.5, 4)
+    table_game = TableBasedGame("Alice", "D&D Night", "Tabletop roleplaying session.", "Roleplaying", "19:00", "22:00", "23:59", "PUB789", "Pub C", 10.2, 21.8, 6, ["Table 1", "Table 2"])
+    for instance in (game, seat_game, table_game):
+        assert not hasattr(instance, "__dict__")
+
+    game.set_max_players(8)
+    game.set_expires("23:30")
+    assert game.get_max_players() == 8
+    assert game.get_game_details()["expires"] == "23:30"
+
+def test_participants_keep_join_order():
+    game = Game("Alice", "Quiz", "Pub quiz.", "Trivia", "18:00", "21:00", "23:00", "PUB123", "Pub A", 10.0, 20.0, 1000)
+    for i in range(1000):
+        game.add_participant(f"P{i}")
+    game.remove_participant("P500")
+
+    assert game.get_participant_count() == 999
+    assert not game.has_participant("P500")
+    assert game.get_participants()[499:502] == ["P499", "P501", "P502"]
+    assert game.get_game_details()["participants"] == game.get_participants()
+
+def test_seat_index():
+    seat_game = SeatBasedGame("Alice", "Chess Tournament", "Competitive chess event.", "Board Game", "17:00", "19:00", "23:59", "PUB456", "Pub B", 10.5, 20.5, 4)
+    seat_game.reserve_seat("Bob", 3)
+    seat_game.reserve_seat("Charlie", 1)
+
+    assert seat_game.get_seat("Bob") == 3
+    assert seat_game.reserve_seat("Bob", 2) == "Bob has already joined the game."
+    assert seat_game.get_participants() == ["Bob", "Charlie"]
+
+    seat_game.cancel_reservation("Bob")
+    assert seat_game.get_seat("Bob") is None
+    assert seat_game.get_seat_details()[3] is None
+    assert seat_game.reserve_seat("Dave", 3) == "Dave has reserved seat 3."
+
+def test_table_index():
+    table_game = TableBasedGame("Alice", "D&D Night", "Tabletop roleplaying session.", "Roleplaying", "19:00", "22:00", "23:59", "PUB789", "Pub C", 4, 21.8, 4, ["Table 1", "Table 2"])
+    table_game.reserve_table_spot("Bob", "Table 2")
+    table_game.reserve_table_spot("Charlie", "Table 2")
+
+    assert table_game.get_table("Charlie") == "Table 2"
+    assert table_game.reserve_table_spot("Dave", "Table 2") == "Table is full."
+    assert table_game.get_table_details() == {"Table 1": [], "Table 2": ["Bob", "Charlie"]}
+
+    table_game.cancel_table_reservation("Bob")
+    assert table_game.get_table("Bob") is None
+    assert table_game.get_table_details()["Table 2"] == ["Charlie"]
+    assert table_game.get_participants() == ["Charlie"]
+
+def test_game_timestamps():
+    game = Game("Alice", "Quiz", "Pub quiz.", "Trivia", "2025-03-20T19:00:00", "2025-03-20T21:00:00", "2025-03-20T22:00:00", "PUB1", "Pub A", 10.0, 20.0, 4)
+    assert game.get_end_ts() - game.get_start_ts() == 2 * 3600
+    assert game.is_expired(game.get_expires_ts())
+    assert not game.is_expired(game.get_expires_ts() - 1)
+
+    game.set_expires("2025-03-20T23:00:00")
+    assert game.get_expires_ts() - game.get_start_ts() == 4 * 3600
+    assert Game("Alice", "Quiz", "Pub quiz.", "Trivia", "18:00", "21:00", "23:00", "PUB1", "Pub A", 10.0, 20.0, 4).get_start_ts() is None
@@ -7,6 +7,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from Gamer import Gamer
+from id_allocator import IdAllocator, LocalBlockSource
 
 def test_gamer_initialization_valid_profile():
     name = "Alice"
@@ -95,7 +96,12 @@ def test_unique_gamer_ids():
     gamer2 = Gamer("Grace", "grace@example.com", "pass2", "07")
     assert gamer1.get_gamer_id() != gamer2.get_gamer_id()
 
+@pytest.fixture
+def fresh_id_allocator():
+    previous = Gamer.set_id_allocator(IdAllocator(LocalBlockSource()))
+    yield
+    Gamer.set_id_allocator(previous)
 
-
-
-
+def test_gamer_ids_from_allocator(fresh_id_allocator):
+    ids = {Gamer("Test", "test@example.com", "password", None).get_gamer_id() for _ in range(2000)}
+    assert len(ids) == 2000
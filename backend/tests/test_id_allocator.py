@@ -0,0 +1,72 @@
+import threading
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from id_allocator import (ALPHABET, KEYSPACE, FeistelPermutation, FirestoreBlockSource, IdAllocator,
+                          LocalBlockSource, encode_id, legacy_ids)
+from fake_firestore import FakeFirestore, fake_transactional
+
+def test_encode_id():
+    assert encode_id(0) == "AAAAA"
+    assert encode_id(KEYSPACE - 1) == "99999"
+    assert encode_id(37) == "AAABB"
+    with pytest.raises(ValueError):
+        encode_id(KEYSPACE)
+
+def test_feistel_is_a_permutation():
+    permutation = FeistelPermutation(size=10007, key=b"test")
+    assert sorted(permutation(value) for value in range(10007)) == list(range(10007))
+    # Consecutive counters do not give consecutive IDs
+    assert [permutation(value) for value in range(5)] != list(range(5))
+
+def test_feistel_depends_on_key():
+    assert [FeistelPermutation(key=b"a")(v) for v in range(10)] != [FeistelPermutation(key=b"b")(v) for v in range(10)]
+    assert FeistelPermutation()(KEYSPACE - 1) < KEYSPACE
+
+def test_local_allocator_ids_are_unique():
+    allocator = IdAllocator(LocalBlockSource(), block_size=100)
+    ids = [allocator.next_id() for _ in range(20000)]
+    assert len(set(ids)) == 20000
+    assert all(len(gamer_id) == 5 and set(gamer_id) <= set(ALPHABET) for gamer_id in ids)
+
+def test_allocator_skips_legacy_ids():
+    unchecked = IdAllocator(LocalBlockSource(), block_size=4)
+    first_ids = [unchecked.next_id() for _ in range(6)]
+    db = FakeFirestore({"gamers": {
+        "u1": {"gamerId": first_ids[0]},
+        "u2": {"gamer_id": first_ids[2]},
+        "u3": {"fullName": "No ID"},
+    }})
+    allocator = IdAllocator(LocalBlockSource(), block_size=4, taken=legacy_ids(db, "gamers", "gamerId", "gamer_id"))
+
+    assert [allocator.next_id() for _ in range(4)] == [first_ids[1]] + first_ids[3:6]
+    # The legacy IDs are loaded once
+    assert db.calls["query"] == 1
+
+def test_keyspace_exhaustion():
+    allocator = IdAllocator(LocalBlockSource(limit=3), block_size=2)
+    [allocator.next_id() for _ in range(3)]
+    with pytest.raises(RuntimeError):
+        allocator.next_id()
+
+def test_workers_sharing_a_firestore_counter_never_collide():
+    db = FakeFirestore()
+    workers = [IdAllocator(FirestoreBlockSource(db, fake_transactional, "gamer_ids"), block_size=50) for _ in range(4)]
+    results = [[] for _ in workers]
+
+    def run(i):
+        results[i].extend(workers[i].next_id() for _ in range(1000))
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(workers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [gamer_id for result in results for gamer_id in result]
+    assert len(set(ids)) == 4000
+    # One transaction per block of 50, not one round trip per ID
+    assert db.calls["commit"] == 80
+    assert db.store["counters"]["gamer_ids"] == {"next": 4000}
@@ -0,0 +1,77 @@
+import io
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from PIL import Image
+
+from image_pipeline import (CACHE_CONTROL, ImagePipeline, open_image, parse_variant_args, render_variants,
+                            variant_url, with_image_variant)
+from fake_storage import FakeBucket
+
+def make_image(width, height, mode="RGB", image_format="JPEG"):
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), (200, 30, 30, 128) if mode == "RGBA" else (200, 30, 30)).save(buffer, image_format)
+    return buffer.getvalue()
+
+def test_publish_stores_immutable_variants():
+    bucket = FakeBucket()
+    manifest = ImagePipeline(bucket).publish("PUB1", io.BytesIO(make_image(2000, 1000)))
+
+    assert manifest["widths"] == {"thumb": [160, 80], "small": [480, 240], "medium": [960, 480], "large": [1600, 800]}
+    assert manifest["formats"] == ["webp", "jpeg"]
+    assert manifest["base"].startswith("https://storage.googleapis.com/test-bucket/pub_images/PUB1/")
+    assert len(bucket.blobs) == 8
+    for name, blob in bucket.blobs.items():
+        assert blob.cache_control == CACHE_CONTROL
+        assert blob.public
+        decoded = Image.open(io.BytesIO(bucket.data[name]))
+        assert decoded.format == ("WEBP" if name.endswith(".webp") else "JPEG")
+        assert blob.content_type == f"image/{name.rsplit('.', 1)[1]}"
+        assert list(decoded.size) == manifest["widths"][name.rsplit("/", 1)[1].split(".")[0]]
+
+def test_same_image_gets_same_paths_and_changed_image_new_ones():
+    bucket = FakeBucket()
+    pipeline = ImagePipeline(bucket)
+    first = pipeline.publish("PUB1", make_image(400, 300))
+    assert pipeline.publish("PUB1", make_image(400, 300))["base"] == first["base"]
+    assert pipeline.publish("PUB1", make_image(401, 300))["base"] != first["base"]
+
+def test_small_images_are_not_upscaled():
+    variants = render_variants(open_image(make_image(300, 200)))
+    assert [(name, image.size) for name, image in variants] == [("small", (300, 200)), ("thumb", (160, 107))]
+
+def test_transparent_png_keeps_alpha_in_webp_only():
+    bucket = FakeBucket()
+    manifest = ImagePipeline(bucket).publish("PUB1", make_image(200, 200, "RGBA", "PNG"))
+    assert Image.open(io.BytesIO(bucket.data[variant_url(manifest, 200, "webp")[len("https://storage.googleapis.com/test-bucket/"):]])).mode == "RGBA"
+    assert Image.open(io.BytesIO(bucket.data[variant_url(manifest, 200)[len("https://storage.googleapis.com/test-bucket/"):]])).mode == "RGB"
+
+def test_invalid_images_are_refused():
+    with pytest.raises(ValueError):
+        ImagePipeline(FakeBucket()).publish("PUB1", b"not an image")
+
+def test_variant_url_picks_narrowest_wide_enough():
+    manifest = {"base": "https://cdn/x", "formats": ["webp", "jpeg"],
+                "widths": {"thumb": [160, 80], "small": [480, 240], "medium": [960, 480], "large": [1600, 800]}}
+
+    assert variant_url(manifest) == "https://cdn/x/medium.jpeg"
+    assert variant_url(manifest, 100, "webp") == "https://cdn/x/thumb.webp"
+    assert variant_url(manifest, 481) == "https://cdn/x/medium.jpeg"
+    assert variant_url(manifest, 5000, "webp") == "https://cdn/x/large.webp"
+    assert variant_url(dict(manifest, widths={"thumb": [160, 80]})) == "https://cdn/x/thumb.jpeg"
+
+    record = {"id": "PUB1", "pub_image_url": "old", "pub_image_variants": manifest}
+    assert with_image_variant(record, 300, "webp")["pub_image_url"] == "https://cdn/x/small.webp"
+    assert record["pub_image_url"] == "old"
+    plain = {"id": "PUB2", "pub_image_url": "old", "pub_image_variants": None}
+    assert with_image_variant(plain, 300) is plain
+
+def test_parse_variant_args():
+    assert parse_variant_args({}) is None
+    assert parse_variant_args({"image_width": "320"}) == (320, None)
+    assert parse_variant_args({"image_format": "webp"}) == (None, "webp")
+    for args in ({"image_width": "0"}, {"image_width": "wide"}, {"image_format": "gif"}):
+        with pytest.raises(ValueError):
+            parse_variant_args(args)
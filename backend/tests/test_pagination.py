@@ -0,0 +1,93 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pagination import (encode_cursor, decode_cursor, parse_page_args, paginate_records, paginate_query,
+                        order_key, record_values, GAME_ORDER, PUB_ORDER, MAX_PAGE_SIZE)
+from serializers import PUB_PROJECTION
+from fake_firestore import FakeFirestore
+
+PUBS = {
+    "p1": {"pub_name": "The Brazen Head", "address": "20 Bridge St"},
+    "p2": {"pub_name": "Kehoe's", "address": "9 South Anne St"},
+    "p3": {"pub_name": "Kehoe's", "address": "Duplicate name"},
+    "p4": {"pub_name": "Mulligan's", "address": "8 Poolbeg St"},
+    "p5": {"pub_name": "The Long Hall", "address": "51 South Great George's St"},
+}
+
+def sorted_pubs():
+    records = [dict(data, id=doc_id) for doc_id, data in PUBS.items()]
+    return sorted(records, key=lambda record: (record["pub_name"], record["id"]))
+
+def walk(fetch_page, page_size):
+    pages, after = [], None
+    while True:
+        page, next_cursor = fetch_page(page_size, after)
+        pages.append([record["id"] for record in page])
+        if next_cursor is None:
+            return pages
+        after = decode_cursor(next_cursor, PUB_ORDER)
+
+def test_cursor_round_trip():
+    cursor = encode_cursor([1742511600, "game1"])
+    assert "=" not in cursor
+    assert decode_cursor(cursor, GAME_ORDER) == [1742511600, "game1"]
+
+@pytest.mark.parametrize("cursor", ["!!!", encode_cursor(["only-one"]), encode_cursor([1, 1]), encode_cursor({"a": 1}),
+                                    encode_cursor(["2025-03-20T23:00:00", "game1"]), encode_cursor([True, "game1"])])
+def test_bad_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, GAME_ORDER)
+
+def test_cursor_value_must_match_sort_key_type():
+    # [1, "x"]: a number where pub names are strings
+    with pytest.raises(ValueError):
+        parse_page_args({"cursor": "WzEsIngiXQ"}, PUB_ORDER)
+
+def test_parse_page_args():
+    assert parse_page_args({}, PUB_ORDER) is None
+    assert parse_page_args({"page_size": "10"}, PUB_ORDER) == (10, None)
+    cursor = encode_cursor(["Kehoe's", "p2"])
+    assert parse_page_args({"cursor": cursor}, PUB_ORDER) == (50, ["Kehoe's", "p2"])
+    with pytest.raises(ValueError):
+        parse_page_args({"page_size": str(MAX_PAGE_SIZE + 1)}, PUB_ORDER)
+    with pytest.raises(ValueError):
+        parse_page_args({"page_size": "0"}, PUB_ORDER)
+
+def test_paginate_records_walks_every_record_once():
+    records = sorted_pubs()
+    pages = walk(lambda size, after: paginate_records(records, PUB_ORDER, size, after), 2)
+    assert pages == [["p2", "p3"], ["p4", "p1"], ["p5"]]
+
+def test_paginate_records_exact_fit_and_empty():
+    records = sorted_pubs()
+    page, next_cursor = paginate_records(records, PUB_ORDER, 5)
+    assert len(page) == 5 and next_cursor is None
+    assert paginate_records([], PUB_ORDER, 5) == ([], None)
+
+def test_cursor_survives_deleted_record():
+    records = sorted_pubs()
+    _, next_cursor = paginate_records(records, PUB_ORDER, 2)
+    remaining = [record for record in records if record["id"] != "p3"]
+    page, _ = paginate_records(remaining, PUB_ORDER, 2, decode_cursor(next_cursor, PUB_ORDER))
+    assert [record["id"] for record in page] == ["p4", "p1"]
+
+def test_paginate_query_matches_in_memory_pages():
+    db = FakeFirestore({"publicans": PUBS})
+    query = PUB_PROJECTION.select(db.collection("publicans"))
+    pages = walk(lambda size, after: paginate_query(query, PUB_ORDER, size, PUB_PROJECTION, after), 2)
+
+    assert pages == [["p2", "p3"], ["p4", "p1"], ["p5"]]
+    assert db.calls["query"] == 3
+
+def test_pubs_without_a_name_are_left_out_of_both_paths():
+    pubs = dict(PUBS, p0={"address": "No name"}, p9={"pub_name": None, "address": "Null name"})
+    db = FakeFirestore({"publicans": pubs})
+    query = PUB_PROJECTION.select(db.collection("publicans"))
+    records = sorted([PUB_PROJECTION(doc) for doc in db.collection("publicans").stream()],
+                     key=lambda record: order_key(record_values(record, PUB_ORDER)))
+
+    in_memory = walk(lambda size, after: paginate_records(records, PUB_ORDER, size, after), 2)
+    from_query = walk(lambda size, after: paginate_query(query, PUB_ORDER, size, PUB_PROJECTION, after), 2)
+    assert sum(in_memory, []) == sum(from_query, []) == ["p2", "p3", "p4", "p1", "p5"]
@@ -6,7 +6,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from Gamer import Gamer
 from Publican import Publican
-from permissions import Permissions
+from permissions import Permissions, PermissionEngine, ROLE_CAPABILITIES
+from fake_firestore import FakeFirestore
+from flask import Flask, jsonify
+from types import MappingProxyType
 
 def test_permissions_player():
     # Create a Gamer instance and initialize Permissions
@@ -35,3 +38,79 @@ def test_permissions_invalid_user():
     with pytest.raises(ValueError) as excinfo:
         Permissions("invalid_user")
     assert "Invalid user type" in str(excinfo.value)
+
+# ----- PermissionEngine -----
+
+@pytest.fixture
+def db():
+    return FakeFirestore({"permissions": {
+        "gamer1": dict(ROLE_CAPABILITIES["player"]),
+        "pub1": dict(ROLE_CAPABILITIES["publican"]),
+    }})
+
+def test_role_table_is_immutable():
+    assert isinstance(ROLE_CAPABILITIES, MappingProxyType)
+    with pytest.raises(TypeError):
+        ROLE_CAPABILITIES["player"]["can_create_games"] = False
+
+def test_engine_checks_are_cached(db):
+    engine = PermissionEngine(db)
+    for _ in range(10):
+        assert engine.has("gamer1", "can_create_games")
+        assert not engine.has("pub1", "can_create_games")
+    assert engine.has("pub1", "can_ban_gamers")
+    assert not engine.has("nobody", "can_update_details")
+    assert not engine.has("gamer1", "no_such_capability")
+    # "nobody" also looks for a publicans and a gamers document
+    assert db.calls["get"] == 5
+    assert engine.capabilities("pub1") == dict(ROLE_CAPABILITIES["publican"])
+
+def test_engine_falls_back_to_role_defaults(db):
+    db.store["gamers"] = {"newgamer": {"email": "new@example.com"}}
+    db.store["publicans"] = {"newpub": {"pub_name": "New Pub"}}
+    engine = PermissionEngine(db)
+
+    assert engine.has("newgamer", "can_create_games")
+    assert not engine.has("newpub", "can_create_games")
+    assert engine.has("newpub", "can_create_events")
+    # Role defaults are cached like permissions documents
+    calls = db.calls["get"]
+    assert engine.has("newgamer", "can_join_leave_games")
+    assert db.calls["get"] == calls
+
+def test_engine_does_not_cache_misses(db):
+    engine = PermissionEngine(db)
+    assert not engine.has("latecomer", "can_create_games")
+
+    db.store["permissions"]["latecomer"] = dict(ROLE_CAPABILITIES["player"])
+    assert engine.has("latecomer", "can_create_games")
+
+def test_engine_invalidate(db):
+    engine = PermissionEngine(db)
+    assert engine.has("gamer1", "can_create_games")
+    db.store["permissions"]["gamer1"]["can_create_games"] = False
+    assert engine.has("gamer1", "can_create_games")
+    engine.invalidate("gamer1")
+    assert not engine.has("gamer1", "can_create_games")
+
+def test_require_decorator(db):
+    engine = PermissionEngine(db)
+    app = Flask(__name__)
+
+    @app.route("/host", methods=["POST"])
+    @engine.require("can_create_games", "host")
+    def host():
+        return jsonify({"ok": True}), 201
+
+    @app.route("/ban", methods=["GET"])
+    @engine.require("can_ban_gamers", "userId")
+    async def ban():
+        return jsonify({"ok": True})
+
+    client = app.test_client()
+    assert client.post("/host", json={"host": "gamer1"}).status_code == 201
+    assert client.post("/host", json={"host": "pub1"}).status_code == 403
+    assert client.post("/host", json={}).status_code == 400
+    assert client.get("/ban?userId=pub1").status_code == 200
+    assert client.get("/ban?userId=gamer1").status_code == 403
+    assert db.calls["get"] == 2
@@ -120,3 +120,63 @@ def test_pub_details():
     assert details["tables"] == 10
     assert details["events"] == []
     assert details["pub_image"] is None
+
+def test_create_event_parses_times():
+    publican = Publican("Pub A", "pub@example.com", "PUB001", "securepassword", "123 Street, Dublin", 53.349805, -6.26031, 10)
+
+    event = publican.create_event("Seat Based", "2025-03-20T19:00:00", "2025-03-20T21:00:00", "2025-03-20T22:00:00", 20)["event"]
+    assert event["start_time"] == "2025-03-20T19:00:00"
+    assert event["end_ts"] - event["start_ts"] == 2 * 3600
+    assert event["expires_ts"] > event["end_ts"]
+    assert publican.create_event("Seat Based", "18:00", "21:00", "23:59", 20)["event"]["start_ts"] is None
+
+def test_events_are_indexed_by_id():
+    publican = Publican("Pub A", "pub@example.com", "PUB001", "securepassword", "123 Street, Dublin", 53.349805, -6.26031, 10)
+
+    event = publican.create_event("Seat Based", "2025-03-20T19:00:00", "2025-03-20T21:00:00", "2025-03-20T22:00:00", 20)["event"]
+    publican.create_event("Table Based", "2025-03-20T18:00:00", "2025-03-20T21:00:00", "2025-03-20T22:00:00", 5,
+                          unit_capacity=4, event_id="QUIZ1")
+
+    assert publican.get_event(event["event_id"]) is event
+    assert [e["event_id"] for e in publican.events] == [event["event_id"], "QUIZ1"]
+    assert [e["event_id"] for e in publican.get_upcoming_events(now=0)] == ["QUIZ1", event["event_id"]]
+    assert [e["event_id"] for e in publican.get_events_between("2025-03-20T18:30:00", "2025-03-20T23:00:00")] == [event["event_id"]]
+
+    assert publican.delete_event_by_id("QUIZ1")["status"] == "success"
+    assert publican.delete_event_by_id("QUIZ1")["status"] == "error"
+    assert publican.delete_event("2025-03-20T19:00:00", "Seat Based")["status"] == "success"
+    assert publican.delete_event("2025-03-20T19:00:00", "Seat Based")["status"] == "error"
+    assert publican.events == []
+
+def test_timed_table_reservations():
+    publican = Publican("Pub A", "pub@example.com", "PUB001", "securepassword", "123 Street, Dublin", 53.349805, -6.26031, 6)
+
+    assert publican.reserve_tables(4, "2025-03-20T19:00:00", "2025-03-20T21:00:00")["status"] == "success"
+    assert publican.reserve_tables(3, "2025-03-20T20:00:00", "2025-03-20T22:00:00")["status"] == "error"
+    assert publican.reserve_tables(2, "2025-03-20T20:00:00", "2025-03-20T22:00:00")["status"] == "success"
+    assert publican.get_free_tables("2025-03-20T21:00:00", "2025-03-20T22:00:00") == 4
+    assert publican.tables == 6
+    assert publican.reserve_tables(1, "21:00", "22:00")["message"] == "Invalid reservation time."
+    # Untimed reservations cannot take tables held for a slot
+    assert publican.reserve_tables(1)["status"] == "error"
+
+    assert publican.cancel_reservation(4, "2025-03-20T19:00:00", "2025-03-20T21:00:00")["status"] == "success"
+    assert publican.cancel_reservation(4, "2025-03-20T19:00:00", "2025-03-20T21:00:00")["status"] == "error"
+    assert publican.reserve_tables(4)["status"] == "success"
+    assert publican.tables == 2
+
+def test_reserve_tables_batch():
+    publican = Publican("Pub A", "pub@example.com", "PUB001", "securepassword", "123 Street, Dublin", 53.349805, -6.26031, 5)
+    schedule = [
+        (3, "2025-03-20T18:00:00", "2025-03-20T20:00:00"),
+        (2, "2025-03-20T19:00:00", "2025-03-20T21:00:00"),
+        (1, "2025-03-20T19:30:00", "2025-03-20T20:30:00"),
+    ]
+
+    response = publican.reserve_tables_batch(schedule)
+    assert response["status"] == "error"
+    assert "reservation 3" in response["message"]
+    assert publican.get_free_tables("2025-03-20T18:00:00", "2025-03-20T21:00:00") == 5
+
+    assert publican.reserve_tables_batch(schedule[:2])["status"] == "success"
+    assert publican.get_free_tables("2025-03-20T19:00:00", "2025-03-20T20:00:00") == 0
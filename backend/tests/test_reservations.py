@@ -0,0 +1,149 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from game import Game, SeatBasedGame, TableBasedGame
+from reservations import ReservationEngine, FirestoreReservations
+from fake_firestore import FakeFirestore, fake_transactional, hammer
+
+def make_game(max_players):
+    return Game("Alice", "Quiz", "Pub quiz.", "Trivia", "18:00", "21:00", "23:00", "PUB1", "Pub A", 10.0, 20.0, max_players)
+
+def make_seat_game(max_players):
+    return SeatBasedGame("Alice", "Chess", "Chess night.", "Board Game", "17:00", "19:00", "23:59", "PUB1", "Pub A", 10.5, 20.5, max_players)
+
+def make_table_game(max_players, tables):
+    return TableBasedGame("Alice", "D&D", "Roleplaying.", "Roleplaying", "19:00", "22:00", "23:59", "PUB1", "Pub A", 10.2, 21.8, max_players, tables)
+
+def test_reserve_and_cancel():
+    engine = ReservationEngine()
+    engine.add_game("g1", make_seat_game(2))
+
+    assert engine.reserve("g1", "Bob", 1) == "Bob has reserved seat 1."
+    assert engine.reserve("g1", "Bob", 2) == "Bob has already joined the game."
+    assert engine.reserve("g1", "Eve", 1) == "Seat already taken."
+    assert engine.cancel("g1", "Bob") == "Bob's reservation for seat 1 has been canceled."
+    with pytest.raises(KeyError):
+        engine.reserve("missing", "Bob")
+
+def test_reserve_many_is_all_or_nothing():
+    engine = ReservationEngine()
+    engine.add_game("g1", make_table_game(4, ["Table 1", "Table 2"]))
+    engine.reserve("g1", "Bob", "Table 2")
+
+    result = engine.reserve_many("g1", [("Carl", "Table 1"), ("Dana", "Table 1"), ("Erin", "Table 1")])
+    assert not result.ok
+    assert result.messages[-1] == "Table is full."
+    assert engine.get_game("g1").get_participants() == ["Bob"]
+
+    result = engine.reserve_many("g1", [("Carl", "Table 1"), ("Dana", "Table 1")])
+    assert result.ok
+    assert engine.get_game("g1").get_table_details()["Table 1"] == ["Carl", "Dana"]
+
+def test_concurrent_joins_never_overbook():
+    engine = ReservationEngine()
+    engine.add_game("g1", make_game(10))
+
+    results = hammer(lambda i: engine.reserve("g1", f"P{i}"))
+    assert sum(message.endswith("has joined the game.") for message in results) == 10
+    assert engine.get_game("g1").get_participant_count() == 10
+
+def test_concurrent_seat_reservations_have_one_winner_per_seat():
+    engine = ReservationEngine()
+    engine.add_game("g1", make_seat_game(4))
+
+    results = hammer(lambda i: engine.reserve("g1", f"P{i}", i % 4 + 1))
+    seats = engine.get_game("g1").get_seat_details()
+    assert sum("has reserved seat" in message for message in results) == 4
+    assert len(set(seats.values())) == 4
+    assert engine.get_game("g1").get_participant_count() == 4
+
+def test_concurrent_reserve_many_never_overbooks_tables():
+    engine = ReservationEngine()
+    engine.add_game("g1", make_table_game(12, ["Table 1", "Table 2", "Table 3"]))
+
+    results = hammer(lambda i: engine.reserve_many("g1", [(f"P{i}a", f"Table {i % 3 + 1}"), (f"P{i}b", f"Table {i % 3 + 1}")]))
+    tables = engine.get_game("g1").get_table_details()
+    assert sum(result.ok for result in results) == 6
+    assert all(len(occupants) == 4 for occupants in tables.values())
+
+@pytest.fixture
+def db():
+    return FakeFirestore({"games": {
+        "g1": {"max_players": 3, "participants": ["Alice"]},
+        "g2": {"max_players": 4, "participants": [], "is_private": True, "access_code": "XYZ"},
+        "g3": {"max_players": 4, "participants": [], "tables": {"T1": [], "T2": []}},
+    }})
+
+def test_firestore_reserve_and_cancel(db):
+    reservations = FirestoreReservations(db, fake_transactional)
+
+    assert reservations.reserve("g1", "Bob") == "Bob has joined the game."
+    assert reservations.reserve("g1", "Carl", 2) == "Carl has reserved seat 2."
+    assert reservations.reserve("g1", "Dana") == "Game is full."
+    assert reservations.reserve("g2", "Dana", code="nope") == "Access denied. Invalid access code."
+    assert reservations.reserve("missing", "Dana") == "Game not found."
+    assert db.store["games"]["g1"]["seats"] == {"2": "Carl"}
+
+    assert reservations.cancel("g1", "Carl") == "Carl has left the game."
+    assert db.store["games"]["g1"] == {"max_players": 3, "participants": ["Alice", "Bob"], "seats": {}}
+
+def test_firestore_reserve_many_is_all_or_nothing(db):
+    reservations = FirestoreReservations(db, fake_transactional)
+
+    result = reservations.reserve_many("g2", [("Bob", 1), ("Carl", 1)], code="XYZ")
+    assert not result.ok and result.messages == ["Bob has reserved seat 1.", "Seat already taken."]
+    assert db.store["games"]["g2"]["participants"] == []
+
+    assert reservations.reserve_many("g2", [("Bob", 1), ("Carl", 2)], code="XYZ").ok
+    assert db.calls["commit"] == 2
+
+def test_firestore_concurrent_joins_never_overbook(db):
+    reservations = FirestoreReservations(db, fake_transactional)
+
+    results = hammer(lambda i: reservations.reserve("g1", f"P{i}"))
+    assert sum(message.endswith("has joined the game.") for message in results) == 2
+    assert len(db.store["games"]["g1"]["participants"]) == 3
+
+def test_firestore_seat_reservations_respect_max_players(db):
+    reservations = FirestoreReservations(db, fake_transactional)
+
+    assert reservations.reserve("g1", "Bob") == "Bob has joined the game."
+    assert reservations.reserve("g1", "Carl", 2) == "Carl has reserved seat 2."
+    assert reservations.reserve("g1", "Erin", 1) == "Game is full."
+    assert reservations.reserve("g1", "Finn", 3) == "Game is full."
+    assert db.store["games"]["g1"]["participants"] == ["Alice", "Bob", "Carl"]
+
+def test_firestore_table_reservations(db):
+    reservations = FirestoreReservations(db, fake_transactional)
+
+    assert reservations.reserve("g3", "Bob") == "Table not found."
+    assert reservations.reserve("g3", "Bob", "T1") == "Bob has reserved a spot at T1."
+    assert reservations.reserve("g3", "Carl", "T1") == "Carl has reserved a spot at T1."
+    assert reservations.reserve("g3", "Dana", "T1") == "Table is full."
+    assert reservations.reserve("g3", "Dana", "T2") == "Dana has reserved a spot at T2."
+    assert db.store["games"]["g3"]["tables"] == {"T1": ["Bob", "Carl"], "T2": ["Dana"]}
+
+    assert reservations.cancel("g3", "Bob") == "Bob has left the game."
+    assert db.store["games"]["g3"]["tables"] == {"T1": ["Carl"], "T2": ["Dana"]}
+
+def test_firestore_concurrent_mixed_reservations_never_overbook(db):
+    reservations = FirestoreReservations(db, fake_transactional)
+
+    # Even workers take seats 1-3 (twice over), odd ones join without a seat
+    results = hammer(lambda i: reservations.reserve("g1", f"P{i}", (i // 2) % 3 + 1 if i % 2 == 0 else None))
+    game = db.store["games"]["g1"]
+    assert len(game["participants"]) == 3
+    assert sum(not message.endswith(("Game is full.", "Seat already taken.")) for message in results) == 2
+    assert len(set(game["seats"].values())) == len(game["seats"])
+    assert set(game["seats"].values()) <= set(game["participants"])
+
+def test_firestore_concurrent_table_reservations_never_overbook(db):
+    reservations = FirestoreReservations(db, fake_transactional)
+
+    results = hammer(lambda i: reservations.reserve("g3", f"P{i}", "T1" if i % 2 else "T2"))
+    game = db.store["games"]["g3"]
+    assert sum(message.endswith("has reserved a spot at T1.") or message.endswith("at T2.") for message in results) == 4
+    assert {table: len(occupants) for table, occupants in game["tables"].items()} == {"T1": 2, "T2": 2}
+    assert len(game["participants"]) == 4
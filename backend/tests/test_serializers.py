@@ -0,0 +1,49 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from serializers import Projection, GAME_PROJECTION, PUB_PROJECTION
+
+class CountingDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self.data = data
+        self.decodes = 0
+
+    def to_dict(self):
+        self.decodes += 1
+        return dict(self.data)
+
+class RecordingQuery:
+    def select(self, field_paths):
+        self.field_paths = field_paths
+        return self
+
+def test_serialize_decodes_once():
+    doc = CountingDoc("pub1", {"pub_name": "Pub A", "address": "1 Street", "xcoord": 53.3,
+                               "ycoord": -6.2, "BER": "B1", "email": "secret@example.com"})
+    record = PUB_PROJECTION.serialize(doc)
+
+    assert doc.decodes == 1
+    assert record == {"id": "pub1", "pub_name": "Pub A", "address": "1 Street", "xcoord": 53.3,
+                      "ycoord": -6.2, "BER": "B1", "pub_image_url": None,
+                      "pub_image_variants": None}
+
+def test_serialize_missing_document_data():
+    doc = CountingDoc("game1", None)
+    doc.to_dict = lambda: None
+    record = GAME_PROJECTION(doc)
+    assert record["id"] == "game1"
+    assert all(value is None for key, value in record.items() if key != "id")
+
+def test_select_applies_field_mask():
+    query = RecordingQuery()
+    assert GAME_PROJECTION.select(query) is query
+    assert query.field_paths == list(GAME_PROJECTION.get_fields())
+    assert "participants" in query.field_paths and "game_code" not in query.field_paths
+
+def test_custom_id_field():
+    projection = Projection(["fullName"], id_field="docId")
+    docs = [CountingDoc("a", {"fullName": "Alice"}), CountingDoc("b", {})]
+    assert projection.serialize_all(docs) == [{"docId": "a", "fullName": "Alice"}, {"docId": "b", "fullName": None}]
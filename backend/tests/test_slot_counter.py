@@ -0,0 +1,129 @@
+import random
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from slot_counter import SlotCounter, slot_range, split_slots
+from fake_firestore import FakeFirestore, fake_transactional, hammer
+
+SLOTS = {"19:00-20:00": 10, "20:00-21:00": 10, "21:00-22:00": 10}
+
+def make_counter(slots=SLOTS):
+    db = FakeFirestore({"events": {"E1": {"pub_id": "PUB1", "available_slots": dict(slots)}}})
+    return db, SlotCounter(db, fake_transactional, rng=random.Random(1))
+
+def test_slot_range():
+    assert slot_range(SLOTS, "2025-03-20T19:00:00", "2025-03-20T21:00:00") == ["19:00-20:00", "20:00-21:00"]
+    assert slot_range(SLOTS, "2025-03-20T21:00:00", "2025-03-20T22:00:00") == ["21:00-22:00"]
+    with pytest.raises(ValueError):
+        slot_range(SLOTS, "2025-03-20T18:00:00", "2025-03-20T20:00:00")
+    with pytest.raises(ValueError):
+        slot_range(SLOTS, "2025-03-20T21:00:00", "2025-03-20T20:00:00")
+
+def test_split_slots_keeps_totals():
+    split = split_slots({"19:00-20:00": 10, "20:00-21:00": 3}, 4)
+    assert [shard["19:00-20:00"] for shard in split] == [3, 3, 2, 2]
+    assert [shard["20:00-21:00"] for shard in split] == [1, 1, 1, 0]
+
+def test_claim_decrements_covered_slots_and_runs_then():
+    db, counter = make_counter()
+    written = []
+
+    claim = counter.claim("E1", "2025-03-20T19:00:00", "2025-03-20T21:00:00", 4, then=written.append)
+
+    assert claim.ok
+    assert len(written) == 1
+    assert db.store["events"]["E1"]["available_slots"] == {"19:00-20:00": 6, "20:00-21:00": 6, "21:00-22:00": 10}
+
+    claim = counter.claim("E1", "2025-03-20T20:00:00", "2025-03-20T22:00:00", 7, then=written.append)
+    assert not claim.ok
+    assert "20:00-21:00" in claim.message
+    assert len(written) == 1
+    assert counter.totals("E1") == {"19:00-20:00": 6, "20:00-21:00": 6, "21:00-22:00": 10}
+
+def test_claim_errors():
+    _, counter = make_counter()
+    with pytest.raises(KeyError):
+        counter.claim("missing", "2025-03-20T19:00:00", "2025-03-20T20:00:00", 1)
+    with pytest.raises(ValueError):
+        counter.claim("E1", "2025-03-20T19:00:00", "2025-03-20T20:00:00", 0)
+    with pytest.raises(ValueError):
+        counter.claim("E1", "2025-03-20T19:30:00", "2025-03-20T20:00:00", 1)
+
+def test_release_returns_places():
+    db, counter = make_counter()
+    counter.claim("E1", "2025-03-20T19:00:00", "2025-03-20T20:00:00", 4)
+    counter.release("E1", "2025-03-20T19:00:00", "2025-03-20T20:00:00", 4)
+    assert db.store["events"]["E1"]["available_slots"] == SLOTS
+
+def test_release_runs_then_and_can_be_refused():
+    db, counter = make_counter()
+    counter.shard_event("E1", 2)
+    counter.claim("E1", "2025-03-20T19:00:00", "2025-03-20T20:00:00", 4)
+
+    assert not counter.release("E1", "2025-03-20T19:00:00", "2025-03-20T20:00:00", 4, then=lambda t: False).ok
+    assert counter.totals("E1")["19:00-20:00"] == 6
+    released = []
+    assert counter.release("E1", "2025-03-20T19:00:00", "2025-03-20T20:00:00", 4, then=released.append).ok
+    assert len(released) == 1
+    assert counter.totals("E1") == SLOTS
+
+def test_concurrent_claims_never_oversell():
+    db, counter = make_counter()
+
+    results = hammer(lambda i: counter.claim("E1", "2025-03-20T19:00:00", "2025-03-20T21:00:00", 1).ok)
+
+    assert results.count(True) == 10
+    assert db.store["events"]["E1"]["available_slots"] == {"19:00-20:00": 0, "20:00-21:00": 0, "21:00-22:00": 10}
+
+def test_shard_event_splits_counts_once():
+    db, counter = make_counter()
+
+    assert counter.shard_event("E1", 4)
+    assert not counter.shard_event("E1", 8)
+    assert db.store["events"]["E1"]["slot_shards"] == 4
+    assert len(db.store["event_slot_shards"]) == 4
+    assert counter.totals("E1") == SLOTS
+    with pytest.raises(ValueError):
+        counter.shard_event("E1", 0)
+
+def test_sharded_claims_span_shards_when_needed():
+    db, counter = make_counter()
+    counter.shard_event("E1", 4)
+
+    # No single shard holds 9 places, so the claim spreads over them
+    assert counter.claim("E1", "2025-03-20T19:00:00", "2025-03-20T20:00:00", 9).ok
+    assert counter.totals("E1")["19:00-20:00"] == 1
+    assert not counter.claim("E1", "2025-03-20T19:00:00", "2025-03-20T20:00:00", 2).ok
+
+    counter.release("E1", "2025-03-20T19:00:00", "2025-03-20T20:00:00", 9)
+    assert counter.totals("E1") == SLOTS
+
+def test_concurrent_sharded_claims_never_oversell_and_sync_totals():
+    db, counter = make_counter({"19:00-20:00": 50, "20:00-21:00": 50})
+    counter.shard_event("E1", 5)
+
+    results = hammer(lambda i: counter.claim("E1", "2025-03-20T19:00:00", "2025-03-20T21:00:00", 2).ok)
+
+    assert results.count(True) == 25
+    assert counter.totals("E1") == {"19:00-20:00": 0, "20:00-21:00": 0}
+    # The event document keeps the old counts until the totals are synced
+    assert db.store["events"]["E1"]["available_slots"]["19:00-20:00"] == 50
+    assert counter.sync_totals() == 1
+    assert db.store["events"]["E1"]["available_slots"] == {"19:00-20:00": 0, "20:00-21:00": 0}
+
+def test_sync_totals_keeps_direct_writes_to_the_display_copy():
+    db, counter = make_counter()
+    counter.shard_event("E1", 3)
+    counter.claim("E1", "2025-03-20T19:00:00", "2025-03-20T20:00:00", 6)
+
+    # An older client giving places back by writing the event document itself
+    db.store["events"]["E1"]["available_slots"] = dict(SLOTS, **{"19:00-20:00": 12, "21:00-22:00": 3})
+    counter.sync_totals()
+
+    expected = {"19:00-20:00": 6, "20:00-21:00": 10, "21:00-22:00": 3}
+    assert counter.totals("E1") == expected
+    assert db.store["events"]["E1"]["available_slots"] == expected
+    counter.sync_totals()
+    assert counter.totals("E1") == expected
@@ -0,0 +1,99 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from spatial_index import GeoGrid, haversine_km, parse_geo_filter, apply_geo_filter
+
+# Dublin city centre and a few points around it
+CENTRE = (53.349805, -6.26031)
+GAMES = [
+    {"id": "temple_bar", "xcoord": 53.3455, "ycoord": -6.2643},
+    {"id": "rathmines", "xcoord": "53.3229", "ycoord": "-6.2653"},
+    {"id": "howth", "xcoord": 53.3786, "ycoord": -6.0576},
+    {"id": "cork", "xcoord": 51.8985, "ycoord": -8.4756},
+    {"id": "no_coords", "xcoord": None, "ycoord": ""},
+]
+
+def test_haversine_known_distance():
+    # Dublin to Cork is roughly 220km as the crow flies
+    assert 215 < haversine_km(*CENTRE, 51.8985, -8.4756) < 225
+    assert haversine_km(*CENTRE, *CENTRE) == 0
+
+def test_grid_insert_remove():
+    grid = GeoGrid()
+    assert grid.insert("a", 53.3, -6.2) is True
+    assert grid.insert("bad", "not a number", -6.2) is False
+    assert len(grid) == 1 and "a" in grid
+    assert grid.remove("a") is True
+    assert grid.remove("a") is False
+    assert len(grid) == 0
+
+def test_grid_reinsert_moves_point():
+    grid = GeoGrid()
+    grid.insert("a", *CENTRE)
+    grid.insert("a", 51.8985, -8.4756)
+    assert grid.query_radius(*CENTRE, 5) == []
+    assert [key for key, _ in grid.query_radius(51.8985, -8.4756, 1)] == ["a"]
+
+def test_query_radius_nearest_first():
+    grid = GeoGrid()
+    for game in GAMES:
+        grid.insert(game["id"], game["xcoord"], game["ycoord"])
+
+    hits = grid.query_radius(*CENTRE, 5)
+    assert [key for key, _ in hits] == ["temple_bar", "rathmines"]
+    assert hits[0][1] < hits[1][1] <= 5
+
+    assert [key for key, _ in grid.query_radius(*CENTRE, 20)] == ["temple_bar", "rathmines", "howth"]
+    assert [key for key, _ in grid.query_radius(*CENTRE, 20, limit=1)] == ["temple_bar"]
+
+def test_query_bbox():
+    grid = GeoGrid()
+    for game in GAMES:
+        grid.insert(game["id"], game["xcoord"], game["ycoord"])
+
+    assert grid.query_bbox(53.3, -6.3, 53.4, -6.0) == ["howth", "rathmines", "temple_bar"]
+    assert grid.query_bbox(53.3, -6.3, 53.4, -6.0, limit=2) == ["howth", "rathmines"]
+    # A box wider than the populated cells falls back to a flat scan
+    assert len(grid.query_bbox(-90, -180, 90, 180)) == 4
+
+def test_parse_geo_filter():
+    assert parse_geo_filter({}) is None
+    assert parse_geo_filter({"limit": "5"}) == {"limit": 5}
+    assert parse_geo_filter({"lat": "53.3", "lng": "-6.2", "radius_km": "2"}) == {
+        "limit": None, "lat": 53.3, "lng": -6.2, "radius_km": 2.0}
+    assert parse_geo_filter({"min_lat": "1", "min_lng": "2", "max_lat": "3", "max_lng": "4"})["max_lng"] == 4.0
+
+@pytest.mark.parametrize("args", [
+    {"lat": "53.3", "lng": "-6.2"},
+    {"lat": "53.3", "lng": "-6.2", "radius_km": "0"},
+    {"lat": "north", "lng": "-6.2", "radius_km": "1"},
+    {"min_lat": "1", "min_lng": "2"},
+    {"limit": "0"},
+    {"lat": "inf", "lng": "-6.2", "radius_km": "1"},
+    {"lat": "53.3", "lng": "nan", "radius_km": "1"},
+    {"lat": "53.3", "lng": "-6.2", "radius_km": "inf"},
+    {"lat": "91", "lng": "-6.2", "radius_km": "1"},
+    {"lat": "53.3", "lng": "-180.5", "radius_km": "1"},
+    {"lat": "53.3", "lng": "-6.2", "radius_km": "30000"},
+    {"min_lat": "-inf", "min_lng": "2", "max_lat": "3", "max_lng": "4"},
+    {"min_lat": "3", "min_lng": "2", "max_lat": "1", "max_lng": "4"},
+    {"min_lat": "1", "min_lng": "4", "max_lat": "3", "max_lng": "2"},
+])
+def test_parse_geo_filter_invalid(args):
+    with pytest.raises(ValueError):
+        parse_geo_filter(args)
+
+def test_apply_geo_filter():
+    assert apply_geo_filter(GAMES, None) is GAMES
+
+    nearby = apply_geo_filter(GAMES, {"limit": None, "lat": CENTRE[0], "lng": CENTRE[1], "radius_km": 5})
+    assert [game["id"] for game in nearby] == ["temple_bar", "rathmines"]
+    assert all("distance_km" in game for game in nearby)
+    assert "distance_km" not in GAMES[0]
+
+    boxed = apply_geo_filter(GAMES, {"limit": 1, "min_lat": 51, "min_lng": -9, "max_lat": 52, "max_lng": -8})
+    assert [game["id"] for game in boxed] == ["cork"]
+
+    assert apply_geo_filter(GAMES, {"limit": 2}) == GAMES[:2]
@@ -0,0 +1,49 @@
+import json
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from streaming import stream_format, iter_json_array, iter_ndjson, iter_stream, NDJSON_MIMETYPE
+
+RECORDS = [{"id": "g1", "game_name": "Trivia"}, {"id": "g2", "game_name": "Darts"}]
+
+def accept(header):
+    return parse_accept_header(header, MIMEAccept)
+
+@pytest.mark.parametrize("args, header, expected", [
+    ({}, "", None),
+    ({}, "*/*", None),
+    ({}, "application/json", None),
+    ({"stream": "0"}, "", None),
+    ({"stream": "1"}, "", "json"),
+    ({"stream": "ndjson"}, "", "ndjson"),
+    ({}, "application/x-ndjson", "ndjson"),
+    ({"stream": "1"}, "application/x-ndjson, application/json;q=0.5", "ndjson"),
+])
+def test_stream_format(args, header, expected):
+    assert stream_format(args, accept(header)) == expected
+
+def test_json_array_is_valid_json():
+    assert json.loads("".join(iter_json_array(RECORDS))) == RECORDS
+    assert json.loads("".join(iter_json_array([]))) == []
+
+def test_ndjson_one_record_per_line():
+    lines = "".join(iter_ndjson(RECORDS)).splitlines()
+    assert [json.loads(line) for line in lines] == RECORDS
+
+def test_records_consumed_lazily():
+    consumed = []
+    def source():
+        for record in RECORDS:
+            consumed.append(record["id"])
+            yield record
+
+    chunks, mimetype = iter_stream(source(), "ndjson")
+    assert mimetype == NDJSON_MIMETYPE
+    assert consumed == []
+    next(chunks)
+    assert consumed == ["g1"]
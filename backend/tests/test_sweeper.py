@@ -0,0 +1,105 @@
+import pytest
+import threading
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sweeper import ExpirySweeper
+from fake_firestore import FakeFirestore
+from timeutil import parse_timestamp
+
+NOW = parse_timestamp("2025-03-20T20:00:00")
+
+def expiring(record):
+    return dict(record, expires_ts=parse_timestamp(record["expires"]))
+
+def games(expired, live):
+    store = {f"old{i:03d}": expiring({"game_name": f"Old {i}", "expires": f"2025-03-20T{i % 20:02d}:00:00"}) for i in range(expired)}
+    store.update({f"new{i:03d}": expiring({"game_name": f"New {i}", "expires": "2025-03-20T23:00:00"}) for i in range(live)})
+    return store
+
+class Sleeper:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, seconds):
+        self.calls.append(seconds)
+
+def test_archives_expired_documents():
+    db = FakeFirestore({"games": games(5, 3), "events": {"e1": expiring({"expires": "2025-03-20T19:59:59"}),
+                                                            "e2": expiring({"expires": "2025-03-21T00:00:00"})}})
+    sweeper = ExpirySweeper(db, clock=lambda: NOW)
+
+    assert sweeper.sweep() == {"games": 5, "events": 1}
+    assert sorted(db.store["games"]) == ["new000", "new001", "new002"]
+    assert sorted(db.store["games_archive"]) == [f"old{i:03d}" for i in range(5)]
+    assert db.store["games_archive"]["old001"]["game_name"] == "Old 1"
+    assert db.store["games_archive"]["old001"]["archived_at"] == "2025-03-20T20:00:00"
+    assert list(db.store["events"]) == ["e2"] and list(db.store["events_archive"]) == ["e1"]
+
+    metrics = sweeper.get_metrics()
+    assert metrics["runs"] == 1 and metrics["archived"] == {"games": 5, "events": 1}
+    assert metrics["last_run_archived"] == 6
+
+def test_batches_are_bounded():
+    db = FakeFirestore({"games": games(45, 0)})
+    sweeper = ExpirySweeper(db, collections=[("games", "expires_ts")], batch_size=10, max_batches=3,
+                            clock=lambda: NOW, sleep=Sleeper())
+
+    assert sweeper.sweep() == {"games": 30}
+    assert db.calls["commit"] == 3
+    assert sweeper.sweep() == {"games": 15}
+    assert "games" not in db.store or db.store["games"] == {}
+    assert sweeper.get_metrics()["batches"] == 5
+
+def test_rate_limit_spaces_commits():
+    db = FakeFirestore({"games": games(30, 0)})
+    sleep = Sleeper()
+    sweeper = ExpirySweeper(db, collections=[("games", "expires_ts")], batch_size=10, max_writes_per_second=20,
+                            clock=lambda: NOW, sleep=sleep)
+
+    sweeper.sweep()
+    # Each batch is 20 writes, so commits must be about a second apart
+    assert len(sleep.calls) == 2
+    assert all(0.9 < seconds <= 1.0 for seconds in sleep.calls)
+
+def test_documents_without_an_epoch_expiry_are_left_alone():
+    db = FakeFirestore({"games": {"odd": {"expires": "1999 sometime"}, "old": expiring({"expires": "2025-03-20T10:00:00"})}})
+    sweeper = ExpirySweeper(db, collections=[("games", "expires_ts")], batch_size=1, clock=lambda: NOW)
+
+    assert sweeper.sweep() == {"games": 1}
+    assert list(db.store["games"]) == ["odd"]
+
+def test_metrics_answer_during_a_sweep():
+    db = FakeFirestore({"games": games(30, 0)})
+    sleeping, release = threading.Event(), threading.Event()
+
+    def sleep(seconds):
+        sleeping.set()
+        release.wait(5)
+
+    sweeper = ExpirySweeper(db, collections=[("games", "expires_ts")], batch_size=10, max_writes_per_second=20,
+                            clock=lambda: NOW, sleep=sleep)
+    worker = threading.Thread(target=sweeper.sweep)
+    worker.start()
+    try:
+        assert sleeping.wait(5)
+        # The sweep is parked in its rate-limit sleep, holding the sweep lock
+        assert sweeper.get_metrics()["archived"] == {"games": 10}
+    finally:
+        release.set()
+        worker.join()
+    assert sweeper.get_metrics()["archived"] == {"games": 30}
+
+def test_errors_are_counted():
+    class BrokenFirestore(FakeFirestore):
+        def batch(self):
+            raise RuntimeError("unavailable")
+
+    sweeper = ExpirySweeper(BrokenFirestore({"games": games(2, 0)}), clock=lambda: NOW)
+    assert sweeper.sweep() == {"games": 0, "events": 0}
+    assert sweeper.get_metrics()["errors"] == 1
+
+def test_batch_size_limit():
+    with pytest.raises(ValueError):
+        ExpirySweeper(FakeFirestore(), batch_size=251)
@@ -0,0 +1,35 @@
+import pytest
+import sys
+import os
+from datetime import datetime, timezone
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from timeutil import epoch_fields, format_local, now_ts, parse_timestamp
+
+def test_parse_timestamp_formats():
+    local = parse_timestamp("2025-03-20T21:00:00")
+    assert local == int(datetime(2025, 3, 20, 21, 0, 0).timestamp())
+    assert parse_timestamp("2025-03-20T21:00:00Z") == int(datetime(2025, 3, 20, 21, tzinfo=timezone.utc).timestamp())
+    assert parse_timestamp("2025-03-20T21:00:00.000Z") == parse_timestamp("2025-03-20T21:00:00Z")
+    assert parse_timestamp(datetime(2025, 3, 20, 21, 0, 0)) == local
+    assert parse_timestamp(1742500800.7) == 1742500800
+
+@pytest.mark.parametrize("value", [None, "", "23:59", "tonight", True, ["2025-03-20"]])
+def test_parse_timestamp_rejects(value):
+    assert parse_timestamp(value) is None
+
+def test_integer_order_matches_time_order():
+    times = ["2025-03-20T21:00:00Z", "2025-03-20T20:30:00", "2025-03-21T08:00:00+01:00"]
+    assert sorted(times, key=parse_timestamp) == sorted(times, key=lambda value: datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone())
+
+def test_format_local_round_trip():
+    ts = now_ts()
+    assert parse_timestamp(format_local(ts)) == ts
+    assert len(format_local()) == len("2025-03-20T21:00:00")
+
+def test_epoch_fields():
+    fields = epoch_fields({"start_time": "2025-03-20T19:00:00", "end_time": "2025-03-20T21:00:00", "expires": 1742515200})
+    assert fields["end_ts"] - fields["start_ts"] == 2 * 3600
+    assert fields["expires_ts"] == 1742515200
+    assert epoch_fields({"start_time": "19:00", "end_time": "2025-03-20T21:00:00"}) == {
+        "start_ts": None, "end_ts": fields["end_ts"], "expires_ts": fields["end_ts"]}
@@ -0,0 +1,112 @@
+import json
+import time
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from transfer_users import transfer_users_to_firestore as transfer, load_checkpoint
+from fake_firestore import FakeFirestore, fake_transactional
+from id_allocator import FirestoreBlockSource, IdAllocator
+
+def transfer_users_to_firestore(db, list_users, **kwargs):
+    allocators = (IdAllocator(FirestoreBlockSource(db, fake_transactional, "gamer_ids"), block_size=64),
+                  IdAllocator(FirestoreBlockSource(db, fake_transactional, "publican_ids"), block_size=64))
+    return transfer(db, list_users, allocators=allocators, **kwargs)
+
+class AuthUser:
+    def __init__(self, uid, display_name=None):
+        self.uid = uid
+        self.email = f"{uid}@example.com"
+        self.display_name = display_name
+
+class AuthPage:
+    def __init__(self, users, next_page_token):
+        self.users = users
+        self.next_page_token = next_page_token
+
+class FakeAuth:
+    """auth.list_users stand-in serving page_size users per page; can fail on a given page."""
+    def __init__(self, count, page_size, fail_on=None):
+        self.users = [AuthUser(f"uid{i:05d}", f"User {i}" if i % 3 else None) for i in range(count)]
+        self.page_size = page_size
+        self.fail_on = fail_on
+        self.tokens = []
+
+    def list_users(self, page_token=None):
+        self.tokens.append(page_token)
+        start = int(page_token) if page_token else 0
+        if self.fail_on is not None and start == self.fail_on:
+            raise RuntimeError("auth unavailable")
+        end = start + self.page_size
+        return AuthPage(self.users[start:end], str(end) if end < len(self.users) else None)
+
+def test_single_pass_creates_missing_documents(tmp_path):
+    db = FakeFirestore({"gamers": {"uid00001": {"gamerId": "KEEP1"}}, "users": {"uid00002": {"publicanId": "KEEP2"}}})
+    fake_auth = FakeAuth(250, page_size=100)
+
+    stats = transfer_users_to_firestore(db, fake_auth.list_users, max_workers=4,
+                                        checkpoint_path=str(tmp_path / "checkpoint.json"))
+
+    assert fake_auth.tokens == [None, "100", "200"]
+    assert len(db.store["gamers"]) == 250 and len(db.store["users"]) == 250
+    assert db.store["gamers"]["uid00001"] == {"gamerId": "KEEP1"}
+    assert db.store["users"]["uid00002"] == {"publicanId": "KEEP2"}
+    gamer = db.store["gamers"]["uid00004"]
+    assert gamer["fullName"] == "User 4" and gamer["email"] == "uid00004@example.com" and len(gamer["gamerId"]) == 5
+    assert db.store["users"]["uid00003"]["fullName"] == "Anonymous"
+    assert len({gamer["gamerId"] for gamer in db.store["gamers"].values()}) == 250
+    assert db.store["counters"]["gamer_ids"]["next"] == 256
+
+    assert (stats["processed"], stats["added_gamers"], stats["added_publicans"]) == (250, 249, 249)
+    # The only single-document reads are the counter reads of 4 ID blocks per allocator
+    assert db.calls["get"] == 8 and db.calls["set"] == 0
+    assert db.calls["get_all"] == 6
+    assert not os.path.exists(tmp_path / "checkpoint.json")
+
+def test_resumes_from_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    db = FakeFirestore()
+
+    with pytest.raises(RuntimeError):
+        transfer_users_to_firestore(db, FakeAuth(500, page_size=100, fail_on=300).list_users, max_workers=2,
+                                    checkpoint_path=checkpoint)
+    assert load_checkpoint(checkpoint) == "300"
+    assert len(db.store["gamers"]) == 300
+
+    fake_auth = FakeAuth(500, page_size=100)
+    stats = transfer_users_to_firestore(db, fake_auth.list_users, max_workers=2, checkpoint_path=checkpoint)
+    assert fake_auth.tokens == ["300", "400"]
+    assert stats["added_gamers"] == 200
+    assert len(db.store["gamers"]) == 500 and len(db.store["users"]) == 500
+
+def test_failed_page_holds_the_checkpoint(tmp_path):
+    class FailingFirestore(FakeFirestore):
+        def get_all(self, refs, field_paths=None):
+            if any(ref.id == "uid00100" for ref in refs):
+                raise RuntimeError("deadline exceeded")
+            return super().get_all(refs, field_paths=field_paths)
+
+    def slow_list_users(page_token=None):
+        # Slow listing, so the failure surfaces while later pages are still being submitted
+        time.sleep(0.05)
+        return fake_auth.list_users(page_token)
+
+    checkpoint = str(tmp_path / "checkpoint.json")
+    db = FailingFirestore()
+    fake_auth = FakeAuth(500, page_size=100)
+
+    with pytest.raises(RuntimeError):
+        transfer_users_to_firestore(db, slow_list_users, max_workers=4, checkpoint_path=checkpoint)
+    # Later pages finished, but a resume must start with the failed one
+    assert load_checkpoint(checkpoint) == "100"
+    assert "uid00100" not in db.store["gamers"]
+
+def test_rerun_is_idempotent(tmp_path):
+    db = FakeFirestore()
+    transfer_users_to_firestore(db, FakeAuth(120, page_size=50).list_users, checkpoint_path=None)
+    before = json.dumps(db.store, sort_keys=True, default=str)
+
+    stats = transfer_users_to_firestore(db, FakeAuth(120, page_size=50).list_users, checkpoint_path=None)
+    assert stats["added_gamers"] == 0 and stats["skipped_gamers"] == 120
+    assert json.dumps(db.store, sort_keys=True, default=str) == before
@@ -0,0 +1,115 @@
+import os
+import pytest
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.test import encode_multipart
+import io
+
+from local_storage import LocalBucket
+from uploads import StreamingUploads, sniff_image
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 400
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00\x10JFIF" + b"x" * 5000
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'png', 'jpg', 'jpeg'}
+
+def body(filename, data, field="image", **fields):
+    values = dict(fields, **{field: FileStorage(io.BytesIO(data), filename=filename)})
+    return encode_multipart(values, boundary="----test-boundary")
+
+def pieces(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+def make_uploads(tmp_path, **kwargs):
+    return StreamingUploads(LocalBucket(str(tmp_path), "/images"), allowed_file, **kwargs)
+
+def stored_files(tmp_path):
+    return sorted(os.path.relpath(os.path.join(root, name), tmp_path)
+                  for root, _, names in os.walk(tmp_path) for name in names)
+
+def test_sniff_image():
+    assert sniff_image(PNG[:8]) == ("png", "image/png")
+    assert sniff_image(JPEG[:8]) == ("jpg", "image/jpeg")
+    assert sniff_image(b"GIF89a..") is None
+
+@pytest.mark.parametrize("read_size", [1, 7, 4096, 1 << 20])
+def test_streams_file_part_to_storage(tmp_path, read_size):
+    boundary, data = body("pub.png", PNG, note="hello")
+
+    result = make_uploads(tmp_path).receive(pieces(data, read_size), boundary, "PUB1")
+
+    assert result["content_type"] == "image/png"
+    assert result["size"] == len(PNG)
+    assert result["name"].startswith("uploads/PUB1/") and result["name"].endswith(".png")
+    assert result["url"] == f"/images/{result['name']}"
+    with open(tmp_path / result["name"], "rb") as stored:
+        assert stored.read() == PNG
+    assert stored_files(tmp_path) == [result["name"]]
+
+def test_jpeg_extensions(tmp_path):
+    boundary, data = body("photo.JPEG", JPEG)
+    assert make_uploads(tmp_path).receive(pieces(data, 100), boundary, "PUB1")["name"].endswith(".jpg")
+
+@pytest.mark.parametrize("filename, contents", [
+    ("pub.gif", PNG),            # extension not allowed
+    ("pub.png", b"GIF89a" + b"x" * 100),  # magic bytes are not an image
+    ("pub.jpg", PNG),            # magic bytes do not match the extension
+    ("pub.png", b"\x89P"),       # too short to be an image
+])
+def test_rejects_invalid_images_without_storing(tmp_path, filename, contents):
+    boundary, data = body(filename, contents)
+    with pytest.raises(ValueError):
+        make_uploads(tmp_path).receive(pieces(data, 50), boundary, "PUB1")
+    assert stored_files(tmp_path) == []
+
+def test_missing_image_and_truncated_body(tmp_path):
+    boundary, data = body("pub.png", PNG, field="other")
+    with pytest.raises(ValueError, match="No image"):
+        make_uploads(tmp_path).receive(pieces(data, 1000), boundary, "PUB1")
+
+    boundary, data = body("pub.png", PNG)
+    with pytest.raises(ValueError):
+        make_uploads(tmp_path).receive(pieces(data[:len(data) // 2], 1000), boundary, "PUB1")
+    assert stored_files(tmp_path) == []
+
+def test_too_large_upload_is_discarded(tmp_path):
+    boundary, data = body("pub.png", PNG)
+    with pytest.raises(RequestEntityTooLarge):
+        make_uploads(tmp_path, max_bytes=len(PNG) - 1).receive(pieces(data, 4096), boundary, "PUB1")
+    assert stored_files(tmp_path) == []
+
+class RecordingBucket(LocalBucket):
+    # Records each write, to check the file is never handed over in one piece
+    def __init__(self, root):
+        super().__init__(root, "/images")
+        self.writes = []
+
+    def blob(self, name):
+        blob = super().blob(name)
+        open_blob = blob.open
+
+        def recording_open(*args, **kwargs):
+            writer = open_blob(*args, **kwargs)
+            write = writer.write
+            writer.write = lambda data: self.writes.append(len(data)) or write(data)
+            return writer
+        blob.open = recording_open
+        return blob
+
+def test_writes_as_the_body_arrives(tmp_path):
+    bucket = RecordingBucket(str(tmp_path))
+    boundary, data = body("pub.png", PNG)
+
+    StreamingUploads(bucket, allowed_file).receive(pieces(data, 4096), boundary, "PUB1")
+
+    assert sum(bucket.writes) == len(PNG)
+    assert len(bucket.writes) > 10
+    assert max(bucket.writes) <= 4096 + 16
+
+def test_local_bucket_rejects_escaping_names(tmp_path):
+    with pytest.raises(ValueError):
+        LocalBucket(str(tmp_path), "/images").blob("../outside.png")
@@ -0,0 +1,40 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from user_types import UserType, UserTypeCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_role_document():
+    assert UserType.from_user_data({}).role_document("u1") == ("gamers", "u1")
+    assert UserType.from_user_data({"isPublican": True, "userIdToDisplay": "P1"}).role_document("u1") == ("publican", "P1")
+    assert UserType.from_user_data({"isPublican": True}).role_document("u1") is None
+
+def test_cache_hit_and_ttl():
+    clock = FakeClock()
+    cache = UserTypeCache(ttl=60, clock=clock)
+    assert cache.get("u1") is None
+
+    cache.put("u1", {"isPublican": True, "userIdToDisplay": "P1"})
+    assert cache.get("u1") == UserType(True, "P1")
+
+    clock.now = 61
+    assert cache.get("u1") is None
+
+def test_invalidate_and_capacity():
+    cache = UserTypeCache(max_entries=2)
+    cache.put("u1", {})
+    cache.put("u2", {})
+    cache.put("u3", {})
+    assert cache.get("u1") is None
+    assert cache.get("u3") == UserType(False, None)
+
+    cache.invalidate("u3")
+    assert cache.get("u3") is None
@@ -0,0 +1,50 @@
+import time
+from datetime import datetime
+from functools import lru_cache
+
+# The format the frontend (moment "YYYY-MM-DDTHH:mm:ss") writes times in, in local time
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def now_ts():
+    """Current time as integer epoch seconds."""
+    return int(time.time())
+
+
+def parse_timestamp(value):
+    """
+    Normalize a stored time to integer epoch seconds: ISO-8601 strings (naive
+    ones are local time, a trailing Z is UTC), datetimes (including Firestore
+    timestamps) and numbers. Returns None for anything else.
+    """
+    if isinstance(value, str):
+        return _parse_iso(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    return None
+
+
+# Games and events share a small set of slot times, so parsed strings are memoized
+@lru_cache(maxsize=65536)
+def _parse_iso(value):
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+def epoch_fields(record):
+    """
+    The start_ts/end_ts/expires_ts fields stored with a game or event: its
+    start_time, end_time and expires as epoch seconds (None if unparseable).
+    A record with no expiry expires when it ends.
+    """
+    start, end, expires = (parse_timestamp(record.get(field)) for field in ("start_time", "end_time", "expires"))
+    return {"start_ts": start, "end_ts": end, "expires_ts": end if expires is None else expires}
+
+
+def format_local(ts=None):
+    """Epoch seconds (default now) in TIMESTAMP_FORMAT local time, for queries on the stored strings."""
+    return datetime.fromtimestamp(now_ts() if ts is None else ts).strftime(TIMESTAMP_FORMAT)
@@ -1,103 +1,142 @@
 import firebase_admin
 from firebase_admin import auth, firestore, credentials
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
 import random
-import string
 
-cred = credentials.Certificate("serviceAccountKey.json")
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+from bulk import Progress, commit_sets, existing_ids
+from id_allocator import FirestoreBlockSource, IdAllocator, legacy_ids
+
+CHECKPOINT_FILE = "transfer_users.checkpoint.json"
+
+def id_allocators(db):
+    """
+    Gamer and publican ID allocators backed by shared Firestore counters,
+    unique across workers and skipping the IDs already stored.
+    """
+    return (IdAllocator(FirestoreBlockSource(db, firestore.transactional, 'gamer_ids'),
+                        taken=legacy_ids(db, 'gamers', 'gamerId', 'gamer_id')),
+            IdAllocator(FirestoreBlockSource(db, firestore.transactional, 'publican_ids'),
+                        taken=legacy_ids(db, 'users', 'publicanId')))
+
+def new_gamer_data(user, gamer_ids):
+    """The 'gamers' document created for an authenticated user."""
+    return {
+        'fullName': user.display_name if user.display_name else "Anonymous",
+        'email': user.email,
+        'gamerId': gamer_ids.next_id(),
+        'profile': str(random.randint(1, 12)).zfill(2),
+        'friends_list': [],
+        'hosted_games': [],
+        'joined_games': [],
+        'createdAt': firestore.SERVER_TIMESTAMP
+    }
+
+def new_publican_data(user, publican_ids):
+    """The 'users' document created for an authenticated user."""
+    return {
+        'fullName': user.display_name if user.display_name else "Anonymous",
+        'email': user.email,
+        'publicanId': publican_ids.next_id(),
+        'venue': "Unknown Venue",
+        'hosted_events': [],
+        'createdAt': firestore.SERVER_TIMESTAMP
+    }
+
+def transfer_page(db, users, progress, gamer_ids, publican_ids):
+    """Create the missing 'gamers' and 'users' documents for one page of auth users."""
+    uids = [user.uid for user in users]
+    existing_gamers = existing_ids(db, 'gamers', uids)
+    existing_publicans = existing_ids(db, 'users', uids)
+
+    writes = []
+    for user in users:
+        if user.uid not in existing_gamers:
+            writes.append((db.collection('gamers').document(user.uid), new_gamer_data(user, gamer_ids)))
+        if user.uid not in existing_publicans:
+            writes.append((db.collection('users').document(user.uid), new_publican_data(user, publican_ids)))
+    commits = commit_sets(db, writes)
+
+    added_gamers = len(uids) - len(existing_gamers)
+    added_publicans = len(uids) - len(existing_publicans)
+    progress.add(processed=len(uids), added_gamers=added_gamers, added_publicans=added_publicans,
+                 skipped_gamers=len(existing_gamers), skipped_publicans=len(existing_publicans), commits=commits)
+
+def load_checkpoint(path):
+    """Page token to resume from, or None to start from the first page."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as checkpoint:
+        return json.load(checkpoint).get("page_token")
+
+def save_checkpoint(path, page_token):
+    if not path:
+        return
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as checkpoint:
+        json.dump({"page_token": page_token}, checkpoint)
+    os.replace(temp_path, path)
+
+def transfer_users_to_firestore(db, list_users=auth.list_users, max_workers=8, checkpoint_path=CHECKPOINT_FILE,
+                                progress=None, allocators=None):
+    """
+    Single pass over the authenticated users that adds the missing 'gamers'
+    and 'users' documents.
+
+    Pages are listed one after another (each needs the previous page token)
+    while up to max_workers pages are checked and written concurrently. The
+    checkpoint file holds the token of the first page not yet fully written,
+    so an interrupted run resumes there; pages redone after a resume only fill
+    in what is still missing.
+
+    gamerId/publicanId values come from (gamer, publican) IdAllocators,
+    by default the shared Firestore counters of id_allocators().
+    """
+    progress = progress or Progress()
+    gamer_ids, publican_ids = allocators or id_allocators(db)
+    page_token = load_checkpoint(checkpoint_path)
+    pending = deque()
+
+    def settle(wait):
+        # Advance the checkpoint over pages that finished in listing order; a failed page stays at
+        # the head of pending, so the checkpoint never moves past it
+        while pending and (wait or pending[0][0].done() or len(pending) > 2 * max_workers):
+            future, next_page_token = pending[0]
+            future.result()
+            pending.popleft()
+            save_checkpoint(checkpoint_path, next_page_token)
+            print(f"Transfer progress: {progress.report()}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            while True:
+                page = list_users(page_token=page_token)
+                pending.append((executor.submit(transfer_page, db, list(page.users), progress, gamer_ids, publican_ids), page.next_page_token))
+                settle(wait=False)
+                page_token = page.next_page_token
+                if not page_token:
+                    break
+        except BaseException:
+            # Also on failure, so the checkpoint covers every page written before the first failed one
+            try:
+                settle(wait=True)
+            except Exception:
+                pass
+            raise
+        settle(wait=True)
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return progress.snapshot()
+
+if __name__ == "__main__":
+    cred = credentials.Certificate("serviceAccountKey.json")
+    firebase_admin.initialize_app(cred)
+    db = firestore.client()
 
-def generate_id():
-    """Generate a unique 5-character alphanumeric ID."""
-    characters = string.ascii_uppercase + string.digits
-    return ''.join(random.choices(characters, k=5))
-
-def transfer_users_to_firestore():
-    """Transfer only new authenticated gamers to the 'gamers' Firestore collection."""
     try:
-        page_token = None
-
-        while True:
-            page = auth.list_users(page_token=page_token)
-
-            for user in page.users:
-                email = user.email
-                uid = user.uid
-                display_name = user.display_name if user.display_name else "Anonymous"
-
-                user_ref = db.collection('gamers').document(uid)
-                existing_user = user_ref.get()
-
-                if existing_user.exists:
-                    print(f"Skipping existing gamer {email}.")
-                    continue  
-
-                gamer_id = generate_id()
-                profile = str(random.randint(1, 12)).zfill(2)
-
-                gamer_data = {
-                    'fullName': display_name,
-                    'email': email,
-                    'gamerId': gamer_id,
-                    'profile': profile,
-                    'friends_list': [],
-                    'hosted_games': [],
-                    'joined_games': [],
-                    'createdAt': firestore.SERVER_TIMESTAMP
-                }
-
-                user_ref.set(gamer_data)
-                print(f"Added new gamer {email} to Firestore with Gamer ID {gamer_id}.")
-
-            page_token = page.next_page_token
-            if not page_token:
-                break
-
+        print(f"Transfer complete: {transfer_users_to_firestore(db)}")
     except Exception as e:
-        print(f"Error transferring gamers: {e}")
-
-def transfer_publicans_to_firestore():
-    """Transfer only new authenticated publicans to the 'users' Firestore collection."""
-    try:
-        page_token = None
-
-        while True:
-            page = auth.list_users(page_token=page_token)
-
-            for user in page.users:
-                email = user.email
-                uid = user.uid
-                display_name = user.display_name if user.display_name else "Anonymous"
-
-                user_ref = db.collection('users').document(uid)
-                existing_user = user_ref.get()
-
-                if existing_user.exists:
-                    print(f"Skipping existing publican {email}.")
-                    continue 
-
-                publican_id = generate_id()
-                venue = "Unknown Venue"
-
-                publican_data = {
-                    'fullName': display_name,
-                    'email': email,
-                    'publicanId': publican_id,
-                    'venue': venue,
-                    'hosted_events': [],
-                    'createdAt': firestore.SERVER_TIMESTAMP
-                }
-
-                user_ref.set(publican_data)
-                print(f"Added new publican {email} to Firestore with Publican ID {publican_id}.")
-
-            page_token = page.next_page_token
-            if not page_token:
-                break
-
-    except Exception as e:
-        print(f"Error transferring publicans: {e}")
-
-# Run both functions
-transfer_users_to_firestore()
-transfer_publicans_to_firestore()
+        print(f"Error transferring users: {e}")
@@ -0,0 +1,132 @@
+import uuid
+from contextlib import ExitStack
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+from image_pipeline import CACHE_CONTROL
+
+# Leading bytes of each accepted image type -> (stored extension, content type)
+MAGIC_BYTES = {
+    b"\x89PNG\r\n\x1a\n": ("png", "image/png"),
+    b"\xff\xd8\xff": ("jpg", "image/jpeg"),
+}
+SNIFF_BYTES = max(len(magic) for magic in MAGIC_BYTES)
+# Extensions each sniffed type may arrive with
+EXTENSIONS = {"png": {"png"}, "jpg": {"jpg", "jpeg"}}
+# Bytes read from the request per step
+READ_SIZE = 64 * 1024
+# Resumable upload chunks must be multiples of 256 KiB; this bounds what is buffered per upload
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Cap on what the decoder buffers between events (Flask's default MAX_FORM_MEMORY_SIZE);
+# non-file fields bigger than this are refused rather than buffered
+MAX_FORM_MEMORY = 500 * 1024
+
+
+def sniff_image(head):
+    """(extension, content type) for the image type head starts with, or None."""
+    for magic, kind in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def iter_request(stream, read_size=READ_SIZE):
+    """Read a request body stream in read_size pieces."""
+    return iter(lambda: stream.read(read_size), b"")
+
+
+class StreamingUploads:
+    """
+    Receives one image from a multipart/form-data body and streams it into
+    the bucket as it arrives: the body is parsed incrementally with
+    werkzeug's sans-IO MultipartDecoder and each piece is written to
+    blob.open("wb"), a resumable upload sent in chunk_size requests. Memory
+    use is bounded by chunk_size plus one read, whatever the image size.
+
+    The file must pass `allowed` (main.allowed_file) on its filename and
+    start with PNG or JPEG magic bytes matching its extension. On any error
+    the upload is terminated, so nothing partial is stored. Works with a
+    google.cloud.storage bucket or local_storage.LocalBucket.
+    """
+
+    def __init__(self, bucket, allowed, prefix="uploads", chunk_size=UPLOAD_CHUNK_SIZE, max_bytes=16 * 1024 * 1024):
+        self.__bucket = bucket
+        self.__allowed = allowed
+        self.__prefix = prefix
+        self.__chunk_size = chunk_size
+        self.__max_bytes = max_bytes
+
+    def receive(self, chunks, boundary, owner_id, field="image"):
+        """
+        Store the `field` file part of a multipart body given as an iterable of
+        byte chunks. Returns {"url", "name", "content_type", "size"}. Raises
+        ValueError for a malformed body or a missing/invalid image and
+        RequestEntityTooLarge past max_bytes.
+        """
+        decoder = MultipartDecoder(boundary.encode() if isinstance(boundary, str) else boundary,
+                                   max_form_memory_size=MAX_FORM_MEMORY)
+        part = None
+        upload = None
+        stored = None
+        with ExitStack() as stack:
+            for chunk in self.__with_end(chunks):
+                decoder.receive_data(chunk)
+                event = decoder.next_event()
+                while not isinstance(event, (NeedData, Epilogue)):
+                    if isinstance(event, (File, Field)):
+                        part = event
+                        if isinstance(event, File) and event.name == field:
+                            if upload is not None or stored is not None:
+                                raise ValueError("Only one image can be uploaded at a time.")
+                            if not self.__allowed(event.filename or ""):
+                                raise ValueError("Unsupported image type.")
+                            upload = {"filename": event.filename, "head": b"", "writer": None, "size": 0}
+                    elif isinstance(event, Data) and upload is not None and part.name == field \
+                            and isinstance(part, File):
+                        self.__write(stack, upload, owner_id, event.data, event.more_data)
+                        if not event.more_data:
+                            stored, upload = upload, None
+                    event = decoder.next_event()
+                if isinstance(event, Epilogue):
+                    break
+            if stored is None:
+                raise ValueError("No image file provided.")
+        # Leaving the ExitStack closed the writer, which finalized the upload
+        blob = stored["blob"]
+        blob.make_public()
+        return {"url": blob.public_url, "name": blob.name, "content_type": stored["content_type"],
+                "size": stored["size"]}
+
+    @staticmethod
+    def __with_end(chunks):
+        # The decoder refuses single inputs past MAX_FORM_MEMORY, so large chunks go in READ_SIZE pieces
+        for chunk in chunks:
+            for start in range(0, len(chunk), READ_SIZE):
+                yield chunk[start:start + READ_SIZE]
+        # None tells the decoder the body is complete
+        yield None
+
+    def __write(self, stack, upload, owner_id, data, more_data):
+        upload["size"] += len(data)
+        if upload["size"] > self.__max_bytes:
+            raise RequestEntityTooLarge()
+        if upload["writer"] is None:
+            # Hold back only the first few bytes, until the type can be checked
+            upload["head"] += data
+            if len(upload["head"]) < SNIFF_BYTES and more_data:
+                return
+            data, upload["head"] = upload["head"], b""
+            self.__open(stack, upload, owner_id, data)
+        upload["writer"].write(data)
+
+    def __open(self, stack, upload, owner_id, head):
+        kind = sniff_image(head)
+        extension = upload["filename"].rsplit(".", 1)[-1].lower()
+        if kind is None or extension not in EXTENSIONS[kind[0]]:
+            raise ValueError("File contents are not a PNG or JPEG image matching its extension.")
+        blob = self.__bucket.blob(f"{self.__prefix}/{owner_id}/{uuid.uuid4().hex}.{kind[0]}")
+        # Every upload gets a fresh name, so its bytes never change
+        blob.cache_control = CACHE_CONTROL
+        upload["writer"] = stack.enter_context(blob.open("wb", chunk_size=self.__chunk_size, content_type=kind[1]))
+        upload["blob"], upload["content_type"] = blob, kind[1]
@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+
+class UserType(namedtuple("UserType", ["is_publican", "publican_id"])):
+    """Which role document mirrors a user's profile fields."""
+
+    @classmethod
+    def from_user_data(cls, user_data):
+        return cls(bool(user_data.get("isPublican", False)), user_data.get("userIdToDisplay"))
+
+    def role_document(self, user_id):
+        """(collection, document_id) of the role document, or None for a publican without one."""
+        if self.is_publican:
+            return ("publican", self.publican_id) if self.publican_id else None
+        return ("gamers", user_id)
+
+
+class UserTypeCache:
+    """
+    Small TTL cache of user ID -> UserType, so profile writes can target the
+    right role document without reading the users document first.
+    """
+
+    def __init__(self, ttl=300, max_entries=10000, clock=time.monotonic):
+        self.__ttl = ttl
+        self.__max_entries = max_entries
+        self.__clock = clock
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.__lock:
+            entry = self.__entries.get(user_id)
+            if entry is None:
+                return None
+            user_type, expires_at = entry
+            if expires_at <= self.__clock():
+                del self.__entries[user_id]
+                return None
+            return user_type
+
+    def put(self, user_id, user_data):
+        user_type = UserType.from_user_data(user_data)
+        with self.__lock:
+            self.__entries.pop(user_id, None)
+            self.__entries[user_id] = (user_type, self.__clock() + self.__ttl)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+        return user_type
+
+    def invalidate(self, user_id):
+        with self.__lock:
+            self.__entries.pop(user_id, None)
@@ -150,6 +150,10 @@ const CreateEventScreen = ({ navigation }) => {
       start_time: startDateTime.toISOString(),
       end_time: endDateTime.toISOString(),
       expires: expireDateTime.toISOString(),
+      // Epoch seconds, which the backend queries and sorts on
+      start_ts: Math.floor(startDateTime.getTime() / 1000),
+      end_ts: Math.floor(endDateTime.getTime() / 1000),
+      expires_ts: Math.floor(expireDateTime.getTime() / 1000),
       pub_id: publicanId,
       pub_details: pubDetails,
       available_slots: availableSlots,
@@ -1,12 +1,10 @@
 import { Ionicons } from "@expo/vector-icons";
 import * as Clipboard from "expo-clipboard";
 import {
-  arrayRemove,
   doc,
   getDoc,
   updateDoc,
   arrayUnion,
-  deleteDoc,
 } from "firebase/firestore";
 import React, { useState, useEffect } from "react";
 import {
@@ -22,6 +20,7 @@ import MapView, { Marker } from "react-native-maps";
 import { SafeAreaView } from "react-native-safe-area-context";
 import { SvgXml } from "react-native-svg";
 
+import { NGROK_URL } from "../../environment";
 import { useGamer } from "../contexts/GamerContext";
 import { db } from "../firebaseConfig";
 import profileIcons from "../utils/profileIcons/profileIcons";
@@ -90,97 +89,24 @@ const GameDetails = ({ route, navigation }) => {
 
   const handleCancelGame = async () => {
     try {
-      // Get reference to the event document using game.event_id
-      const eventRef = doc(db, "events", game.event_id);
-      const eventDoc = await getDoc(eventRef);
-
-      if (eventDoc.exists()) {
-        const eventData = eventDoc.data();
-        console.log("eventData:", eventData);
-
-        // Check if time slots exist in the event data
-        if (!eventData.available_slots) {
-          console.error("No time_slots found in event data.");
-          alert("Error: Time slots not found in the event.");
-          return;
-        }
-
-        // Convert start and end times to integers (e.g., 19:00 → 19)
-        const startHour = new Date(game.start_time).getHours();
-        const endHour = new Date(game.end_time).getHours();
-
-        // Create an update object for Firestore
-        const updatedSlots = { ...eventData.available_slots };
-
-        for (let hour = startHour; hour < endHour; hour++) {
-          const slotKey = `${hour}:00-${hour + 1}:00`;
-          if (updatedSlots[slotKey] !== undefined) {
-            updatedSlots[slotKey] += game.max_players;
-          }
-        }
-
-        // Update the event document in Firestore
-        await updateDoc(eventRef, { available_slots: updatedSlots });
-
-        // Remove the game ID from the host's hosted_games array
-        const hostRef = doc(db, "gamers", game.host);
-        const hostDoc = await getDoc(hostRef);
-        const hostData = hostDoc.data();
-        console.log("Before Removal - Hosted Games:", hostData.hosted_games);
-
-        // Check if the game ID exists in the array
-        if (
-          hostData.hosted_games.includes(game.id) ||
-          hostData.hosted_games.includes(String(game.id))
-        ) {
-          console.log(
-            "Game ID exists in hosted_games. Proceeding with removal...",
-          );
-
-          await updateDoc(hostRef, {
-            hosted_games: arrayRemove(String(game.id)),
-          });
-
-          console.log("Game ID removed successfully.");
-        } else {
-          console.warn("Game ID not found in hosted_games. Nothing to remove.");
-        }
-
-        const updatedHostDoc = await getDoc(hostRef);
-        console.log(
-          "hosted_games (after):",
-          updatedHostDoc.data().hosted_games,
+      // The backend deletes the game and gives its places back to the event
+      const response = await fetch(`${NGROK_URL}/api/delete_game`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({ game_id: game.id, host: gamerId }),
+      });
+
+      if (!response.ok) {
+        const responseData = await response.json();
+        throw new Error(
+          responseData.error || `HTTP error! status: ${response.status}`,
         );
-
-        // Remove game ID from each participant's joined_games array
-        if (game.participants && game.participants.length > 0) {
-          console.log("Removing game ID from participants' joined_games...");
-
-          const removeFromParticipants = game.participants.map(
-            async (participantId) => {
-              const participantRef = doc(db, "gamers", participantId);
-              await updateDoc(participantRef, {
-                joined_games: arrayRemove(String(game.id)),
-              });
-              console.log(
-                `Game ID removed from ${participantId}'s joined_games`,
-              );
-            },
-          );
-          await Promise.all(removeFromParticipants);
-
-          console.log("game id:", game.id);
-          const gameRef = doc(db, "games", game.id);
-          await deleteDoc(gameRef);
-          console.log("Game document deleted successfully.");
-        }
-
-        alert("Game canceled successfully.");
-        navigation.goBack();
-      } else {
-        console.error("Event not found.");
-        alert("Error: Event not found.");
       }
+
+      alert("Game canceled successfully.");
+      navigation.goBack();
     } catch (error) {
       console.log("ERROR canceling event:", error);
       alert("Failed to cancel event. Please try again.");